@@ -1,8 +1,21 @@
 import streamlit as st
-import pandas as pd
-import json
-import re
 import io
+import json
+import os
+from itertools import groupby
+
+from hub_core import (
+    EXPORT_FORMATS, analyze_collection_recursively, analyze_collection_stream, collection_items, content_digest,
+    encode_collection, export_streamed_collection, generate_collection, generate_workbook_collection, gzip_chunks,
+    lru_get_or_build, new_lru_cache, prepare_swagger, read_url_sheets, read_url_table, reanalyze_touched, zero_hit_count
+)
+from hub_cache import cache_key, disk_get, disk_get_or_build, disk_put, new_disk_cache
+from hub_diff import format_diff
+from hub_load import TOTAL_FOLDER, load_rows, parse_ramp, run_load_test
+from hub_merge import diff_collections, merge_fixes
+from hub_perf import configure_perf_log, log_trace, new_trace, span, trace_rows
+from hub_replay import benchmark_rows, run_benchmark
+from hub_stats import rows_to_csv
 
 #streamlit run app.py
 # ==========================================
@@ -10,312 +23,203 @@ import io
 # ==========================================
 st.set_page_config(page_title="Malekah API Hub", page_icon="🔐", layout="wide")
 
-# القائمة البيضاء للقيم الصفرية (منطق الملفات المرفقة)
-ALLOWED_ZERO_KEYS = [
-    'pregnancyWeek', 'pregnancyStage', 'ageStageId', 'date', 
-    'rate', 'price', 'duration', 'time', 'day'
-]
-
-# --- سكربتات التيست (من ملف generate_smart_collection_v2.py) ---
-TEST_SCRIPT_OLD_BASE = [
-    "// 1. Check Status Code is 200",
-    "pm.test(\"Old API: Status code is 200\", function () {",
-    "    pm.response.to.have.status(200);",
-    "});",
-    "",
-    "// 2. Check Business Success (New Added)",
-    "try {",
-    "    var jsonData = pm.response.json();",
-    "    if (jsonData.hasOwnProperty('success')) {",
-    "        pm.test(\"Old API: Business Logic Success\", function () {",
-    "            pm.expect(jsonData.success).to.be.true;",
-    "        });",
-    "    }",
-    "    // 3. Save Response & Time for Comparison",
-    "    pm.collectionVariables.set('previous_response', JSON.stringify(jsonData));",
-    "    pm.collectionVariables.set('previous_status', pm.response.code);",
-    "    pm.collectionVariables.set('previous_time', pm.response.responseTime);", 
-    "} catch (e) {",
-    "    pm.collectionVariables.set('previous_response', '{}');",
-    "    pm.collectionVariables.set('previous_status', pm.response.code);",
-    "    pm.collectionVariables.set('previous_time', 0);",
-    "}"
-]
-
-TEST_SCRIPT_NEW_SMART = [
-    "var _ = require('lodash');",
-    "",
-    "// 1. Check Status Code is 200",
-    "pm.test(\"New API: Status code is 200\", function () {",
-    "    pm.response.to.have.status(200);",
-    "});",
-    "",
-    "// 2. Business Logic Success Check (CRITICAL)",
-    "var newRes = pm.response.json();",
-    "if (newRes.hasOwnProperty('success')) {",
-    "    pm.test(\"New API: Business Success (success=true)\", function () {",
-    "        if(newRes.success === false) {",
-    "             pm.expect.fail(`Business Fail: ${newRes.message || 'No Error Message'}`);",
-    "        }",
-    "        pm.expect(newRes.success).to.be.true;",
-    "    });",
-    "}",
-    "",
-    "// --- COMPARISON LOGIC ---",
-    "var oldResStr = pm.collectionVariables.get('previous_response');",
-    "var oldStatus = pm.collectionVariables.get('previous_status');",
-    "var oldTime = pm.collectionVariables.get('previous_time');",
-    "var oldRes = oldResStr ? JSON.parse(oldResStr) : {};",
-    "var newStatus = pm.response.code;",
-    "",
-    "// 3. Compare Status Codes",
-    "if (oldStatus != newStatus) {",
-    "    pm.test(\"Status Comparison\", function () {",
-    "        pm.expect.fail(`CRITICAL: Status Mismatch! Old: ${oldStatus}, New: ${newStatus}`);",
-    "    });",
-    "} else {",
-    "    pm.test(\"Status Codes Match\", function () { pm.expect(newStatus).to.eql(oldStatus); });",
-    "    ",
-    "    // 4. Performance Check (Warning only)",
-    "    if (oldTime > 0) {",
-    "        pm.test(\"Performance Check (New vs Old)\", function () {",
-    "            var threshold = Math.max(oldTime * 1.5, oldTime + 200);",
-    "            pm.expect(pm.response.responseTime).to.be.below(threshold, `New API is too slow! Old: ${oldTime}ms, New: ${pm.response.responseTime}ms`);",
-    "        });",
-    "    }",
-    "    ",
-    "    // 5. Deep Content Comparison",
-    "    pm.test(\"Deep Data Match\", function () {",
-    "        if (_.isEqual(oldRes, newRes)) {",
-    "            pm.expect(true).to.be.true;",
-    "            return;",
-    "        }",
-    "        var diffs = [];",
-    "        function findDiff(obj1, obj2, path) {",
-    "            var keys1 = _.keys(obj1);",
-    "            var keys2 = _.keys(obj2);",
-    "            var allKeys = _.union(keys1, keys2);",
-    "            allKeys.forEach(function (key) {",
-    "                var newPath = path ? path + '.' + key : key;",
-    "                if (!_.has(obj1, key)) diffs.push(`[NEW FIELD] '${newPath}'`);",
-    "                else if (!_.has(obj2, key)) diffs.push(`[MISSING FIELD] '${newPath}'`);",
-    "                else if (_.isObject(obj1[key]) && _.isObject(obj2[key])) findDiff(obj1[key], obj2[key], newPath);",
-    "                else if (!_.isEqual(obj1[key], obj2[key])) diffs.push(`[VALUE DIFF] '${newPath}': Old(${obj1[key]}) vs New(${obj2[key]})`);",
-    "            });",
-    "        }",
-    "        findDiff(oldRes, newRes, '');",
-    "        if (diffs.length > 0) {",
-    "             pm.expect.fail('MISMATCHES:\\n' + diffs.join('\\n'));",
-    "        }",
-    "    });",
-    "}"
-]
-
-TEST_SCRIPT_CANCELLED = [
-    "pm.test(\"API Cancelled\", function () {",
-    "    console.warn(\"Old API Only. New version cancelled.\");",
-    "    pm.expect(true).to.be.true;",
-    "});"
-]
+# Parsed uploads kept in memory across reruns (all users together), by size of the uploaded bytes
+UPLOAD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# On-disk cache shared by every session and process on this machine (parsed uploads, Swagger templates, analysis results)
+DISK_CACHE_PATH = os.environ.get("HUB_CACHE_PATH", os.path.join(".hub_cache", "hub.sqlite"))
+DISK_CACHE_MAX_BYTES = int(os.environ.get("HUB_CACHE_MAX_BYTES", 2 * 1024 * 1024 * 1024))
+
+EXPORT_LABELS = {"pretty": "Pretty JSON", "compact": "Compact JSON", "gzip": "Gzip (.json.gz)"}
+EXPORT_MIME = {"pretty": "application/json", "compact": "application/json", "gzip": "application/gzip"}
+
+PIPELINES = {"gen": "generator", "insp": "inspector", "merge": "merge"}
 
 # ==========================================
-# 1. Logic Helpers (The Core Logic)
+# 1. Session Helpers
 # ==========================================
-
-def get_api_name_from_url(url):
-    if not isinstance(url, str): return "Unknown"
-    return url.strip().split('/')[-1]
-
-def normalize_url(url):
-    """تنظيف الرابط ومطابقته مع السواجر (منطق catch_emptyBody_but_has_example_v2.py)"""
-    if isinstance(url, dict): url = url.get('raw', '')
-    url = str(url)
-    url = url.split('?')[0]
-    # محاولة اصطياد المسار من بعد /api/
-    api_match = re.search(r'(/api/.*)', url, re.IGNORECASE)
-    if api_match: return api_match.group(1)
-    # تنظيف عام
-    cleaned = re.sub(r'^.*?://[^/]+', '', url)
-    cleaned = re.sub(r'^.*\}\}', '', cleaned)
-    if not cleaned.startswith('/'): cleaned = '/' + cleaned
-    return cleaned
-
-def extract_body_from_description(description):
-    """استخراج البودي من الوصف (منطق generate_smart_collection_v2.py)"""
-    if not description: return "{}"
-    match = re.search(r'Request Body Example--\s*(\{[\s\S]*?\})(\s*--Response--|$)', description, re.IGNORECASE)
-    if match:
-        raw_body = match.group(1).strip()
-        try:
-            raw_body = re.sub(r',\s*\}', '}', raw_body)
-            raw_body = re.sub(r',\s*\]', ']', raw_body)
-            raw_body = re.sub(r'\bTrue\b', 'true', raw_body)
-            raw_body = re.sub(r'\bFalse\b', 'false', raw_body)
-            raw_body = re.sub(r'\/\/.*', '', raw_body)
-            return raw_body
-        except:
-            return raw_body
-    return "{}"
-
-def find_zero_values(data, path=""):
-    """البحث عن القيم الصفرية و GUIDs (منطق check_json_and_zeros_v3.py)"""
-    findings = []
-    if isinstance(data, dict):
-        for key, value in data.items():
-            new_path = f"{path}.{key}" if path else key
-            findings.extend(find_zero_values(value, new_path))
-    elif isinstance(data, list):
-        for index, value in enumerate(data):
-            new_path = f"{path}[{index}]"
-            findings.extend(find_zero_values(value, new_path))
-    elif isinstance(data, str):
-        # صيد GUIDs الصفرية
-        if re.match(r'^[0-]+$', data) and '0' in data and len(data) > 5:
-            findings.append(f"{path} = \"{data}\" (Empty GUID 🚨)")
-    elif isinstance(data, (int, float)):
-        # تجاهل البوليان
-        if isinstance(data, bool): return []
-        if data == 0:
-            current_key = path.split('.')[-1]
-            if current_key not in ALLOWED_ZERO_KEYS:
-                findings.append(f"{path} = {data} (Zero Value ⚠️)")
-    return findings
-
-# --- دوال السواجر التكرارية (Advanced Recursion from context) ---
-def resolve_ref(schema, swagger_data):
-    if '$ref' in schema:
-        ref_path = schema['$ref'].split('/')[-1]
-        return swagger_data.get('components', {}).get('schemas', {}).get(ref_path, {})
-    return schema
-
-def generate_dummy_data(schema, swagger_data, depth=0):
-    if depth > 3: return "..."
-    if '$ref' in schema:
-        resolved = resolve_ref(schema, swagger_data)
-        return generate_dummy_data(resolved, swagger_data, depth)
-    if 'allOf' in schema:
-        combined_obj = {}
-        for sub_schema in schema['allOf']:
-            result = generate_dummy_data(sub_schema, swagger_data, depth)
-            if isinstance(result, dict):
-                combined_obj.update(result)
-        return combined_obj
-    if 'properties' in schema:
-        obj_data = {}
-        for prop_name, prop_schema in schema['properties'].items():
-            obj_data[prop_name] = generate_dummy_data(prop_schema, swagger_data, depth + 1)
-        return obj_data
-    s_type = schema.get('type')
-    if s_type == 'integer': return 0
-    if s_type == 'number': return 0.0
-    if s_type == 'boolean': return True
-    if s_type == 'string':
-        if 'format' in schema and schema['format'] == 'uuid': return "00000000-0000-0000-0000-000000000000"
-        if 'format' in schema and 'date' in schema['format']: return "2024-01-01T00:00:00Z"
-        return "string"
-    if s_type == 'array':
-        item_schema = schema.get('items', {})
-        sample_item = generate_dummy_data(item_schema, swagger_data, depth + 1)
-        return [sample_item]
-    return "string"
-
-def generate_body_hint_from_swagger(op_details, swagger_data):
-    request_body = op_details.get('requestBody', {})
-    content = request_body.get('content', {})
-    target_schema = {}
-    for mime in content:
-        if 'json' in mime:
-            target_schema = content[mime].get('schema', {})
-            break
-    if not target_schema:
-        for p in op_details.get('parameters', []):
-            if p.get('in') == 'body':
-                target_schema = p.get('schema', {})
+@st.cache_resource
+def upload_cache():
+    """Process-wide LRU shared by all sessions; keys are namespaced per logged-in user"""
+    return new_lru_cache(UPLOAD_CACHE_MAX_BYTES)
+
+@st.cache_resource
+def disk_cache():
+    """Content-addressed SQLite cache; identical uploads from any user or session share one entry"""
+    return new_disk_cache(DISK_CACHE_PATH, DISK_CACHE_MAX_BYTES)
+
+def cached_upload(kind, uploaded, build):
+    """Parses an upload once per (user, content hash); identical bytes on later reruns are a cache hit.
+    Misses fall back to the on-disk cache before parsing, so other sessions / restarts reuse the work."""
+    data = uploaded.getvalue()
+    digest = content_digest(data)
+    key = (st.session_state.get("auth_user", ""), kind, digest)
+    return lru_get_or_build(upload_cache(), key, len(data),
+                            lambda: disk_get_or_build(disk_cache(), kind, (digest, uploaded.name), lambda: build(data, uploaded.name)))
+
+def upload_digest(uploaded): return content_digest(uploaded.getvalue()) if uploaded else ""
+
+def parse_url_table(data, name): return read_url_table(io.BytesIO(data), name)
+
+def parse_url_sheets(data, name): return read_url_sheets(io.BytesIO(data), name)
+
+def parse_swagger(data, name): return prepare_swagger(json.loads(data))
+
+def reset_finding_widgets(*prefixes):
+    """Drops stored text-area values and pending edits so re-numbered findings are seeded from their current bodies
+    (paging widgets are kept; `<prefix>warnings`-style result keys never match)"""
+    for key in list(st.session_state.keys()):
+        if not isinstance(key, str): continue
+        for prefix in prefixes:
+            if key.startswith(prefix) and (key[len(prefix):].isdigit() or key[len(prefix):] == "edits"):
+                del st.session_state[key]
                 break
-    if not target_schema: return None
-    final_body = generate_dummy_data(target_schema, swagger_data)
-    return json.dumps(final_body, ensure_ascii=False, indent=2)
-
-def find_swagger_path(normalized_url, swagger_paths):
-    if normalized_url in swagger_paths: return swagger_paths[normalized_url]
-    for s_path, s_data in swagger_paths.items():
-        pattern = "^" + re.sub(r'\{.*?\}', '[^/]+', s_path) + "$"
-        if re.match(pattern, normalized_url, re.IGNORECASE):
-            return s_data
-    return None
-
-# --- دالة التحليل الرئيسية (Inspector Logic) ---
-def analyze_collection_recursively(items, swagger_data=None, parent_path=""):
-    syntax_errs = []
-    zero_warns = []
-    missing_bodies = []
-
-    for i, item in enumerate(items):
-        current_name = item.get('name', 'Unnamed')
-        full_path = f"{parent_path} > {current_name}" if parent_path else current_name
-        
-        # Recursion
-        if 'item' in item:
-            s, z, m = analyze_collection_recursively(item['item'], swagger_data, full_path)
-            syntax_errs.extend(s)
-            zero_warns.extend(z)
-            missing_bodies.extend(m)
-        
-        # Request Check
-        elif 'request' in item:
-            req_info = item['request']
-            body_data = req_info.get('body', {})
-            raw_body = body_data.get('raw', '').strip()
-            url_raw = req_info.get('url', '')
-            if isinstance(url_raw, dict): url_raw = url_raw.get('raw', '')
-            
-            # 1. Syntax & Zero Check (If body exists)
-            if raw_body and raw_body != "{}":
-                try:
-                    parsed = json.loads(raw_body)
-                    zeros = find_zero_values(parsed)
-                    for z in zeros:
-                        zero_warns.append({
-                            "path": full_path, 
-                            "item_ref": item, 
-                            "body": raw_body, 
-                            "detail": z
-                        })
-                except json.JSONDecodeError as e:
-                    hint = f"Error at line {e.lineno}"
-                    if "'" in raw_body and '"' not in raw_body: hint = "⚠️ Single Quotes used"
-                    elif re.search(r',\s*\}', raw_body): hint = "⚠️ Trailing Comma"
-                    elif re.search(r'\bTrue\b', raw_body): hint = "⚠️ Capitalized Boolean"
-                    
-                    syntax_errs.append({
-                        "path": full_path, 
-                        "item_ref": item, 
-                        "body": raw_body, 
-                        "hint": hint
-                    })
-            
-            # 2. Missing Body Check (If Swagger is present)
-            # Only checking if body is empty AND Swagger requires it
-            if (not raw_body or raw_body == "{}") and swagger_data:
-                # ignore 'Old' APIs in missing check if needed, but logic is generic here
-                clean_path = normalize_url(url_raw)
-                paths = swagger_data.get('paths', {})
-                method = req_info.get('method', 'POST').lower()
-                
-                path_item = find_swagger_path(clean_path, paths)
-                if path_item:
-                    op = path_item.get(method)
-                    if op:
-                        hint_json = generate_body_hint_from_swagger(op, swagger_data)
-                        if hint_json: # If hint generated, means body is expected
-                            missing_bodies.append({
-                                "path": full_path,
-                                "item_ref": item,
-                                "url": clean_path,
-                                "hint": hint_json
-                            })
-
-    return syntax_errs, zero_warns, missing_bodies
+
+def bump_collection_version(mode):
+    """Marks the `mode` ('gen' / 'insp') collection as changed so its cached download is rebuilt"""
+    st.session_state[f"{mode}_version"] = st.session_state.get(f"{mode}_version", 0) + 1
+
+def cached_export(mode, fmt, build):
+    """Serialized collection for download, rebuilt only when the collection version or the format changes"""
+    key = (st.session_state.get(f"{mode}_version", 0), fmt)
+    cached = st.session_state.get(f"{mode}_export")
+    if cached is None or cached[0] != key:
+        trace = current_trace(mode)
+        with span(trace, f"export ({fmt})"):
+            cached = (key, build())
+        if trace is not None: log_trace(trace, start=len(trace['spans']) - 1)
+        st.session_state[f"{mode}_export"] = cached
+    return cached[1]
+
+def start_trace(mode):
+    """Fresh perf trace for a Generate / Analyze run, or None when instrumentation is off (the default)"""
+    if not st.session_state.get("perf_enabled"):
+        st.session_state[f"{mode}_perf"] = None
+        return None
+    configure_perf_log(os.environ.get("MALEKAH_PERF_LOG"))
+    trace = new_trace(PIPELINES[mode], st.session_state.get("perf_memory", False), user=st.session_state.get("auth_user", ""))
+    st.session_state[f"{mode}_perf"] = trace
+    return trace
+
+def current_trace(mode):
+    return st.session_state.get(f"{mode}_perf") if st.session_state.get("perf_enabled") else None
+
+def show_performance(mode):
+    trace = current_trace(mode)
+    if not trace: return
+    with st.expander("⏱️ Performance"):
+        total = sum(s['ms'] for s in trace['spans'])
+        st.caption(f"{PIPELINES[mode].title()} run: {total:,.0f} ms total. '↳' rows are summed over all requests inside the analysis stage.")
+        st.dataframe(trace_rows(trace))
+
+def download_name(name, fmt): return f"{name}.gz" if fmt == "gzip" else name
+
+def reanalyze_after_fixes(mode, touched):
+    """Re-analyzes only the edited requests and refreshes all finding lists of `mode` ('gen' / 'insp')"""
+    bump_collection_version(mode)
+    if mode == 'gen':
+        findings = (st.session_state['gen_syntax_errors'], st.session_state['gen_zero_warnings'], [], [])
+        s_err, z_warn, _, _ = reanalyze_touched(findings, touched, result_cache=st.session_state['gen_result_cache'])
+        st.session_state['gen_syntax_errors'] = s_err
+        st.session_state['gen_zero_warnings'] = z_warn
+        reset_finding_widgets("gen_syn_", "gen_zero_")
+    else:
+        findings = (st.session_state['insp_syntax_errors'], st.session_state['insp_zero_warnings'],
+                    st.session_state['insp_missing_bodies'], st.session_state['insp_schema_errors'])
+        s_err, z_warn, m_bodies, v_errs = reanalyze_touched(findings, touched, st.session_state['insp_swagger'],
+                                                            st.session_state['insp_templates'],
+                                                            result_cache=st.session_state['insp_result_cache'])
+        st.session_state['insp_syntax_errors'] = s_err
+        st.session_state['insp_zero_warnings'] = z_warn
+        st.session_state['insp_missing_bodies'] = m_bodies
+        st.session_state['insp_schema_errors'] = v_errs
+        reset_finding_widgets("insp_syn_", "insp_zero_", "insp_miss_", "insp_schema_")
+
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+
+def _store_edit(prefix, index):
+    st.session_state[f"{prefix}edits"][index] = st.session_state[f"{prefix}{index}"]
+
+def finding_folder(path):
+    return path.rsplit(" > ", 1)[0] if " > " in path else "(root)"
+
+def render_findings(prefix, findings, seed, describe, height=150, label="Body", validate=False):
+    """Paged, folder-grouped editor for one findings list. Only the current page gets widgets (and JSON
+    validation); edits are kept in `<prefix>edits` (index -> text) so bulk apply never needs all widgets."""
+    edits = st.session_state.setdefault(f"{prefix}edits", {})
+    c1, c2 = st.columns([1, 3])
+    page_size = c1.selectbox("Per page", PAGE_SIZE_OPTIONS, index=1, key=f"{prefix}page_size")
+    pages = max(1, -(-len(findings) // page_size))
+    if st.session_state.get(f"{prefix}page", 1) > pages: st.session_state[f"{prefix}page"] = pages
+    page = c2.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{prefix}page")
+    start = (page - 1) * page_size
+    visible = range(start, min(start + page_size, len(findings)))
+    for folder, indexes in groupby(visible, key=lambda i: finding_folder(findings[i]['path'])):
+        indexes = list(indexes)
+        with st.expander(f"📁 {folder} ({len(indexes)})", expanded=True):
+            for i in indexes:
+                f = findings[i]
+                describe(f)
+                key = f"{prefix}{i}"
+                if key not in st.session_state: st.session_state[key] = edits.get(i, seed(f))
+                txt = st.text_area(label, key=key, height=height, on_change=_store_edit, args=(prefix, i))
+                if validate:
+                    # An untouched syntax finding is known to be invalid, only edited text is parsed
+                    if txt == seed(f): st.caption("❌ Invalid")
+                    else:
+                        try: json.loads(txt); st.caption("✅ Valid")
+                        except ValueError: st.caption("❌ Invalid")
+                st.divider()
+
+def finding_body(f): return f['body']
+
+def finding_hint(f): return f['hint']
+
+def show_syntax_finding(f):
+    st.markdown(f"**📂 {f['path']}**")
+    st.caption(f"Error Hint: {f.get('hint', 'Unknown')}")
+
+def show_zero_finding(f, limit=20):
+    """One request, all its hits: detail plus the line in the body where it was found"""
+    st.markdown(f"**📂 {f['path']}** — {len(f['hits'])} issue(s)")
+    for hit in f['hits'][:limit]:
+        where = "" if hit.offset is None else f" (line {f['body'].count(chr(10), 0, hit.offset) + 1})"
+        st.caption(f"⚠️ Issue: {hit.detail}{where}")
+    if len(f['hits']) > limit: st.caption(f"… and {len(f['hits']) - limit} more")
+
+def show_schema_finding(f, limit=10):
+    """One request, its schema violations (field path: problem)"""
+    st.markdown(f"**📂 {f['path']}** — {len(f['errors'])} violation(s)")
+    for err in f['errors'][:limit]:
+        st.caption(f"🟣 {err}")
+    if len(f['errors']) > limit: st.caption(f"… and {len(f['errors']) - limit} more")
+
+def merge_change_rows(records, limit=5):
+    """Table rows for diff / merge records: request, where it is, what changed and the first body changes"""
+    return [{"request": r['key'], "path": r.get('new_path', r.get('path')), "fields": ", ".join(r.get('fields', ["body"])),
+             "changes": "; ".join(format_diff(d) for d in r['body_diffs'][:limit])} for r in records]
+
+def show_missing_finding(f):
+    st.markdown(f"**📂 {f['path']}**")
+    st.code(f['url'], language="http")
+    st.caption("Suggested Body (from Swagger Schema):")
+
+def collect_edits(prefix, findings, seed, only_changed=True):
+    """(finding, text) pairs from the stored edits plus any widget still on screen"""
+    edits = dict(st.session_state.get(f"{prefix}edits", {}))
+    for i in range(len(findings)):
+        if f"{prefix}{i}" in st.session_state: edits[i] = st.session_state[f"{prefix}{i}"]
+    pairs = []
+    for i, f in enumerate(findings):
+        txt = edits.get(i, seed(f))
+        if not only_changed or txt != seed(f): pairs.append((f, txt))
+    return pairs
+
+def apply_edits(mode, prefix, findings, seed, only_changed=True):
+    touched = []
+    for f, txt in collect_edits(prefix, findings, seed, only_changed):
+        f['item_ref']['request']['body']['raw'] = txt
+        touched.append(f)
+    reanalyze_after_fixes(mode, touched)
 
 
 # ==========================================
@@ -327,6 +231,7 @@ def check_password():
         if st.session_state["username"] in st.secrets["users"] and \
            st.session_state["password"] == st.secrets["users"][st.session_state["username"]]:
             st.session_state["password_correct"] = True
+            st.session_state["auth_user"] = st.session_state["username"]
             del st.session_state["password"]
             del st.session_state["username"]
         else:
@@ -354,7 +259,9 @@ if check_password():
     # Init Session State
     keys_to_init = [
         'gen_collection', 'gen_syntax_errors', 'gen_zero_warnings', 
-        'insp_collection', 'insp_syntax_errors', 'insp_zero_warnings', 'insp_missing_bodies', 'insp_filename', 'insp_swagger'
+        'insp_collection', 'insp_syntax_errors', 'insp_zero_warnings', 'insp_missing_bodies', 'insp_schema_errors', 'insp_filename', 'insp_swagger',
+        'insp_templates', 'insp_source', 'insp_spans', 'gen_result_cache', 'insp_result_cache',
+        'gen_latency', 'gen_load', 'merge_report', 'merge_records', 'merge_collection'
     ]
     for key in keys_to_init:
         if key not in st.session_state:
@@ -365,10 +272,16 @@ if check_password():
 
     with st.sidebar:
         st.header("📲 Select Mode")
-        app_mode = st.radio("Choose Function:", ["🚀 Generator (Excel -> Postman)", "🔍 Inspector (Fix Existing JSON)"])
+        app_mode = st.radio("Choose Function:", ["🚀 Generator (Excel -> Postman)", "🔍 Inspector (Fix Existing JSON)",
+                                                 "🔀 Merge (Fixed -> Regenerated)"])
+        st.markdown("---")
+        st.checkbox("⏱️ Performance instrumentation", key="perf_enabled",
+                    help="Times every stage of Generate / Analyze, shows it in a Performance panel and writes JSON log lines (stderr, or the file named by MALEKAH_PERF_LOG).")
+        st.checkbox("Track memory per stage (slower)", key="perf_memory", disabled=not st.session_state.get("perf_enabled"))
         st.markdown("---")
         if st.button("Logout"):
             del st.session_state["password_correct"]
+            st.session_state.pop("auth_user", None)
             st.rerun()
 
     # ------------------------------------------
@@ -381,6 +294,7 @@ if check_password():
         with st.sidebar:
             st.header("1. Upload Files")
             uploaded_csv = st.file_uploader("API URLs (CSV/Excel)", type=['csv', 'xlsx'])
+            all_sheets = st.checkbox("All sheets (one folder per sheet)", help="Reads every sheet of the workbook, one after another; otherwise only the first sheet is used.")
             uploaded_swagger_gen = st.file_uploader("Swagger JSON", type=['json'], key="sw_gen")
             
             st.header("2. Output Settings")
@@ -391,87 +305,30 @@ if check_password():
         if generate_btn and uploaded_csv and uploaded_swagger_gen:
             with st.spinner("Processing..."):
                 try:
-                    df = pd.read_csv(uploaded_csv) if uploaded_csv.name.endswith('.csv') else pd.read_excel(uploaded_csv)
-                    swagger = json.load(uploaded_swagger_gen)
-                    
-                    collection = {
-                        "info": {"name": coll_name, "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"}, 
-                        "item": [], 
-                        "variable": [{"key": "previous_response", "value": "", "type": "string"}, 
-                                     {"key": "previous_status", "value": "", "type": "string"},
-                                     {"key": "previous_time", "value": "0", "type": "string"}]
-                    }
-                    
-                    col_old, col_new = df.columns[0], df.columns[1]
-                    
-                    for index, row in df.iterrows():
-                        old_url = str(row[col_old]).strip()
-                        new_url_raw = str(row[col_new]).strip()
-                        
-                        if old_url == 'nan' or old_url == '': continue
-                        
-                        old_name = get_api_name_from_url(old_url)
-                        folder_name = f"{index + 1:02d}_{old_name}"
-                        
-                        body_content, desc, clean_new_url, has_new = "{}", "", "", False
-                        
-                        url_match = re.search(r'(https?://[^\s]+)', new_url_raw)
-                        if url_match and "---" not in new_url_raw:
-                            has_new = True
-                            clean_new_url = url_match.group(1)
-                            
-                            # Swagger Extraction
-                            path_match = re.search(r'/api/.*', clean_new_url)
-                            if path_match:
-                                rel_path = path_match.group(0)
-                                for s_path, details in swagger.get('paths', {}).items():
-                                    if s_path.lower() == rel_path.lower():
-                                        op = details.get(list(details.keys())[0], {})
-                                        desc = op.get('description', '')
-                                        body_content = extract_body_from_description(desc)
-                                        break
-                        
-                        folder = {"name": folder_name, "item": []}
-                        
-                        old_req = {
-                            "name": f"Old_{old_name}", 
-                            "event": [{"listen": "test", "script": {"exec": list(TEST_SCRIPT_OLD_BASE), "type": "text/javascript"}}], 
-                            "request": {
-                                "method": "POST", 
-                                "header": [{"key": "Content-Type", "value": "application/json"}], 
-                                "url": {"raw": old_url, "host": old_url.split('/')[2:3], "path": old_url.split('/')[3:]}, 
-                                "body": {"mode": "raw", "raw": body_content, "options": {"raw": {"language": "json"}}}
-                            }
-                        }
-                        
-                        if has_new:
-                            folder['item'].append(old_req)
-                            new_name = get_api_name_from_url(clean_new_url)
-                            new_req = {
-                                "name": f"New Core_{new_name}", 
-                                "event": [{"listen": "test", "script": {"exec": TEST_SCRIPT_NEW_SMART, "type": "text/javascript"}}], 
-                                "request": {
-                                    "method": "POST", 
-                                    "header": [{"key": "Content-Type", "value": "application/json"}], 
-                                    "url": {"raw": clean_new_url, "host": clean_new_url.split('/')[2:3], "path": clean_new_url.split('/')[3:]}, 
-                                    "body": {"mode": "raw", "raw": body_content, "options": {"raw": {"language": "json"}}}, 
-                                    "description": desc
-                                }
-                            }
-                            folder['item'].append(new_req)
-                        else:
-                            old_req['event'][0]['script']['exec'] += TEST_SCRIPT_CANCELLED
-                            folder['item'].append(old_req)
-                            
-                        collection['item'].append(folder)
+                    trace = start_trace('gen')
+                    with span(trace, "parse sheet"):
+                        if all_sheets: sheets = cached_upload("sheets", uploaded_csv, parse_url_sheets)
+                        else: df = cached_upload("sheet", uploaded_csv, parse_url_table)
+                    with span(trace, "parse swagger"):
+                        swagger_bundle = cached_upload("swagger", uploaded_swagger_gen, parse_swagger)
+                    with span(trace, "generate collection"):
+                        if all_sheets: collection = generate_workbook_collection(sheets, swagger_bundle['swagger'], coll_name, swagger_bundle['templates'])
+                        else: collection = generate_collection(df, swagger_bundle['swagger'], coll_name, swagger_bundle['templates'])
                     
                     # Store Result
                     st.session_state['gen_collection'] = collection
+                    st.session_state['gen_latency'] = None
+                    st.session_state['gen_load'] = None
+                    bump_collection_version('gen')
                     
                     # Auto Analyze Generated Collection (Syntax/Zeros)
-                    s_err, z_warn, _ = analyze_collection_recursively(collection['item'], None)
+                    st.session_state['gen_result_cache'] = {}
+                    reset_finding_widgets("gen_syn_", "gen_zero_")
+                    with span(trace, "analyze"):
+                        s_err, z_warn, _, _ = analyze_collection_recursively(collection['item'], None, result_cache=st.session_state['gen_result_cache'], trace=trace)
                     st.session_state['gen_syntax_errors'] = s_err
                     st.session_state['gen_zero_warnings'] = z_warn
+                    if trace is not None: log_trace(trace)
                     st.success("Generation Complete!")
                     
                 except Exception as e:
@@ -486,47 +343,87 @@ if check_password():
             m1, m2, m3 = st.columns(3)
             m1.metric("Generated Folders", len(col_data['item']))
             m2.metric("Syntax Issues", len(s_errors), delta_color="inverse")
-            m3.metric("Zero/GUID Warnings", len(z_warns), delta_color="inverse")
+            m3.metric("Zero/GUID Warnings", zero_hit_count(z_warns), delta_color="inverse", help=f"in {len(z_warns)} requests")
             
             tab1, tab2 = st.tabs(["🔴 Fix Syntax (Generated)", "🟡 Fix Zeros (Generated)"])
             
             with tab1:
                 if not s_errors: st.success("✅ JSON Syntax is perfect.")
                 else:
-                    for i, err in enumerate(s_errors):
-                        st.markdown(f"**📂 {err['path']}**")
-                        st.caption(f"Error Hint: {err.get('hint', 'Unknown')}")
-                        key = f"gen_syn_{i}"
-                        if key not in st.session_state: st.session_state[key] = err['body']
-                        txt = st.text_area("Body", key=key, height=120)
-                        try: json.loads(txt); st.caption("✅ Valid")
-                        except: st.caption("❌ Invalid")
-                        st.divider()
+                    render_findings("gen_syn_", s_errors, finding_body, show_syntax_finding, height=120, validate=True)
                     
                     if st.button("💾 Apply Syntax Fixes"):
-                        for i, err in enumerate(s_errors):
-                            err['item_ref']['request']['body']['raw'] = st.session_state.get(f"gen_syn_{i}", err['body'])
-                        st.session_state['gen_syntax_errors'] = []
+                        apply_edits('gen', "gen_syn_", s_errors, finding_body)
                         st.rerun()
 
             with tab2:
                 if not z_warns: st.success("✅ No Zero Value/Empty GUID warnings.")
                 else:
-                    for i, warn in enumerate(z_warns):
-                        st.markdown(f"**📂 {warn['path']}**")
-                        st.caption(f"⚠️ Issue: {warn['detail']}")
-                        key = f"gen_zero_{i}"
-                        if key not in st.session_state: st.session_state[key] = warn['body']
-                        txt = st.text_area("Body", key=key, height=120)
-                        st.divider()
+                    render_findings("gen_zero_", z_warns, finding_body, show_zero_finding, height=120)
                     
                     if st.button("💾 Apply Zero Fixes"):
-                        for i, warn in enumerate(z_warns):
-                            warn['item_ref']['request']['body']['raw'] = st.session_state.get(f"gen_zero_{i}", warn['body'])
-                        st.session_state['gen_zero_warnings'] = []
+                        apply_edits('gen', "gen_zero_", z_warns, finding_body)
                         st.rerun()
 
-            st.download_button("📥 Download Generated Collection", json.dumps(col_data, indent=4, ensure_ascii=False), file_name, "application/json", type="primary")
+            gen_fmt = st.selectbox("Download format", EXPORT_FORMATS, format_func=EXPORT_LABELS.get, key="gen_export_fmt")
+            out_data = cached_export('gen', gen_fmt, lambda: encode_collection(col_data, gen_fmt))
+            st.download_button("📥 Download Generated Collection", out_data, download_name(file_name, gen_fmt), EXPORT_MIME[gen_fmt], type="primary")
+            show_performance('gen')
+
+            with st.expander("⏱️ Latency Benchmark (Old vs New)"):
+                st.caption("Sends warm-up rounds, then interleaved measured rounds per Old/New pair. A folder is a regression "
+                           "only when the confidence interval of the median slowdown is above max(1.5x, +200ms).")
+                b1, b2, b3 = st.columns(3)
+                warmup = b1.number_input("Warm-up rounds", 0, 50, 3)
+                measured = b2.number_input("Measured rounds", 1, 500, 20)
+                concurrency = b3.number_input("Concurrency", 1, 64, 4)
+                variables_text = st.text_area("Variables (KEY=VALUE per line)", "", height=80, key="gen_latency_vars")
+                if st.button("▶️ Run Benchmark"):
+                    variables = dict(line.split("=", 1) for line in variables_text.splitlines() if "=" in line)
+                    with st.spinner("Benchmarking..."):
+                        results = run_benchmark(col_data, int(warmup), int(measured), int(concurrency), variables=variables)
+                    st.session_state['gen_latency'] = benchmark_rows(results)
+                rows = st.session_state['gen_latency']
+                if rows is not None:
+                    if not rows: st.info("No Old/New pairs to benchmark.")
+                    else:
+                        regressions = sum(1 for r in rows if r['status'] == "regression")
+                        if regressions: st.error(f"{regressions} folder(s) regressed.")
+                        else: st.success("✅ No significant latency regressions.")
+                        st.dataframe(rows)
+                        st.download_button("📥 Download Latency Report (CSV)", rows_to_csv(rows), "latency_per_folder.csv", "text/csv")
+
+            with st.expander("🔥 Load Test (Old vs New)"):
+                st.caption("Each concurrency level runs closed-loop workers for the stage duration against the Old endpoints, "
+                           "then the New ones. An API is flagged when New errors (5xx / 429 / transport) 1 point more often "
+                           "or its p95 exceeds max(1.5x, +200ms) of Old.")
+                l1, l2 = st.columns(2)
+                ramp_text = l1.text_input("Concurrency ramp", "1,10,50")
+                stage_seconds = l2.number_input("Seconds per stage", 1, 600, 10)
+                load_vars_text = st.text_area("Variables (KEY=VALUE per line)", "", height=80, key="gen_load_vars")
+                if st.button("▶️ Run Load Test"):
+                    try:
+                        ramp = parse_ramp(ramp_text)
+                    except ValueError as e:
+                        st.error(str(e))
+                    else:
+                        variables = dict(line.split("=", 1) for line in load_vars_text.splitlines() if "=" in line)
+                        bar = st.progress(0.0, text="Running load test...")
+                        progress = lambda done, total: bar.progress(done / total, text=f"Stage {done}/{total}")
+                        result = run_load_test(col_data, ramp, float(stage_seconds), variables=variables, progress=progress)
+                        for s in result['skipped']: st.warning(f"Skipped {s['folder']}: {s['reason']}")
+                        st.session_state['gen_load'] = load_rows(result)
+                rows = st.session_state['gen_load']
+                if rows is not None:
+                    if not rows: st.info("No Old/New pairs to load test.")
+                    else:
+                        totals = [r for r in rows if r['folder'] == TOTAL_FOLDER]
+                        flagged = sum(1 for r in rows if r['folder'] != TOTAL_FOLDER and r['status'] in ("errors", "slower"))
+                        if flagged: st.error(f"{flagged} API/level result(s) flagged.")
+                        else: st.success("✅ New APIs held up at every level.")
+                        st.dataframe(totals)
+                        st.dataframe([r for r in rows if r['folder'] != TOTAL_FOLDER])
+                        st.download_button("📥 Download Load Report (CSV)", rows_to_csv(rows), "load_test.csv", "text/csv")
 
     # ------------------------------------------
     # MODE 2: INSPECTOR (check_json_and_zeros + catch_emptyBody logic)
@@ -538,22 +435,51 @@ if check_password():
         with st.sidebar:
             uploaded_insp_file = st.file_uploader("Upload Collection JSON", type=['json'])
             uploaded_swagger_insp = st.file_uploader("Upload Swagger (Optional for Body Hints)", type=['json'], key="sw_insp")
+            low_memory = st.checkbox("Low-memory mode (huge collections)", help="Streams the collection top-level item by top-level item and keeps only requests in memory; example responses are copied back from the original file on download. A collection wrapped in a single root folder is still read whole.")
             
             if uploaded_insp_file:
                 if st.button("🔍 Analyze File", type="primary"):
                     try:
-                        loaded_json = json.load(uploaded_insp_file)
-                        swagger_data = json.load(uploaded_swagger_insp) if uploaded_swagger_insp else None
+                        trace = start_trace('insp')
+                        # Swagger and its request templates are built once per document and reused on later reruns
+                        with span(trace, "parse swagger"):
+                            swagger_bundle = cached_upload("swagger", uploaded_swagger_insp, parse_swagger) if uploaded_swagger_insp else None
+                        swagger_data = swagger_bundle['swagger'] if swagger_bundle else None
+                        templates = swagger_bundle['templates'] if swagger_bundle else None
+                        
+                        # Per-request results of this (collection, Swagger) pair, shared with other sessions via the disk cache
+                        results_key = cache_key("results", upload_digest(uploaded_insp_file), upload_digest(uploaded_swagger_insp))
+                        result_cache = disk_get(disk_cache(), results_key) or {}
+                        known_results = len(result_cache)
+                        if low_memory:
+                            source = uploaded_insp_file.getvalue()
+                            with span(trace, "stream + analyze"):
+                                lean_items, spans, s_err, z_warn, m_bodies, v_errs = analyze_collection_stream(source, swagger_data, templates, result_cache, trace)
+                            loaded_json = {"item": lean_items}
+                            st.session_state['insp_source'] = source
+                            st.session_state['insp_spans'] = spans
+                        else:
+                            with span(trace, "parse upload"):
+                                loaded_json = json.load(uploaded_insp_file)
+                            with span(trace, "analyze"):
+                                s_err, z_warn, m_bodies, v_errs = analyze_collection_recursively(collection_items(loaded_json), swagger_data, templates=templates, result_cache=result_cache, trace=trace)
+                            st.session_state['insp_source'] = None
+                            st.session_state['insp_spans'] = None
                         
                         st.session_state['insp_collection'] = loaded_json
+                        bump_collection_version('insp')
                         st.session_state['insp_filename'] = f"Fixed_{uploaded_insp_file.name}"
                         st.session_state['insp_swagger'] = swagger_data
-                        
-                        s_err, z_warn, m_bodies = analyze_collection_recursively(loaded_json.get('item', []), swagger_data)
+                        st.session_state['insp_templates'] = templates
+                        st.session_state['insp_result_cache'] = result_cache
+                        if len(result_cache) != known_results: disk_put(disk_cache(), results_key, result_cache, "results")
+                        reset_finding_widgets("insp_syn_", "insp_zero_", "insp_miss_", "insp_schema_")
                         
                         st.session_state['insp_syntax_errors'] = s_err
                         st.session_state['insp_zero_warnings'] = z_warn
                         st.session_state['insp_missing_bodies'] = m_bodies
+                        st.session_state['insp_schema_errors'] = v_errs
+                        if trace is not None: log_trace(trace)
                     except Exception as e: st.error(f"Invalid JSON: {e}")
 
         if st.session_state['insp_collection']:
@@ -561,55 +487,35 @@ if check_password():
             s_errors = st.session_state['insp_syntax_errors']
             z_warns = st.session_state['insp_zero_warnings']
             m_bodies = st.session_state['insp_missing_bodies']
+            v_errs = st.session_state['insp_schema_errors']
             
             st.markdown(f"### File: `{st.session_state.get('insp_filename', 'collection.json')}`")
-            m1, m2, m3 = st.columns(3)
+            m1, m2, m3, m4 = st.columns(4)
             m1.metric("Syntax Errors", len(s_errors), delta_color="inverse")
-            m2.metric("Zero/GUID Warnings", len(z_warns), delta_color="inverse")
+            m2.metric("Zero/GUID Warnings", zero_hit_count(z_warns), delta_color="inverse", help=f"in {len(z_warns)} requests")
             m3.metric("Missing Bodies", len(m_bodies), delta_color="inverse")
+            m4.metric("Schema Violations", sum(len(f['errors']) for f in v_errs), delta_color="inverse", help=f"in {len(v_errs)} requests")
 
-            tab_i1, tab_i2, tab_i3 = st.tabs(["🔴 Fix Syntax", "🟡 Fix Zeros", "🔵 Missing Bodies"])
+            tab_i1, tab_i2, tab_i3, tab_i4 = st.tabs(["🔴 Fix Syntax", "🟡 Fix Zeros", "🔵 Missing Bodies", "🟣 Schema Violations"])
             
             with tab_i1:
                 if not s_errors: st.success("✅ Clean")
                 else:
                     st.warning(f"Found {len(s_errors)} Syntax errors.")
-                    for i, err in enumerate(s_errors):
-                        st.markdown(f"**📂 {err['path']}**")
-                        st.caption(f"Hint: {err.get('hint', '')}")
-                        key = f"insp_syn_{i}"
-                        if key not in st.session_state: st.session_state[key] = err['body']
-                        txt = st.text_area("Body", key=key, height=150)
-                        try: json.loads(txt); st.caption("✅ Valid")
-                        except: st.caption("❌ Invalid")
-                        st.divider()
+                    render_findings("insp_syn_", s_errors, finding_body, show_syntax_finding, validate=True)
                     
                     if st.button("💾 Apply Syntax Fixes"):
-                        new_errors = []
-                        for i, err in enumerate(s_errors):
-                            txt = st.session_state.get(f"insp_syn_{i}", err['body'])
-                            err['item_ref']['request']['body']['raw'] = txt
-                            try: json.loads(txt)
-                            except: new_errors.append(err)
-                        st.session_state['insp_syntax_errors'] = new_errors
+                        apply_edits('insp', "insp_syn_", s_errors, finding_body)
                         st.rerun()
 
             with tab_i2:
                 if not z_warns: st.success("✅ Clean")
                 else:
-                    st.warning(f"Found {len(z_warns)} Zero Value/Empty GUID warnings.")
-                    for i, warn in enumerate(z_warns):
-                        st.markdown(f"**📂 {warn['path']}**")
-                        st.caption(f"⚠️ Issue: {warn['detail']}")
-                        key = f"insp_zero_{i}"
-                        if key not in st.session_state: st.session_state[key] = warn['body']
-                        txt = st.text_area("Body", key=key, height=150)
-                        st.divider()
+                    st.warning(f"Found {zero_hit_count(z_warns)} Zero Value/Empty GUID warnings in {len(z_warns)} requests.")
+                    render_findings("insp_zero_", z_warns, finding_body, show_zero_finding)
                     
                     if st.button("💾 Apply Zero Fixes"):
-                        for i, warn in enumerate(z_warns):
-                            warn['item_ref']['request']['body']['raw'] = st.session_state.get(f"insp_zero_{i}", warn['body'])
-                        st.session_state['insp_zero_warnings'] = []
+                        apply_edits('insp', "insp_zero_", z_warns, finding_body)
                         st.rerun()
             
             with tab_i3:
@@ -617,27 +523,104 @@ if check_password():
                     st.success("✅ All requests have bodies (or Swagger not provided).")
                 else:
                     st.info(f"Found {len(m_bodies)} requests empty in Postman but required in Swagger.")
-                    for i, miss in enumerate(m_bodies):
-                        st.markdown(f"**📂 {miss['path']}**")
-                        st.code(miss['url'], language="http")
-                        key = f"insp_miss_{i}"
-                        st.caption("Suggested Body (from Swagger Schema):")
-                        # Here we use text_area to allow user to verify before applying
-                        if key not in st.session_state: st.session_state[key] = miss['hint']
-                        txt = st.text_area("Body to Insert", key=key, height=200)
-                        st.divider()
+                    # Here we use text_area to allow user to verify before applying
+                    render_findings("insp_miss_", m_bodies, finding_hint, show_missing_finding, height=200, label="Body to Insert")
                     
                     if st.button("💾 Fill Missing Bodies"):
-                        for i, miss in enumerate(m_bodies):
-                            txt = st.session_state.get(f"insp_miss_{i}", miss['hint'])
-                            miss['item_ref']['request']['body']['raw'] = txt
-                        st.session_state['insp_missing_bodies'] = []
+                        apply_edits('insp', "insp_miss_", m_bodies, finding_hint, only_changed=False)
                         st.success("Bodies Filled Successfully!")
                         st.rerun()
 
+            with tab_i4:
+                if not v_errs:
+                    st.success("✅ All bodies match their Swagger schemas (or Swagger not provided).")
+                else:
+                    st.warning(f"Found {len(v_errs)} requests whose body does not match the Swagger request schema.")
+                    render_findings("insp_schema_", v_errs, finding_body, show_schema_finding, height=200)
+                    
+                    if st.button("💾 Apply Schema Fixes"):
+                        apply_edits('insp', "insp_schema_", v_errs, finding_body)
+                        st.rerun()
+
             st.divider()
             if not st.session_state['insp_syntax_errors']:
                 out_name = st.session_state.get('insp_filename', 'Fixed_Collection.json')
-                st.download_button(f"📥 Download {out_name}", json.dumps(col_data, indent=4, ensure_ascii=False), out_name, "application/json", type="primary")
+                insp_fmt = st.selectbox("Download format", EXPORT_FORMATS, format_func=EXPORT_LABELS.get, key="insp_export_fmt")
+                if st.session_state['insp_source'] is not None:
+                    # Low-memory mode keeps the uploaded formatting, only gzip changes the output
+                    build = lambda: export_streamed_collection(st.session_state['insp_source'], st.session_state['insp_spans'], col_data['item'])
+                    if insp_fmt == "gzip": out_data = cached_export('insp', insp_fmt, lambda: gzip_chunks([build()]))
+                    else: out_data = cached_export('insp', insp_fmt, build)
+                else:
+                    out_data = cached_export('insp', insp_fmt, lambda: encode_collection(col_data, insp_fmt))
+                st.download_button(f"📥 Download {download_name(out_name, insp_fmt)}", out_data, download_name(out_name, insp_fmt), EXPORT_MIME[insp_fmt], type="primary")
             else:
-                st.error("⚠️ Please fix all Red Syntax Errors before downloading.")
\ No newline at end of file
+                st.error("⚠️ Please fix all Red Syntax Errors before downloading.")
+            show_performance('insp')
+
+    # ------------------------------------------
+    # MODE 3: MERGE (regenerated collection + hand-fixed one)
+    # ------------------------------------------
+    elif app_mode == "🔀 Merge (Fixed -> Regenerated)":
+        st.subheader("🔀 Merge Mode")
+        st.info("Compare a regenerated collection with the hand-fixed one and carry the manual body fixes over.")
+
+        with st.sidebar:
+            uploaded_fixed = st.file_uploader("Hand-fixed Collection (from Inspector)", type=['json'], key="merge_fixed")
+            uploaded_regen = st.file_uploader("Regenerated Collection (from Generator)", type=['json'], key="merge_regen")
+            uploaded_base = st.file_uploader("Originally Generated Collection (optional, 3-way merge)", type=['json'], key="merge_base")
+
+            if uploaded_fixed and uploaded_regen and st.button("🔀 Compare & Merge", type="primary"):
+                try:
+                    trace = start_trace('merge')
+                    with span(trace, "parse uploads"):
+                        fixed = json.loads(uploaded_fixed.getvalue())
+                        regenerated = json.loads(uploaded_regen.getvalue())
+                        base = json.loads(uploaded_base.getvalue()) if uploaded_base else None
+                    with span(trace, "diff"):
+                        report = diff_collections(fixed.get('item', []), regenerated.get('item', []))
+                    with span(trace, "merge"):
+                        records = merge_fixes(fixed.get('item', []), regenerated.get('item', []), base.get('item', []) if base else None)
+                    st.session_state['merge_report'] = report
+                    st.session_state['merge_records'] = records
+                    st.session_state['merge_collection'] = regenerated
+                    st.session_state['merge_filename'] = f"Merged_{uploaded_regen.name}"
+                    bump_collection_version('merge')
+                    if trace is not None: log_trace(trace)
+                except Exception as e: st.error(f"Invalid JSON: {e}")
+
+        if st.session_state['merge_report']:
+            report, records = st.session_state['merge_report'], st.session_state['merge_records']
+            carried = [r for r in records if r['action'] == "carried"]
+            conflicts = [r for r in records if r['action'] == "conflict"]
+
+            m1, m2, m3, m4, m5 = st.columns(5)
+            m1.metric("Added", report['summary']['added'])
+            m2.metric("Removed", report['summary']['removed'], delta_color="inverse")
+            m3.metric("Changed", report['summary']['changed'])
+            m4.metric("Fixes Carried", len(carried))
+            m5.metric("Conflicts", len(conflicts), delta_color="inverse")
+
+            tab_m1, tab_m2, tab_m3, tab_m4 = st.tabs(["🟢 Added", "🔴 Removed", "🟡 Changed", "🔀 Carried / Conflicts"])
+            with tab_m1:
+                if not report['added']: st.success("✅ No new requests.")
+                else: st.dataframe(report['added'])
+            with tab_m2:
+                if not report['removed']: st.success("✅ No removed requests.")
+                else: st.dataframe(report['removed'])
+            with tab_m3:
+                if not report['changed']: st.success("✅ No changed requests.")
+                else: st.dataframe(merge_change_rows(report['changed']))
+            with tab_m4:
+                if conflicts:
+                    st.warning(f"{len(conflicts)} bodies were fixed by hand and regenerated differently; the regenerated body was kept.")
+                    st.dataframe(merge_change_rows(conflicts))
+                if carried: st.dataframe(merge_change_rows(carried))
+                elif not conflicts: st.info("No manual fixes to carry over.")
+
+            st.divider()
+            out_name = st.session_state.get('merge_filename', 'Merged_Collection.json')
+            merge_fmt = st.selectbox("Download format", EXPORT_FORMATS, format_func=EXPORT_LABELS.get, key="merge_export_fmt")
+            out_data = cached_export('merge', merge_fmt, lambda: encode_collection(st.session_state['merge_collection'], merge_fmt))
+            st.download_button(f"📥 Download {download_name(out_name, merge_fmt)}", out_data, download_name(out_name, merge_fmt), EXPORT_MIME[merge_fmt], type="primary")
+            show_performance('merge')
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Benchmark: extract_body_from_description (raw_decode for valid bodies, a quick pass for the common fixes,
+the single-pass tokenizer for the rest) vs the previous five-pass regex implementation, on large Swagger
+description fields.
+
+    python benchmarks/bench_body_repair.py
+"""
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_core import extract_body_with_fixes
+
+
+def extract_body_regex(description):
+    """Previous implementation, kept here as the baseline"""
+    if not description: return "{}"
+    match = re.search(r'Request Body Example--\s*(\{[\s\S]*?\})(\s*--Response--|$)', description, re.IGNORECASE)
+    if match:
+        raw_body = match.group(1).strip()
+        raw_body = re.sub(r',\s*\}', '}', raw_body)
+        raw_body = re.sub(r',\s*\]', ']', raw_body)
+        raw_body = re.sub(r'\bTrue\b', 'true', raw_body)
+        raw_body = re.sub(r'\bFalse\b', 'false', raw_body)
+        raw_body = re.sub(r'\/\/.*', '', raw_body)
+        return raw_body
+    return "{}"
+
+
+def body_example(rows, sloppy):
+    """Bulk body with `rows` nested records; `sloppy` adds trailing commas, True/False and // comments"""
+    lines = ['{', '  "batch": {"source": "excel", "rows": [']
+    for i in range(rows):
+        flag = "True" if sloppy else "true"
+        comma = "," if sloppy or i < rows - 1 else ""
+        comment = f"  // row {i}" if sloppy else ""
+        lines.append(f'    {{"id": {i}, "name": "item {i}", "active": {flag}, "meta": {{"ref": "R-{i}", "tags": ["a", "b"]}}}}{comma}{comment}')
+    lines.append('  ]}' + (',' if sloppy else ''))
+    lines.append('}')
+    return "\n".join(lines)
+
+
+def description(rows, sloppy):
+    return ("Creates the records in one call.\n\nRequest Body Example-- " + body_example(rows, sloppy) +
+            "\n--Response-- " + json.dumps({"success": True, "data": {"count": rows}}))
+
+
+def _is_json(text):
+    try: json.loads(text)
+    except ValueError: return False
+    return True
+
+
+def run(name, text, number, valid=True):
+    body, fixes = extract_body_with_fixes(text)
+    if valid: json.loads(body)
+    old = min(timeit.repeat(lambda: extract_body_regex(text), number=number, repeat=3)) / number
+    new = min(timeit.repeat(lambda: extract_body_with_fixes(text), number=number, repeat=3)) / number
+    print(f"{name:<34} {len(text) / 1e3:7.0f} KB   regex {old * 1000:8.2f} ms   single-pass {new * 1000:8.2f} ms   "
+          f"fixes: {', '.join(fixes) or '-'}")
+
+
+if __name__ == "__main__":
+    run("valid body, 2k rows", description(2_000, False), 20)
+    run("valid body, 20k rows", description(20_000, False), 3)
+    run("sloppy body, 2k rows", description(2_000, True), 20)
+    run("sloppy body, 20k rows", description(20_000, True), 3)
+    # Correctness, not speed: the regex drops a body followed by free text and cuts '//' inside strings
+    noted = "Request Body Example-- " + body_example(200, True) + "\nNote: ids come from the catalog {}."
+    with_url = 'Request Body Example-- {"callback": "https://hooks.example.com/done", "retry": True,}'
+    for name, text in (("body followed by notes", noted), ("URL inside a string", with_url)):
+        body, fixes = extract_body_with_fixes(text)
+        legacy = extract_body_regex(text)
+        print(f"{name:<34} regex valid JSON: {_is_json(legacy)} ({len(legacy)} chars)   "
+              f"single-pass valid JSON: {_is_json(body)} ({len(body)} chars)")
@@ -0,0 +1,141 @@
+"""Benchmark harness for the core hot paths: time and peak memory per stage on synthetic data.
+
+    python benchmarks/bench_core.py                          # small + medium
+    python benchmarks/bench_core.py --sizes large xl --json after.json
+    python benchmarks/bench_core.py --baseline before.json   # exit 1 if a stage got slower than --tolerance
+    python benchmarks/bench_core.py --sizes large --profile analyze_collection
+
+Timings are the best of several repeats (input generation is never timed); peak memory comes from a separate
+tracemalloc run so tracing overhead does not leak into the times.
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from hub_core import (
+    analyze_collection_recursively, build_request_templates, encode_collection, find_request_template, find_swagger_path,
+    find_zero_values, generate_body_hint_from_swagger, generate_collection, normalize_url, prepare_swagger,
+    read_url_table, validate_request_body
+)
+from hub_perf import measure_peak, profiled
+from synthetic import make_collection, make_swagger, make_url_table
+
+# name -> (requests / sheet rows, Swagger paths)
+SIZES = {"small": (100, 100), "medium": (1_000, 500), "large": (10_000, 1_000), "xl": (100_000, 5_000)}
+STAGES = ("prepare_swagger", "find_swagger_path", "generate_dummy_data", "request_templates", "find_zero_values",
+          "validate_bodies", "analyze_collection", "read_url_csv", "read_url_xlsx", "generate_collection", "encode_collection")
+
+
+def url_table_files(sheet, extra_columns=6):
+    """(CSV bytes, .xlsx bytes) of the URL sheet, padded with columns the Generator never reads like real workbooks"""
+    wide = sheet.assign(**{f"Notes {k}": f"migration note {k}" for k in range(extra_columns)})
+    buf = io.BytesIO()
+    wide.to_excel(buf, index=False)
+    return wide.to_csv(index=False).encode('utf-8'), buf.getvalue()
+
+
+def build_stages(requests, paths):
+    """Stage name -> zero-argument callable, all inputs prepared up front"""
+    swagger = make_swagger(paths)
+    bundle = prepare_swagger(swagger)
+    collection = make_collection(requests, paths)
+    items = collection['item']
+    urls = [normalize_url(r['request']['url']) for f in items for r in f['item']]
+    bodies, targets = [], []
+    for f in items:
+        for r in f['item']:
+            try: bodies.append(json.loads(r['request']['body']['raw']))
+            except ValueError: continue
+            targets.append((bodies[-1], find_request_template(r['request']['url']['raw'], bundle['templates'], 'post')))
+    operations = [op for ops in swagger['paths'].values() for op in ops.values()]
+    sheet = make_url_table(requests, paths)
+    sheet_csv, sheet_xlsx = url_table_files(sheet)
+    templates = bundle['templates']
+    generated = generate_collection(sheet, swagger, "Bench", templates)
+
+    return {
+        "prepare_swagger": lambda: prepare_swagger(swagger),
+        "find_swagger_path": lambda: [find_swagger_path(u, templates['by_path'], templates['index']) for u in urls],
+        "generate_dummy_data": lambda: (lambda cache: [generate_body_hint_from_swagger(op, swagger, cache) for op in operations])({}),
+        "request_templates": lambda: build_request_templates(swagger),
+        "find_zero_values": lambda: [find_zero_values(b) for b in bodies],
+        "validate_bodies": lambda: [validate_request_body(b, tpl, templates) for b, tpl in targets if tpl],
+        "analyze_collection": lambda: analyze_collection_recursively(items, swagger, "", templates),
+        "read_url_csv": lambda: read_url_table(io.BytesIO(sheet_csv), "bench.csv"),
+        "read_url_xlsx": lambda: read_url_table(io.BytesIO(sheet_xlsx), "bench.xlsx"),
+        "generate_collection": lambda: generate_collection(sheet, swagger, "Bench", templates),
+        "encode_collection": lambda: encode_collection(generated, "pretty"),
+    }
+
+
+def time_stage(func, budget=1.0, max_repeat=5):
+    """Best wall time over up to `max_repeat` runs, stopping once `budget` seconds were spent"""
+    best, spent, runs = None, 0.0, 0
+    while runs < max_repeat and (runs == 0 or spent < budget):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        runs += 1
+    return best
+
+
+def run(sizes, stages, profile_stage=None):
+    results = []
+    for size in sizes:
+        requests, paths = SIZES[size]
+        funcs = build_stages(requests, paths)
+        for stage in stages:
+            if stage == profile_stage:
+                with profiled(f"bench_{size}_{stage}.prof", memory_top=10):
+                    funcs[stage]()
+            seconds = time_stage(funcs[stage])
+            _, peak = measure_peak(funcs[stage])
+            results.append({"size": size, "requests": requests, "paths": paths, "stage": stage,
+                            "ms": round(seconds * 1000, 2), "peak_mib": round(peak / 2**20, 2)})
+            print(f"{size:<7} {requests:>7} req {paths:>5} paths  {stage:<20} {seconds * 1000:10.2f} ms  {peak / 2**20:9.2f} MiB",
+                  flush=True)
+    return results
+
+
+def regressions(results, baseline, tolerance, min_ms=5.0):
+    """Stages slower than baseline * tolerance (ignoring anything under `min_ms`)"""
+    before = {(r['size'], r['stage']): r for r in baseline}
+    slower = []
+    for r in results:
+        old = before.get((r['size'], r['stage']))
+        if old and r['ms'] > max(old['ms'] * tolerance, min_ms):
+            slower.append(f"{r['size']}/{r['stage']}: {old['ms']:.1f} ms -> {r['ms']:.1f} ms")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=["small", "medium"])
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Results of a previous --json run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="Allowed slowdown factor vs the baseline")
+    parser.add_argument("--profile", choices=STAGES, help="Also run this stage under cProfile + tracemalloc")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.stages, args.profile)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as fh:
+            slower = regressions(results, json.load(fh), args.tolerance)
+        for line in slower: print(f"REGRESSION {line}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Benchmark: iterative find_zero_values vs the previous recursive implementation.
+
+    python benchmarks/bench_find_zero_values.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_core import ALLOWED_ZERO_KEYS, find_zero_values
+
+
+def find_zero_values_recursive(data, path=""):
+    """Previous implementation, kept here as the baseline"""
+    findings = []
+    if isinstance(data, dict):
+        for key, value in data.items():
+            new_path = f"{path}.{key}" if path else key
+            findings.extend(find_zero_values_recursive(value, new_path))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            new_path = f"{path}[{index}]"
+            findings.extend(find_zero_values_recursive(value, new_path))
+    elif isinstance(data, str):
+        if re.match(r'^[0-]+$', data) and '0' in data and len(data) > 5:
+            findings.append(f"{path} = \"{data}\" (Empty GUID 🚨)")
+    elif isinstance(data, (int, float)):
+        if isinstance(data, bool): return []
+        if data == 0:
+            current_key = path.split('.')[-1]
+            if current_key not in ALLOWED_ZERO_KEYS:
+                findings.append(f"{path} = {data} (Zero Value ⚠️)")
+    return findings
+
+
+def bulk_import_payload(rows):
+    """Wide payload: a bulk-import body with `rows` records, few of them zero"""
+    return {"batchId": "00000000-0000-0000-0000-000000000000", "items": [
+        {"id": i + 1, "name": f"item {i}", "price": 0, "qty": 0 if i % 50 == 0 else i,
+         "tags": ["a", "b", str(i)], "meta": {"createdBy": "qa", "flag": True, "ref": f"R-{i}"}}
+        for i in range(rows)
+    ]}
+
+
+def deep_payload(depth):
+    """Deep payload: `depth` nested objects with a zero at the bottom"""
+    node = {"leafId": 0}
+    for i in range(depth):
+        node = {f"level{i}": node, "count": i + 1}
+    return node
+
+
+def run(name, payload, number):
+    assert find_zero_values(payload) == find_zero_values_recursive(payload)
+    old = min(timeit.repeat(lambda: find_zero_values_recursive(payload), number=number, repeat=3)) / number
+    new = min(timeit.repeat(lambda: find_zero_values(payload), number=number, repeat=3)) / number
+    print(f"{name:<28} recursive {old * 1000:9.2f} ms   iterative {new * 1000:9.2f} ms   speedup x{old / new:5.2f}")
+
+
+if __name__ == "__main__":
+    run("bulk import 1k rows", bulk_import_payload(1_000), 20)
+    run("bulk import 20k rows", bulk_import_payload(20_000), 3)
+    run("deep nesting 400 levels", deep_payload(400), 50)
@@ -0,0 +1,62 @@
+"""Benchmark: hub_diff.diff_json vs the previous recursive find_json_diffs on multi-MB responses.
+
+    python benchmarks/bench_json_diff.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_diff import diff_json, format_diff
+
+
+def find_json_diffs_recursive(old, new, path=""):
+    """Previous implementation, kept here as the baseline"""
+    diffs = []
+    if not isinstance(old, (dict, list)) or not isinstance(new, (dict, list)):
+        if old != new: diffs.append(f"[VALUE DIFF] '{path or '(root)'}': Old({old}) vs New({new})")
+        return diffs
+    old_keys = list(old.keys()) if isinstance(old, dict) else [str(i) for i in range(len(old))]
+    new_keys = list(new.keys()) if isinstance(new, dict) else [str(i) for i in range(len(new))]
+    old_get = old.get if isinstance(old, dict) else lambda k: old[int(k)]
+    new_get = new.get if isinstance(new, dict) else lambda k: new[int(k)]
+    old_set, new_set = set(old_keys), set(new_keys)
+    for key in old_keys + [k for k in new_keys if k not in old_set]:
+        new_path = f"{path}.{key}" if path else key
+        if key not in old_set: diffs.append(f"[NEW FIELD] '{new_path}'")
+        elif key not in new_set: diffs.append(f"[MISSING FIELD] '{new_path}'")
+        else:
+            a, b = old_get(key), new_get(key)
+            if isinstance(a, (dict, list)) and isinstance(b, (dict, list)): diffs.extend(find_json_diffs_recursive(a, b, new_path))
+            elif a != b: diffs.append(f"[VALUE DIFF] '{new_path}': Old({a}) vs New({b})")
+    return diffs
+
+
+def list_response(rows, changed_every=0):
+    """Paged list response with `rows` records; every `changed_every`-th record differs in one field"""
+    return {"success": True, "data": {"total": rows, "items": [
+        {"id": i, "name": f"item {i}", "price": i * 1.5 if not changed_every or i % changed_every else -1,
+         "tags": ["a", "b", str(i)], "meta": {"createdBy": "qa", "flag": True, "ref": f"R-{i}"}}
+        for i in range(rows)
+    ]}}
+
+
+def run(name, old, new, number):
+    legacy = find_json_diffs_recursive(old, new)
+    assert [format_diff(r) for r in diff_json(old, new, array_keys=())] == legacy
+    size = len(json.dumps(new)) / 1e6
+    before = min(timeit.repeat(lambda: find_json_diffs_recursive(old, new), number=number, repeat=3)) / number
+    after = min(timeit.repeat(lambda: diff_json(old, new), number=number, repeat=3)) / number
+    print(f"{name:<30} {size:5.1f} MB  {len(legacy):5d} diffs   recursive {before * 1000:8.1f} ms   "
+          f"structural {after * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    run("identical 20k rows", list_response(20_000), list_response(20_000), 3)
+    run("1% changed 20k rows", list_response(20_000), list_response(20_000, 100), 3)
+    run("1% changed 60k rows", list_response(60_000), list_response(60_000, 100), 1)
+    reordered = list_response(5_000)
+    shuffled = {**reordered, "data": {**reordered['data'], "items": reordered['data']['items'][::-1]}}
+    print(f"{'reversed 5k rows':<30} positional: {len(find_json_diffs_recursive(reordered, shuffled))} diffs   "
+          f"matched by id: {len(diff_json(reordered, shuffled))} diffs")
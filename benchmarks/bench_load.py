@@ -0,0 +1,58 @@
+"""Load-test mode end to end against two local mock servers (Old fast, New slower and failing a little).
+
+    python benchmarks/bench_load.py                                   # 20 APIs, ramp 1,10,50, 2 s per stage
+    python benchmarks/bench_load.py --apis 200 --ramp 10,100,200 --stage-seconds 5 --new-error-rate 0.05
+
+The comparison collection is built by the Generator from a synthetic URL sheet and Swagger, so the bodies are the
+Swagger-derived ones the real run would send. Prints the per-level totals, the flagged APIs and the client's own
+throughput (to tell a saturated load generator from a saturated server).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from hub_core import generate_collection
+from hub_load import TOTAL_FOLDER, load_rows, parse_ramp, run_load_test, summarize_load
+from mock_server import start_mock_server
+from synthetic import make_swagger, make_url_table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apis", type=int, default=20, help="Rows of the URL sheet (every 10th API is cancelled)")
+    parser.add_argument("--ramp", type=parse_ramp, default=(1, 10, 50), help="Concurrency levels, e.g. 1,10,50")
+    parser.add_argument("--stage-seconds", type=float, default=2.0)
+    parser.add_argument("--old-latency-ms", type=float, default=5.0)
+    parser.add_argument("--new-latency-ms", type=float, default=15.0)
+    parser.add_argument("--new-error-rate", type=float, default=0.02)
+    args = parser.parse_args(argv)
+
+    old_server, old_url = start_mock_server(latency_ms=args.old_latency_ms, jitter_ms=args.old_latency_ms / 2)
+    new_server, new_url = start_mock_server(latency_ms=args.new_latency_ms, jitter_ms=args.new_latency_ms / 2,
+                                            error_rate=args.new_error_rate, seed=1)
+    try:
+        paths = max(10, args.apis)
+        collection = generate_collection(make_url_table(args.apis, paths, old_url, new_url), make_swagger(paths), "Load")
+        started = time.perf_counter()
+        rows = load_rows(run_load_test(collection, args.ramp, args.stage_seconds))
+        elapsed = time.perf_counter() - started
+    finally:
+        old_server.shutdown()
+        new_server.shutdown()
+
+    totals = [r for r in rows if r['folder'] == TOTAL_FOLDER]
+    sent = sum(r['old_requests'] + r['new_requests'] for r in totals)
+    print(f"{'level':>5}  {'status':<8} {'old rps':>9} {'new rps':>9} {'old err':>8} {'new err':>8} {'old p95':>9} {'new p95':>9}")
+    for r in totals:
+        print(f"{r['concurrency']:>5}  {r['status']:<8} {r['old_rps']:>9.1f} {r['new_rps']:>9.1f} {r['old_error_rate'] or 0:>8.2%} "
+              f"{r['new_error_rate'] or 0:>8.2%} {r['old_p95'] or 0:>7.1f}ms {r['new_p95'] or 0:>7.1f}ms")
+    summary = summarize_load(rows)
+    print(f"{summary['flagged']} API/level rows flagged; {sent} requests in {elapsed:.1f} s ({sent / elapsed:.0f} req/s from the client)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Local mock of the Old / New APIs, for trying the replay, latency benchmark and load-test modes without a backend.
+
+    python benchmarks/mock_server.py --port 8001 --latency-ms 20                       # "Old"
+    python benchmarks/mock_server.py --port 8002 --latency-ms 30 --error-rate 0.02     # "New"
+
+Every path and method answers {"success": true, "data": {"path": ..., "received": <bytes of the body>}} after
+`latency` ms (+ up to `jitter` ms); `error_rate` of the requests get a 500 instead. Connections are kept alive and
+each one gets its own thread, which is plenty for a few hundred concurrent clients.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # headers and body are two writes; Nagle + delayed ACK would add ~40 ms
+
+        def _answer(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length: self.rfile.read(length)
+            with lock:
+                delay, fail = latency_ms + rng.random() * jitter_ms, rng.random() < error_rate
+            if delay: time.sleep(delay / 1000)
+            status = 500 if fail else 200
+            payload = {"success": not fail, "message": "mock failure" if fail else None,
+                       "data": {"path": self.path.split('?', 1)[0], "received": length}}
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _answer
+
+        def log_message(self, format, *args):  # keep the console quiet under load
+            pass
+
+    return MockHandler
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024            # the default backlog of 5 drops connections when a ramp starts
+
+
+def start_mock_server(port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0, host="127.0.0.1"):
+    """Serves in a daemon thread -> (server, base URL). Stop it with server.shutdown()."""
+    server = MockServer((host, port), make_handler(latency_ms, jitter_ms, error_rate, seed))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Base response time")
+    parser.add_argument("--jitter-ms", type=float, default=5.0, help="Random extra response time (uniform, up to this)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    args = parser.parse_args(argv)
+
+    server = MockServer((args.host, args.port), make_handler(args.latency_ms, args.jitter_ms, args.error_rate))
+    print(f"Mock API on http://{args.host}:{args.port} ({args.latency_ms:g}+{args.jitter_ms:g} ms, {args.error_rate:.1%} errors)",
+          flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Deterministic synthetic inputs for the benchmarks: Swagger documents, Postman collections and URL sheets.
+
+The same (size, seed) always gives the same data, so timings of two runs/commits are comparable.
+"""
+import json
+import random
+
+ENTITIES = ("users", "orders", "invoices", "patients", "visits", "products", "branches", "doctors", "labs", "claims")
+ACTIONS = ("Create", "Update", "Search", "GetById", "Cancel", "Approve", "Export", "Import")
+
+
+def swagger_path(i):
+    """i-th synthetic path: literal, templated and nested templates are mixed like in the real APIs"""
+    entity, action = ENTITIES[i % len(ENTITIES)], ACTIONS[(i // len(ENTITIES)) % len(ACTIONS)]
+    group = i // (len(ENTITIES) * len(ACTIONS))
+    if i % 3 == 1: return f"/api/v{group}/{entity}/{{id}}/{action}"
+    if i % 3 == 2: return f"/api/v{group}/{entity}/{{id}}/items/{{itemId}}/{action}"
+    return f"/api/v{group}/{entity}/{action}"
+
+
+def make_swagger(paths, seed=0, schemas=None):
+    """OpenAPI 3 document with `paths` POST operations. Bodies reference shared DTOs (nested $refs, allOf,
+    arrays, one self-referencing tree) and every operation carries a 'Request Body Example--' description."""
+    rng = random.Random(seed)
+    schemas = schemas or max(10, paths // 20)
+    components = {
+        "Audit": {"type": "object", "properties": {"createdBy": {"type": "string"}, "createdAt": {"type": "string", "format": "date-time"}}},
+        "Node": {"type": "object", "properties": {"name": {"type": "string"}, "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}},
+    }
+    for s in range(schemas):
+        props = {f"field{k}": {"type": rng.choice(["string", "integer", "number", "boolean"])} for k in range(rng.randint(4, 12))}
+        props["id"] = {"type": "integer", "example": 0}
+        props["lines"] = {"type": "array", "items": {"$ref": f"#/components/schemas/Dto{(s + 1) % schemas}"}} if s % 4 == 0 else {"type": "string"}
+        props["tree"] = {"$ref": "#/components/schemas/Node"} if s % 7 == 0 else {"type": "string"}
+        components[f"Dto{s}"] = {"allOf": [{"$ref": "#/components/schemas/Audit"}, {"type": "object", "properties": props}]}
+
+    out = {}
+    for i in range(paths):
+        dto = f"Dto{rng.randrange(schemas)}"
+        example = {"id": i, "name": f"item {i}", "active": True, "amount": 0 if i % 5 == 0 else i}
+        description = f"Operation {i}.\n\nRequest Body Example-- {json.dumps(example)}\n--Response-- {{\"success\": true}}"
+        out[swagger_path(i)] = {"post": {
+            "description": description,
+            "requestBody": {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{dto}"}}}},
+        }}
+    return {"openapi": "3.0.1", "paths": out, "components": {"schemas": components}}
+
+
+def request_url(i, paths):
+    """URL of the i-th request, hitting (mostly) existing Swagger paths with concrete ids"""
+    path = swagger_path(i % paths).replace("{id}", str(1000 + i)).replace("{itemId}", str(i % 97))
+    return f"{{{{baseUrl}}}}{path}"
+
+
+def make_body(i, rng):
+    if i % 10 == 0: return ""                                   # missing body candidate
+    if i % 25 == 1: return "{'name': 'x', 'active': True,}"     # syntax error
+    body = {"id": i, "name": f"req {i}", "items": [{"lineId": k, "qty": k % 3, "price": round(rng.random() * 100, 2)}
+                                                   for k in range(rng.randint(1, 8))],
+            "customerId": "00000000-0000-0000-0000-000000000000" if i % 13 == 0 else f"C-{i}"}
+    return json.dumps(body, indent=2)
+
+
+def make_collection(requests, paths=100, folder_size=50, seed=0):
+    """Postman v2.1 collection with `requests` POST requests grouped in folders of `folder_size`"""
+    rng = random.Random(seed)
+    folders = []
+    for start in range(0, requests, folder_size):
+        items = []
+        for i in range(start, min(start + folder_size, requests)):
+            items.append({"name": f"Request {i}", "request": {
+                "method": "POST",
+                "header": [{"key": "Content-Type", "value": "application/json"}],
+                "url": {"raw": request_url(i, paths)},
+                "body": {"mode": "raw", "raw": make_body(i, rng), "options": {"raw": {"language": "json"}}},
+            }, "response": []})
+        folders.append({"name": f"Folder {start // folder_size:04d}", "item": items})
+    return {"info": {"name": f"Synthetic {requests}", "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
+            "item": folders}
+
+
+def make_url_table(rows, paths=100, old_base="https://old.example.com", new_base="https://core.example.com"):
+    """Old/New URL sheet as a pandas DataFrame; every 10th API is cancelled ('---')"""
+    import pandas as pd
+    old = [f"{old_base}/api/Legacy/Method{i}" for i in range(rows)]
+    new = ["---" if i % 10 == 9 else new_base + swagger_path(i % paths) for i in range(rows)]
+    return pd.DataFrame({"Old API": old, "New API": new})
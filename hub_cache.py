@@ -0,0 +1,144 @@
+"""Persistent, content-addressed cache on local disk, shared by every Streamlit session and CLI worker on the machine.
+
+Entries live in one SQLite file: keys are digests of the inputs (upload bytes, Swagger digest, ...), values are
+pickled. The total size is bounded, least recently used entries are evicted first. Every thread / process opens its
+own connection; the WAL journal lets readers run next to one writer and writes are short IMMEDIATE transactions.
+Any SQLite error (locked for too long, disk full, unreadable file) degrades to a cache miss, never to a failure.
+
+Only point this at a directory you trust: values are unpickled on read.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_LOGGER = logging.getLogger("malekah_hub.cache")
+CACHE_VERSION = 2                 # bump when a cached structure changes shape, old entries then simply miss
+DEFAULT_MAX_BYTES = 1 << 30
+TOUCH_INTERVAL = 60.0             # seconds; a hit refreshes the LRU timestamp at most this often, so hot reads rarely write
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    value BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+def new_disk_cache(path, max_bytes=DEFAULT_MAX_BYTES):
+    """Handle for the cache file at `path` (created on first use). Cheap; connections are opened lazily per thread."""
+    return {"path": path, "max_bytes": max_bytes, "local": threading.local()}
+
+
+def cache_key(namespace, *parts):
+    """Content-addressed key: digest of the namespace, the cache version and the (str / bytes) parts"""
+    h = hashlib.blake2b(digest_size=20)
+    for part in (namespace, CACHE_VERSION) + parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8', 'surrogatepass'))
+        h.update(b'\0')
+    return f"{namespace}:{h.hexdigest()}"
+
+
+def _connection(cache):
+    """This thread's connection (a forked worker never reuses its parent's)"""
+    local = cache['local']
+    if getattr(local, "pid", None) != os.getpid():
+        directory = os.path.dirname(os.path.abspath(cache['path']))
+        os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(cache['path'], timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        local.conn, local.pid = conn, os.getpid()
+    return local.conn
+
+
+def _evict(conn, max_bytes):
+    """Deletes least recently used entries until the total size fits. Runs inside the writer's transaction."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= max_bytes: return 0
+    doomed = []
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+        doomed.append((key,))
+        total -= size
+        if total <= max_bytes: break
+    conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+    return len(doomed)
+
+
+def disk_get(cache, key):
+    """Cached value for `key`, or None on a miss"""
+    try:
+        conn = _connection(cache)
+        row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None: return None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL: conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+    except (sqlite3.Error, OSError) as e:
+        CACHE_LOGGER.warning("disk cache read failed: %s", e)
+        return None
+    try:
+        return pickle.loads(row[0])
+    except Exception as e:  # written by an incompatible version of the code
+        CACHE_LOGGER.warning("dropping unreadable cache entry %s: %s", key, e)
+        disk_delete(cache, key)
+        return None
+
+
+def disk_put(cache, key, value, namespace=""):
+    """Stores `value` (not None) under `key`, then evicts down to the size limit. False if it was not stored."""
+    blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    if len(blob) > cache['max_bytes']: return False
+    try:
+        conn = _connection(cache)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("INSERT INTO entries (key, namespace, size, accessed, value) VALUES (?, ?, ?, ?, ?) "
+                         "ON CONFLICT (key) DO UPDATE SET size = excluded.size, accessed = excluded.accessed, "
+                         "value = excluded.value", (key, namespace, len(blob), time.time(), blob))
+            _evict(conn, cache['max_bytes'])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    except (sqlite3.Error, OSError) as e:
+        CACHE_LOGGER.warning("disk cache write failed: %s", e)
+        return False
+    return True
+
+
+def disk_delete(cache, key):
+    try:
+        _connection(cache).execute("DELETE FROM entries WHERE key = ?", (key,))
+    except (sqlite3.Error, OSError) as e:
+        CACHE_LOGGER.warning("disk cache delete failed: %s", e)
+
+
+def disk_get_or_build(cache, namespace, parts, build):
+    """Value cached under (namespace, *parts), or build() stored for the next session / process.
+    Concurrent misses may both build; the later write wins, which is harmless for content-addressed values."""
+    if cache is None: return build()
+    key = cache_key(namespace, *parts)
+    value = disk_get(cache, key)
+    if value is None:
+        value = build()
+        disk_put(cache, key, value, namespace)
+    return value
+
+
+def disk_cache_stats(cache):
+    """{namespace: (entries, bytes)} for display"""
+    try:
+        rows = _connection(cache).execute("SELECT namespace, COUNT(*), SUM(size) FROM entries GROUP BY namespace").fetchall()
+    except (sqlite3.Error, OSError) as e:
+        CACHE_LOGGER.warning("disk cache stats failed: %s", e)
+        return {}
+    return {namespace: (count, size) for namespace, count, size in rows}
@@ -0,0 +1,420 @@
+"""Headless CLI for the Malekah API Hub (CI / nightly batch runs).
+
+    python hub_cli.py inspect collections/ --swagger swagger.json --format sarif -o report.sarif
+    python hub_cli.py inspect workspace/ --swagger swagger.json -j 0
+    python hub_cli.py generate sheets/ --swagger swagger.json --out-dir generated/
+    python hub_cli.py replay generated/Malekah_Collection.json --concurrency 20 --rate 50 --ignore '*.createdAt'
+    python hub_cli.py --profile inspect.prof --trace-memory 15 inspect big_collection.json
+    python hub_cli.py bench-latency generated/Malekah_Collection.json --warmup 3 --measured 30 --csv latency.csv
+
+Exit codes: 0 = clean, 1 = JSON syntax errors / failed replay checks / latency regressions, 2 = unreadable input / usage error.
+Streamlit is never imported and pandas only when a sheet is actually read.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from hub_cache import cache_key, disk_get, disk_get_or_build, disk_put, new_disk_cache
+from hub_core import analyze_collection_recursively, analyze_collection_stream, build_request_templates, collection_items, \
+    content_digest, generate_collection, generate_workbook_collection, iter_collection_chunks, iter_url_table_chunks, \
+    read_url_sheets
+from hub_perf import profiled
+
+TOOL_NAME = "malekah-api-hub"
+EXIT_OK, EXIT_SYNTAX, EXIT_INPUT = 0, 1, 2
+
+# kind -> (SARIF rule id, SARIF level, short description)
+FINDING_RULES = {
+    "invalid_file": ("HUB000", "error", "File could not be read or is not valid JSON"),
+    "syntax_errors": ("HUB001", "error", "Request body is not valid JSON"),
+    "zero_warnings": ("HUB002", "warning", "Zero value or empty GUID in request body"),
+    "missing_bodies": ("HUB003", "note", "Empty body but Swagger defines a request body"),
+    "schema_errors": ("HUB004", "warning", "Request body does not match the Swagger request schema"),
+}
+
+
+def collect_files(paths, extensions):
+    """Expands files and directories (recursively, skipping hidden dirs) into a sorted list of matching files"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith(extensions))
+        else:
+            files.append(path)
+    return files
+
+
+def finding_records(s_err, z_warn, m_bodies, schema_errs=()):
+    """JSON-safe copies of the findings (drops `item_ref` and body text)"""
+    return {
+        "syntax_errors": [{"path": f['path'], "hint": f.get('hint', '')} for f in s_err],
+        "zero_warnings": [{"path": f['path'], "detail": h.detail, "offset": h.offset} for f in z_warn for h in f['hits']],
+        "missing_bodies": [{"path": f['path'], "url": f['url'], "hint": f['hint']} for f in m_bodies],
+        "schema_errors": [{"path": f['path'], "detail": err} for f in schema_errs for err in f['errors']],
+    }
+
+
+def load_swagger(path):
+    """(document, content digest) of the Swagger file, (None, "") without one"""
+    if not path: return None, ""
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    return json.loads(data), content_digest(data)
+
+
+def cached_templates(swagger_data, swagger_digest, cache=None):
+    if not swagger_data: return None
+    return disk_get_or_build(cache, "templates", (swagger_digest,), lambda: build_request_templates(swagger_data))
+
+
+def inspect_file(path, swagger_data=None, templates=None, low_memory=False, cache=None, swagger_digest=""):
+    """Findings of one collection file. With a disk `cache`, per-request results of an unchanged file (and Swagger)
+    are reused from earlier runs."""
+    entry = {"file": path, "error": None}
+    try:
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        results_key = cache_key("results", content_digest(data), swagger_digest) if cache else None
+        result_cache = (disk_get(cache, results_key) if cache else None) or {}
+        known_results = len(result_cache)
+        if low_memory:
+            _, _, s_err, z_warn, m_bodies, v_errs = analyze_collection_stream(data, swagger_data, templates, result_cache)
+        else:
+            collection = json.loads(data)
+            s_err, z_warn, m_bodies, v_errs = analyze_collection_recursively(collection_items(collection), swagger_data, "",
+                                                                             templates, result_cache=result_cache)
+        if cache and len(result_cache) != known_results: disk_put(cache, results_key, result_cache, "results")
+        entry.update(finding_records(s_err, z_warn, m_bodies, v_errs))
+    except (OSError, ValueError, AttributeError) as e:
+        entry.update(finding_records([], [], []), error=str(e))
+    return entry
+
+
+# Per-process state: the Swagger document and its request templates are handed to each worker once,
+# the disk cache is reopened by path (every worker gets its own SQLite connection)
+_WORKER_STATE = {}
+
+def _init_worker(swagger_data, templates, low_memory, cache_path, swagger_digest):
+    _WORKER_STATE.update(swagger_data=swagger_data, templates=templates, low_memory=low_memory, swagger_digest=swagger_digest,
+                         cache=new_disk_cache(cache_path) if cache_path else None)
+
+def _inspect_in_worker(path):
+    return inspect_file(path, _WORKER_STATE['swagger_data'], _WORKER_STATE['templates'], _WORKER_STATE['low_memory'],
+                        _WORKER_STATE['cache'], _WORKER_STATE['swagger_digest'])
+
+
+def inspect_files(files, swagger_data=None, low_memory=False, workers=1, cache_path=None, swagger_digest=""):
+    """Inspects every file; with workers > 1 the files are fanned out over a process pool.
+    Results always come back in input order, so reports are deterministic."""
+    cache = new_disk_cache(cache_path) if cache_path else None
+    templates = cached_templates(swagger_data, swagger_digest, cache)
+    if workers <= 1 or len(files) <= 1:
+        return [inspect_file(path, swagger_data, templates, low_memory, cache, swagger_digest) for path in files]
+    with ProcessPoolExecutor(max_workers=min(workers, len(files)), initializer=_init_worker,
+                             initargs=(swagger_data, templates, low_memory, cache_path, swagger_digest)) as pool:
+        return list(pool.map(_inspect_in_worker, files))
+
+
+def generate_files(files, swagger_data, out_dir, coll_name=None, cache_path=None, swagger_digest="", all_sheets=False,
+                   workers=None):
+    """One collection per sheet file. Rows are streamed in chunks (first two columns only); with `all_sheets` every
+    sheet of a workbook becomes a folder group, the sheets being read by `workers` processes."""
+    templates = cached_templates(swagger_data, swagger_digest, new_disk_cache(cache_path) if cache_path else None)
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    for path in files:
+        base = os.path.splitext(os.path.basename(path))[0]
+        entry = {"file": path, "error": None, "output": None}
+        try:
+            if all_sheets:
+                sheets = read_url_sheets(path, path, workers=workers)
+                collection = generate_workbook_collection(sheets, swagger_data, coll_name or base, templates)
+            else:
+                collection = generate_collection(iter_url_table_chunks(path, path), swagger_data, coll_name or base, templates)
+            out_path = os.path.join(out_dir, f"{base}.postman_collection.json")
+            with open(out_path, 'wb') as fh:
+                for chunk in iter_collection_chunks(collection):
+                    fh.write(chunk)
+            s_err, z_warn, _, _ = analyze_collection_recursively(collection['item'], None)
+            entry.update(finding_records(s_err, z_warn, []), output=out_path)
+        except Exception as e:  # pandas and the zip / XML readers raise a wide range of parser errors
+            entry.update(finding_records([], [], []), error=str(e))
+        results.append(entry)
+    return results
+
+
+def build_json_report(mode, results):
+    summary = {"files": len(results), "invalid_files": sum(1 for r in results if r['error'])}
+    for kind in ("syntax_errors", "zero_warnings", "missing_bodies", "schema_errors"):
+        summary[kind] = sum(len(r[kind]) for r in results)
+    return {"tool": TOOL_NAME, "mode": mode, "summary": summary, "files": results}
+
+
+def build_sarif_report(results):
+    rules = [{"id": rule_id, "name": kind, "shortDescription": {"text": text}, "defaultConfiguration": {"level": level}}
+             for kind, (rule_id, level, text) in FINDING_RULES.items()]
+    sarif_results = []
+
+    def add(kind, uri, message, logical=None):
+        rule_id, level, _ = FINDING_RULES[kind]
+        location = {"physicalLocation": {"artifactLocation": {"uri": uri.replace(os.sep, '/')}}}
+        if logical: location["logicalLocations"] = [{"fullyQualifiedName": logical}]
+        sarif_results.append({"ruleId": rule_id, "level": level, "message": {"text": message}, "locations": [location]})
+
+    for r in results:
+        if r['error']: add("invalid_file", r['file'], r['error'])
+        for f in r['syntax_errors']: add("syntax_errors", r['file'], f"Invalid JSON body: {f['hint']}", f['path'])
+        for f in r['zero_warnings']: add("zero_warnings", r['file'], f['detail'], f['path'])
+        for f in r['missing_bodies']: add("missing_bodies", r['file'], f"Missing body for {f['url']}", f['path'])
+        for f in r['schema_errors']: add("schema_errors", r['file'], f['detail'], f['path'])
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{"tool": {"driver": {"name": TOOL_NAME, "rules": rules}}, "results": sarif_results}],
+    }
+
+
+def exit_code(results):
+    if any(r['error'] for r in results): return EXIT_INPUT
+    if any(r['syntax_errors'] for r in results): return EXIT_SYNTAX
+    return EXIT_OK
+
+
+def _number_arg(text, cast, ok, expected):
+    try:
+        value = cast(text)
+    except ValueError:
+        value = None
+    if value is None or not ok(value): raise argparse.ArgumentTypeError(f"expected {expected}, got {text!r}")
+    return value
+
+
+def positive_int(text):
+    """argparse type: an int >= 1 (a concurrency of 0 would wait forever on its semaphore)"""
+    return _number_arg(text, int, lambda v: v >= 1, "a positive integer")
+
+
+def positive_float(text):
+    """argparse type: a float > 0 (rates and timeouts; NaN is rejected)"""
+    return _number_arg(text, float, lambda v: v > 0, "a positive number")
+
+
+def non_negative_int(text):
+    """argparse type: an int >= 0 (warm-up rounds may be skipped)"""
+    return _number_arg(text, int, lambda v: v >= 0, "a non-negative integer")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="hub_cli", description="Headless Malekah API Hub (Inspector / Generator).")
+    parser.add_argument("--profile", metavar="FILE", help="Run under cProfile, dump the stats to FILE and print the top functions")
+    parser.add_argument("--trace-memory", type=int, default=0, metavar="N",
+                        help="Trace allocations with tracemalloc and print the peak and the N biggest allocation sites")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    insp = sub.add_parser("inspect", help="Check Postman collections for syntax errors, zeros, missing bodies and schema violations")
+    insp.add_argument("paths", nargs="+", help="Collection files or directories (*.json)")
+    insp.add_argument("--swagger", help="Swagger JSON used for missing-body and schema checks")
+    insp.add_argument("--low-memory", action="store_true", help="Stream collections item by item")
+    insp.add_argument("-j", "--workers", type=non_negative_int, default=1, help="Parallel worker processes (0 = one per CPU core)")
+
+    gen = sub.add_parser("generate", help="Generate Old vs New collections from URL sheets")
+    gen.add_argument("paths", nargs="+", help="Sheet files or directories (*.csv, *.xlsx)")
+    gen.add_argument("--swagger", required=True, help="Swagger JSON with request body examples")
+    gen.add_argument("--out-dir", required=True, help="Directory for the generated collections")
+    gen.add_argument("--name", help="Collection name (defaults to the sheet file name)")
+    gen.add_argument("--all-sheets", action="store_true", help="Generate every sheet of a workbook, one folder group per sheet")
+    gen.add_argument("-j", "--workers", type=non_negative_int, default=0, help="Processes reading the sheets with --all-sheets (0 = one per sheet, up to the CPU count)")
+
+    for p in (insp, gen):
+        p.add_argument("--cache", metavar="DB", help="Shared on-disk cache (SQLite file) for Swagger templates and per-file results")
+        p.add_argument("--format", choices=("json", "sarif"), default="json")
+        p.add_argument("-o", "--output", help="Report file (defaults to stdout)")
+
+    rep = sub.add_parser("replay", help="Run the Old vs New pairs of a generated collection and compare them")
+    rep.add_argument("collection", help="Generated comparison collection (*.json)")
+    rep.add_argument("--concurrency", type=positive_int, default=10, help="Pairs in flight at the same time")
+    rep.add_argument("--rate", type=positive_float, help="Max request starts per second (default: unlimited)")
+    rep.add_argument("--timeout", type=positive_float, default=30.0, help="Per-request timeout in seconds")
+    rep.add_argument("--var", action="append", default=[], metavar="KEY=VALUE", help="Value for a {{KEY}} placeholder")
+    rep.add_argument("--insecure", action="store_true", help="Skip TLS certificate verification")
+    rep.add_argument("--ignore", action="append", default=[], metavar="GLOB",
+                     help="Response path to leave out of the data match, e.g. '*.createdAt' (repeatable)")
+    rep.add_argument("--array-key", action="append", metavar="FIELD",
+                     help="Match array elements by this field instead of position (repeatable, default: id, guid, code, key)")
+    rep.add_argument("-o", "--output", help="Report file (defaults to stdout)")
+
+    mrg = sub.add_parser("merge", help="Diff a regenerated collection against the hand-fixed one and carry the fixes over")
+    mrg.add_argument("fixed", help="Hand-fixed collection (saved from the Inspector)")
+    mrg.add_argument("regenerated", help="Freshly generated collection")
+    mrg.add_argument("--base", help="The collection originally generated before fixing (enables three-way merge)")
+    mrg.add_argument("--out", help="Write the regenerated collection with the fixes carried over to this file")
+    mrg.add_argument("-o", "--output", help="Report file (defaults to stdout)")
+
+    lat = sub.add_parser("bench-latency", help="Compare Old vs New latency distributions per folder")
+    lat.add_argument("collection", help="Generated comparison collection (*.json)")
+    lat.add_argument("--warmup", type=non_negative_int, default=3, help="Unmeasured warm-up rounds per pair")
+    lat.add_argument("--measured", type=positive_int, default=20, help="Measured rounds per pair")
+    lat.add_argument("--concurrency", type=positive_int, default=4, help="Pairs benchmarked at the same time")
+    lat.add_argument("--rate", type=positive_float, help="Max request starts per second (default: unlimited)")
+    lat.add_argument("--timeout", type=positive_float, default=30.0, help="Per-request timeout in seconds")
+    lat.add_argument("--var", action="append", default=[], metavar="KEY=VALUE", help="Value for a {{KEY}} placeholder")
+    lat.add_argument("--insecure", action="store_true", help="Skip TLS certificate verification")
+    lat.add_argument("--csv", help="Also write the per-folder table as CSV")
+    lat.add_argument("-o", "--output", help="Report file (defaults to stdout)")
+
+    load = sub.add_parser("load-test", help="Ramp concurrency on the Old and New endpoints and compare them under load")
+    load.add_argument("collection", help="Generated comparison collection (*.json)")
+    load.add_argument("--ramp", default="1,10,50", help="Concurrency levels, one stage each (default: 1,10,50)")
+    load.add_argument("--stage-seconds", type=positive_float, default=10.0, help="Duration of each stage, per side")
+    load.add_argument("--rate", type=positive_float, help="Max request starts per second (default: unlimited)")
+    load.add_argument("--timeout", type=positive_float, default=30.0, help="Per-request timeout in seconds")
+    load.add_argument("--var", action="append", default=[], metavar="KEY=VALUE", help="Value for a {{KEY}} placeholder")
+    load.add_argument("--insecure", action="store_true", help="Skip TLS certificate verification")
+    load.add_argument("--csv", help="Also write the per-API table as CSV")
+    load.add_argument("-o", "--output", help="Report file (defaults to stdout)")
+    return parser
+
+
+def write_report(report, output):
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+def load_replay_input(args):
+    """(collection, variables) for replay-style modes, or None after reporting the problem"""
+    try:
+        with open(args.collection, encoding='utf-8') as fh:
+            collection = json.load(fh)
+        return collection, dict(v.split("=", 1) for v in args.var)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read collection: {e}", file=sys.stderr)
+        return None
+
+
+def replay_main(args):
+    from hub_diff import DEFAULT_ARRAY_KEYS
+    from hub_replay import run_replay, summarize_replay  # pulls in asyncio / httpx only for this mode
+
+    loaded = load_replay_input(args)
+    if loaded is None: return EXIT_INPUT
+    collection, variables = loaded
+    array_keys = DEFAULT_ARRAY_KEYS if args.array_key is None else tuple(args.array_key)
+    results = run_replay(collection, args.concurrency, args.rate, args.timeout, variables, not args.insecure,
+                         args.ignore, array_keys)
+    summary = summarize_replay(results)
+    if summary['skipped']: print(f"{summary['skipped']} pair(s) skipped, see their 'skipped' reason", file=sys.stderr)
+    write_report({"tool": TOOL_NAME, "mode": "replay", "summary": summary, "pairs": results}, args.output)
+    return EXIT_SYNTAX if summary['failed'] else EXIT_OK
+
+
+def bench_latency_main(args):
+    from hub_replay import benchmark_rows, run_benchmark
+    from hub_stats import rows_to_csv
+
+    loaded = load_replay_input(args)
+    if loaded is None: return EXIT_INPUT
+    collection, variables = loaded
+    results = run_benchmark(collection, args.warmup, args.measured, args.concurrency, args.rate, args.timeout,
+                            variables, not args.insecure)
+    rows = benchmark_rows(results)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(rows_to_csv(rows))
+    regressions = sum(1 for r in rows if r['status'] == "regression")
+    summary = {"pairs": len(rows), "regressions": regressions,
+               "possible_regressions": sum(1 for r in rows if r['status'] == "possible regression"),
+               "skipped": sum(1 for r in rows if r['status'].startswith("skipped"))}
+    write_report({"tool": TOOL_NAME, "mode": "bench-latency", "summary": summary, "folders": rows}, args.output)
+    return EXIT_SYNTAX if regressions else EXIT_OK
+
+
+def load_test_main(args):
+    from hub_load import load_rows, parse_ramp, run_load_test, summarize_load
+    from hub_stats import rows_to_csv
+
+    try:
+        ramp = parse_ramp(args.ramp)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return EXIT_INPUT
+    loaded = load_replay_input(args)
+    if loaded is None: return EXIT_INPUT
+    collection, variables = loaded
+    progress = lambda done, total: print(f"stage {done}/{total} done", file=sys.stderr, flush=True)
+    result = run_load_test(collection, ramp, args.stage_seconds, args.rate, args.timeout, variables, not args.insecure, progress)
+    rows = load_rows(result)
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(rows_to_csv(rows))
+    summary = summarize_load(rows)
+    write_report({"tool": TOOL_NAME, "mode": "load-test", "ramp": list(ramp), "stage_seconds": args.stage_seconds,
+                  "summary": summary, "skipped": result['skipped'], "rows": rows}, args.output)
+    return EXIT_SYNTAX if summary['flagged'] else EXIT_OK
+
+
+def merge_main(args):
+    from hub_merge import diff_collections, merge_fixes
+
+    collections = {}
+    try:
+        for name in ("fixed", "regenerated", "base"):
+            path = getattr(args, name)
+            if path:
+                with open(path, encoding='utf-8') as fh:
+                    collections[name] = json.load(fh)
+        items = {name: collection['item'] for name, collection in collections.items()}
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Cannot read collection: {e}", file=sys.stderr)
+        return EXIT_INPUT
+    report = diff_collections(items['fixed'], items['regenerated'])
+    merged = merge_fixes(items['fixed'], items['regenerated'], items.get('base'))
+    report['summary'].update(carried=sum(1 for r in merged if r['action'] == "carried"),
+                             conflicts=sum(1 for r in merged if r['action'] == "conflict"))
+    if args.out:
+        with open(args.out, 'wb') as fh:
+            for chunk in iter_collection_chunks(collections['regenerated']):
+                fh.write(chunk)
+    write_report({"tool": TOOL_NAME, "mode": "merge", **report, "merged": merged}, args.output)
+    return EXIT_SYNTAX if report['summary']['conflicts'] else EXIT_OK
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    with profiled(args.profile, args.trace_memory):
+        return run_mode(args)
+
+
+def run_mode(args):
+    if args.mode == "replay": return replay_main(args)
+    if args.mode == "bench-latency": return bench_latency_main(args)
+    if args.mode == "merge": return merge_main(args)
+    if args.mode == "load-test": return load_test_main(args)
+    try:
+        swagger_data, swagger_digest = load_swagger(args.swagger)
+    except (OSError, ValueError) as e:
+        print(f"Cannot read Swagger file: {e}", file=sys.stderr)
+        return EXIT_INPUT
+
+    if args.mode == "inspect":
+        workers = args.workers or (os.cpu_count() or 1)
+        results = inspect_files(collect_files(args.paths, ('.json',)), swagger_data, args.low_memory, workers,
+                                args.cache, swagger_digest)
+    else:
+        results = generate_files(collect_files(args.paths, ('.csv', '.xlsx')), swagger_data, args.out_dir, args.name,
+                                 args.cache, swagger_digest, args.all_sheets, args.workers or None)
+
+    report = build_sarif_report(results) if args.format == "sarif" else build_json_report(args.mode, results)
+    write_report(report, args.output)
+    return exit_code(results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1454 @@
+"""Core logic of the Malekah API Hub (Generator + Inspector), importable without Streamlit or pandas.
+
+Used by the Streamlit UI (app_secured.py) and the headless CLI (hub_cli.py).
+"""
+import gc
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from itertools import chain
+from urllib.parse import unquote
+
+from hub_perf import add_time, timed
+
+# ==========================================
+# 0. Constants
+# ==========================================
+# القائمة البيضاء للقيم الصفرية (منطق الملفات المرفقة)
+ALLOWED_ZERO_KEYS = frozenset([
+    'pregnancyWeek', 'pregnancyStage', 'ageStageId', 'date', 
+    'rate', 'price', 'duration', 'time', 'day'
+])
+
+# --- سكربتات التيست (من ملف generate_smart_collection_v2.py) ---
+TEST_SCRIPT_OLD_BASE = [
+    "// 1. Check Status Code is 200",
+    "pm.test(\"Old API: Status code is 200\", function () {",
+    "    pm.response.to.have.status(200);",
+    "});",
+    "",
+    "// 2. Check Business Success (New Added)",
+    "try {",
+    "    var jsonData = pm.response.json();",
+    "    if (jsonData.hasOwnProperty('success')) {",
+    "        pm.test(\"Old API: Business Logic Success\", function () {",
+    "            pm.expect(jsonData.success).to.be.true;",
+    "        });",
+    "    }",
+    "    // 3. Save Response & Time for Comparison",
+    "    pm.collectionVariables.set('previous_response', JSON.stringify(jsonData));",
+    "    pm.collectionVariables.set('previous_status', pm.response.code);",
+    "    pm.collectionVariables.set('previous_time', pm.response.responseTime);", 
+    "} catch (e) {",
+    "    pm.collectionVariables.set('previous_response', '{}');",
+    "    pm.collectionVariables.set('previous_status', pm.response.code);",
+    "    pm.collectionVariables.set('previous_time', 0);",
+    "}"
+]
+
+TEST_SCRIPT_NEW_SMART = [
+    "var _ = require('lodash');",
+    "",
+    "// 1. Check Status Code is 200",
+    "pm.test(\"New API: Status code is 200\", function () {",
+    "    pm.response.to.have.status(200);",
+    "});",
+    "",
+    "// 2. Business Logic Success Check (CRITICAL)",
+    "var newRes = pm.response.json();",
+    "if (newRes.hasOwnProperty('success')) {",
+    "    pm.test(\"New API: Business Success (success=true)\", function () {",
+    "        if(newRes.success === false) {",
+    "             pm.expect.fail(`Business Fail: ${newRes.message || 'No Error Message'}`);",
+    "        }",
+    "        pm.expect(newRes.success).to.be.true;",
+    "    });",
+    "}",
+    "",
+    "// --- COMPARISON LOGIC ---",
+    "var oldResStr = pm.collectionVariables.get('previous_response');",
+    "var oldStatus = pm.collectionVariables.get('previous_status');",
+    "var oldTime = pm.collectionVariables.get('previous_time');",
+    "var oldRes = oldResStr ? JSON.parse(oldResStr) : {};",
+    "var newStatus = pm.response.code;",
+    "",
+    "// 3. Compare Status Codes",
+    "if (oldStatus != newStatus) {",
+    "    pm.test(\"Status Comparison\", function () {",
+    "        pm.expect.fail(`CRITICAL: Status Mismatch! Old: ${oldStatus}, New: ${newStatus}`);",
+    "    });",
+    "} else {",
+    "    pm.test(\"Status Codes Match\", function () { pm.expect(newStatus).to.eql(oldStatus); });",
+    "    ",
+    "    // 4. Performance Check (Warning only)",
+    "    if (oldTime > 0) {",
+    "        pm.test(\"Performance Check (New vs Old)\", function () {",
+    "            var threshold = Math.max(oldTime * 1.5, oldTime + 200);",
+    "            pm.expect(pm.response.responseTime).to.be.below(threshold, `New API is too slow! Old: ${oldTime}ms, New: ${pm.response.responseTime}ms`);",
+    "        });",
+    "    }",
+    "    ",
+    "    // 5. Deep Content Comparison",
+    "    pm.test(\"Deep Data Match\", function () {",
+    "        if (_.isEqual(oldRes, newRes)) {",
+    "            pm.expect(true).to.be.true;",
+    "            return;",
+    "        }",
+    "        var diffs = [];",
+    "        function findDiff(obj1, obj2, path) {",
+    "            var keys1 = _.keys(obj1);",
+    "            var keys2 = _.keys(obj2);",
+    "            var allKeys = _.union(keys1, keys2);",
+    "            allKeys.forEach(function (key) {",
+    "                var newPath = path ? path + '.' + key : key;",
+    "                if (!_.has(obj1, key)) diffs.push(`[NEW FIELD] '${newPath}'`);",
+    "                else if (!_.has(obj2, key)) diffs.push(`[MISSING FIELD] '${newPath}'`);",
+    "                else if (_.isObject(obj1[key]) && _.isObject(obj2[key])) findDiff(obj1[key], obj2[key], newPath);",
+    "                else if (!_.isEqual(obj1[key], obj2[key])) diffs.push(`[VALUE DIFF] '${newPath}': Old(${obj1[key]}) vs New(${obj2[key]})`);",
+    "            });",
+    "        }",
+    "        findDiff(oldRes, newRes, '');",
+    "        if (diffs.length > 0) {",
+    "             pm.expect.fail('MISMATCHES:\\n' + diffs.join('\\n'));",
+    "        }",
+    "    });",
+    "}"
+]
+
+TEST_SCRIPT_CANCELLED = [
+    "pm.test(\"API Cancelled\", function () {",
+    "    console.warn(\"Old API Only. New version cancelled.\");",
+    "    pm.expect(true).to.be.true;",
+    "});"
+]
+
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options', 'trace')
+
+# ==========================================
+# 1. Logic Helpers (The Core Logic)
+# ==========================================
+
+def get_api_name_from_url(url):
+    if not isinstance(url, str): return "Unknown"
+    return url.strip().split('/')[-1]
+
+_API_PATH_RE = re.compile(r'/api/', re.IGNORECASE)
+
+def normalize_url(url):
+    """تنظيف الرابط ومطابقته مع السواجر (منطق catch_emptyBody_but_has_example_v2.py)"""
+    if isinstance(url, dict): url = url.get('raw', '')
+    url = str(url).split('?')[0]
+    # محاولة اصطياد المسار من بعد /api/ (لحد آخر السطر)
+    api_match = _API_PATH_RE.search(url)
+    if api_match:
+        line_end = url.find('\n', api_match.start())
+        return url[api_match.start():line_end if line_end != -1 else len(url)]
+    # تنظيف عام: شيل scheme://host ثم أي {{variable}} في أول سطر
+    line_end = url.find('\n') if '\n' in url else len(url)
+    scheme = url.find('://', 0, line_end)
+    while scheme != -1 and url[scheme + 3:scheme + 4] in ('', '/'): scheme = url.find('://', scheme + 1, line_end)
+    if scheme != -1:
+        slash = url.find('/', scheme + 3)
+        url = url[slash:] if slash != -1 else ''
+    line_end = url.find('\n') if '\n' in url else len(url)
+    variable_end = url.rfind('}}', 0, line_end)
+    if variable_end != -1: url = url[variable_end + 2:]
+    return url if url.startswith('/') else '/' + url
+
+# --- Tolerant JSON repair (JSON5-style bodies from Swagger descriptions / Postman) ---
+FIX_SINGLE_QUOTES = "Single Quotes used"
+FIX_TRAILING_COMMA = "Trailing Comma"
+FIX_CAPITALIZED_BOOLEAN = "Capitalized Boolean"
+FIX_COMMENT = "Comment"
+FIX_UNQUOTED_KEY = "Unquoted Key"
+FIX_UNBALANCED = "Unbalanced Braces"
+FIX_UNTERMINATED_STRING = "Unterminated String"
+REPAIR_FIX_ORDER = (FIX_SINGLE_QUOTES, FIX_TRAILING_COMMA, FIX_CAPITALIZED_BOOLEAN, FIX_COMMENT,
+                    FIX_UNQUOTED_KEY, FIX_UNBALANCED, FIX_UNTERMINATED_STRING)
+
+_REPAIR_TOKEN_RE = re.compile(r"""
+    (?P<safe>(?:"(?:[^"\\]|\\.)*"|[^"'/{}\[\],A-Za-z_$]+|,(?!\s*(?:[}\]]|/[/*]))|(?:true|false|null)(?![\w$]))+)
+  | (?P<dq>"(?:[^"\\]|\\.)*(?P<dq_end>")?)
+  | (?P<sq>'(?:[^'\\]|\\.)*(?P<sq_end>')?)
+  | (?P<lc>//[^\n]*)
+  | (?P<bc>/\*[\s\S]*?(?:\*/|\Z))
+  | (?P<open>[{\[])
+  | (?P<close>[}\]])
+  | (?P<comma>,)
+  | (?P<word>[A-Za-z_$][\w$]*)
+  | (?P<ws>\s+)
+  | (?P<other>[^"'/{}\[\],A-Za-z_$\s]+|/)
+""", re.VERBOSE)
+_KEY_COLON_RE = re.compile(r'\s*:')
+_SQ_INNER_RE = re.compile(r'\\(.)|"', re.DOTALL)
+_CAPITALIZED_WORDS = {"True": "true", "TRUE": "true", "False": "false", "FALSE": "false",
+                      "None": "null", "Null": "null", "NULL": "null"}
+_CLOSER = {"{": "}", "[": "]"}
+_JSON_DECODER = json.JSONDecoder()
+
+def _single_to_double(token, closed):
+    inner = token[1:-1] if closed else token[1:]
+    return '"' + _SQ_INNER_RE.sub(lambda m: '\\"' if m.group(0) == '"' else ("'" if m.group(1) == "'" else m.group(0)), inner) + '"'
+
+# Quick pass for the usual sloppiness (comments, trailing commas, True/False, unquoted keys): brackets stay inside
+# the copied runs, so a typical row is a handful of tokens instead of one per bracket. Anything else (quotes,
+# unterminated strings or comments, stray characters) returns None, and so does a result that is not valid JSON,
+# which is when the bracket tracking of the full tokenizer is needed.
+_QUICK_REPAIR_RE = re.compile(r"""
+    (?P<safe>(?:"(?:[^"\\]|\\.)*"|[^"'/,A-Za-z_$]+|,(?!(?:\s|//[^\n]*+|(?>/\*[\s\S]*?\*/))*[}\]])|(?:true|false|null)(?![\w$]))+)
+  | (?P<lc>//[^\n]*)
+  | (?P<bc>/\*[\s\S]*?\*/)
+  | (?P<comma>,)
+  | (?P<word>[A-Za-z_$][\w$]*)
+  | (?P<other>[\s\S])
+""", re.VERBOSE)
+
+def _quick_repair(text, pos, single_value):
+    out, fixes = [], set()
+    for m in _QUICK_REPAIR_RE.finditer(text, pos):
+        kind, token = m.lastgroup, m.group()
+        if kind == 'safe':
+            out.append(token)
+        elif kind in ('lc', 'bc'):
+            fixes.add(FIX_COMMENT)
+        elif kind == 'comma':  # followed by a closer: the lookahead in `safe` let it through
+            fixes.add(FIX_TRAILING_COMMA)
+        elif kind == 'word':
+            if token in _CAPITALIZED_WORDS:
+                token = _CAPITALIZED_WORDS[token]
+                fixes.add(FIX_CAPITALIZED_BOOLEAN)
+            elif token not in ('true', 'false', 'null') and _KEY_COLON_RE.match(text, m.end()):
+                token = f'"{token}"'
+                fixes.add(FIX_UNQUOTED_KEY)
+            out.append(token)
+        else:
+            return None
+    repaired, end = ''.join(out), len(text)
+    if single_value:
+        # Same cut as the tokenizer: the text has to end with the closer of its first value
+        end = len(text.rstrip())
+        repaired = repaired.rstrip()
+        if not repaired or repaired[-1] not in '}]' or text[end - 1] != repaired[-1]: return None
+    try:
+        if _JSON_DECODER.raw_decode(repaired, len(repaired) - len(repaired.lstrip()))[1] != len(repaired.rstrip()): return None
+    except ValueError:
+        return None
+    return repaired, [f for f in REPAIR_FIX_ORDER if f in fixes], end
+
+def repair_json(text, pos=0, single_value=False):
+    """Single-pass tolerant repair: trailing commas, True/False/None, // and /* */ comments, single quotes,
+    unquoted keys and unbalanced braces. Returns (repaired_text, fixes, end) where `fixes` lists the applied
+    FIX_* labels in REPAIR_FIX_ORDER. With `single_value`, stops after the first top-level object/array."""
+    quick = _quick_repair(text, pos, single_value)
+    if quick is not None: return quick
+    out, fixes, stack = [], set(), []
+    comma_at = None  # index in `out` of the last comma, dropped if a closer follows it
+    end = len(text)
+    for m in _REPAIR_TOKEN_RE.finditer(text, pos):
+        kind, token = m.lastgroup, m.group()
+        if kind == 'safe':  # run of valid JSON (closed strings, numbers, literals, inner commas): copied as is
+            if comma_at is not None and not token.isspace(): comma_at = None
+            out.append(token)
+            continue
+        if kind == 'ws':
+            out.append(token)
+            continue
+        if kind in ('lc', 'bc'):
+            fixes.add(FIX_COMMENT)
+            continue
+        if kind == 'close':
+            if comma_at is not None:
+                out[comma_at] = ''
+                fixes.add(FIX_TRAILING_COMMA)
+            comma_at = None
+            if not stack or _CLOSER[stack[-1]] != token:
+                if token not in (_CLOSER[o] for o in stack):
+                    fixes.add(FIX_UNBALANCED)  # stray closer
+                    continue
+                while _CLOSER[stack[-1]] != token:
+                    out.append(_CLOSER[stack.pop()])
+                    fixes.add(FIX_UNBALANCED)
+            stack.pop()
+            out.append(token)
+            if single_value and not stack:
+                end = m.end()
+                break
+            continue
+        comma_at = None
+        if kind == 'comma':
+            comma_at = len(out)
+        elif kind == 'open':
+            stack.append(token)
+        elif kind == 'dq':
+            if m.group('dq_end') is None:
+                token += '"'
+                fixes.add(FIX_UNTERMINATED_STRING)
+        elif kind == 'sq':
+            if m.group('sq_end') is None: fixes.add(FIX_UNTERMINATED_STRING)
+            token = _single_to_double(token, m.group('sq_end') is not None)
+            fixes.add(FIX_SINGLE_QUOTES)
+        elif kind == 'word':
+            if token in _CAPITALIZED_WORDS:
+                token = _CAPITALIZED_WORDS[token]
+                fixes.add(FIX_CAPITALIZED_BOOLEAN)
+            elif token not in ('true', 'false', 'null') and _KEY_COLON_RE.match(text, m.end()):
+                token = f'"{token}"'
+                fixes.add(FIX_UNQUOTED_KEY)
+        out.append(token)
+    if stack:
+        out.extend(_CLOSER[o] for o in reversed(stack))
+        fixes.add(FIX_UNBALANCED)
+    return ''.join(out), [f for f in REPAIR_FIX_ORDER if f in fixes], end
+
+_BODY_MARKER_RE = re.compile(r'Request Body Example--\s*(?=\{)', re.IGNORECASE)
+_RESPONSE_MARKER_RE = re.compile(r'--Response--', re.IGNORECASE)
+
+def extract_body_with_fixes(description):
+    """(body, fixes): the request body example of a Swagger description, repaired by repair_json when it is not
+    valid JSON as written. Valid bodies are returned verbatim."""
+    if not description: return "{}", []
+    marker = _BODY_MARKER_RE.search(description)
+    if not marker: return "{}", []
+    start = marker.end()
+    try:
+        _, end = _JSON_DECODER.raw_decode(description, start)
+        return description[start:end], []
+    except ValueError:
+        pass
+    response = _RESPONSE_MARKER_RE.search(description, start)
+    body, fixes, _ = repair_json(description[:response.start()] if response else description, start, single_value=True)
+    return body.strip(), fixes
+
+def extract_body_from_description(description):
+    """استخراج البودي من الوصف (منطق generate_smart_collection_v2.py)"""
+    return extract_body_with_fixes(description)[0]
+
+_EMPTY_GUID_RE = re.compile(r'^[0-]+$')
+
+def _build_path(node):
+    """Materializes a lazy path node: root path string or (parent, key, is_index) chain"""
+    segments = []
+    while isinstance(node, tuple):
+        node, key, is_index = node
+        segments.append((key, is_index))
+    path = node
+    for key, is_index in reversed(segments):
+        if is_index: path = f"{path}[{key}]"
+        else: path = f"{path}.{key}" if path else key
+    return path
+
+def _zero_finding(value, path):
+    if isinstance(value, str): return f"{path} = \"{value}\" (Empty GUID 🚨)"
+    return f"{path} = {value} (Zero Value ⚠️)"
+
+def _is_zero_hit(value, key, is_index):
+    """Empty GUID strings, or numeric zeros whose key is not whitelisted (bools ignored)"""
+    if isinstance(value, str):
+        return len(value) > 5 and '0' in value and _EMPTY_GUID_RE.match(value) is not None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value == 0:
+        return is_index or key.split('.')[-1] not in ALLOWED_ZERO_KEYS
+    return False
+
+def _iter_zero_hits(data, path=""):
+    """(value, lazy path node) for every hit, in document order.
+    Iterative walk (explicit stack of iterators); paths are only built for emitted findings."""
+    if not isinstance(data, (dict, list)):
+        if _is_zero_hit(data, path, False): yield data, path
+        return
+    stack = [(iter(data.items()) if isinstance(data, dict) else enumerate(data), path, isinstance(data, list))]
+    while stack:
+        it, node, is_index = stack[-1]
+        for key, value in it:
+            if isinstance(value, dict):
+                stack.append((iter(value.items()), (node, key, is_index), False))
+                break
+            if isinstance(value, list):
+                stack.append((enumerate(value), (node, key, is_index), True))
+                break
+            if _is_zero_hit(value, key, is_index):
+                yield value, (node, key, is_index)
+        else:
+            stack.pop()
+
+def find_zero_values(data, path="", max_findings=None):
+    """البحث عن القيم الصفرية و GUIDs (منطق check_json_and_zeros_v3.py)
+    `max_findings` optionally caps the number of findings returned."""
+    findings = []
+    for value, node in _iter_zero_hits(data, path):
+        findings.append(_zero_finding(value, _build_path(node)))
+        if max_findings is not None and len(findings) >= max_findings: break
+    return findings
+
+class ZeroHit:
+    """One zero / empty-GUID hit in a request body: JSON path, display text and character offset of the
+    key (or array element) in the raw body, None when it could not be located"""
+    __slots__ = ("path", "detail", "offset")
+
+    def __init__(self, path, detail, offset=None):
+        self.path, self.detail, self.offset = path, detail, offset
+
+    def __repr__(self):
+        return f"ZeroHit({self.path!r}, offset={self.offset})"
+
+_KEY_COLON_AT_RE = re.compile(r'\s*:\s*')
+_ZERO_NUMBER_RE = re.compile(r'(?<![\w.])-?0(?:\.0*)?(?:[eE][+-]?\d+)?(?![\w.])')
+
+def _locate_zero_hit(raw_body, pos, value, node):
+    """(offset, end) of a hit in the raw text, searching forward from `pos` (hits come in document order).
+    The offset points at the key (or the array element), `end` past the value so the next search skips it."""
+    if not isinstance(node, tuple): return len(raw_body) - len(raw_body.lstrip()), len(raw_body)
+    _, key, is_index = node
+    token = json.dumps(value) if isinstance(value, str) else None
+    if not is_index:
+        needle = json.dumps(key, ensure_ascii=False)
+        i = raw_body.find(needle, pos)
+        while i != -1:
+            colon = _KEY_COLON_AT_RE.match(raw_body, i + len(needle))
+            if colon: break
+            i = raw_body.find(needle, i + 1)
+        if i == -1: return None, pos
+        j = colon.end()
+        if token is not None: return i, j + len(token)
+        m = _ZERO_NUMBER_RE.match(raw_body, j)
+        return i, m.end() if m else j
+    if token is not None:
+        i = raw_body.find(token, pos)
+        return (i, i + len(token)) if i != -1 else (None, pos)
+    m = _ZERO_NUMBER_RE.search(raw_body, pos)
+    return (m.start(), m.end()) if m else (None, pos)
+
+def find_zero_hits(data, raw_body="", max_findings=None):
+    """Zero / empty-GUID hits of one parsed body as a tuple of ZeroHit, located in `raw_body` in one forward scan"""
+    hits, pos = [], 0
+    for value, node in _iter_zero_hits(data):
+        offset = None
+        if raw_body: offset, pos = _locate_zero_hit(raw_body, pos, value, node)
+        path = _build_path(node)
+        hits.append(ZeroHit(path, _zero_finding(value, path), offset))
+        if max_findings is not None and len(hits) >= max_findings: break
+    return tuple(hits)
+
+def zero_hit_count(zero_findings):
+    return sum(len(f['hits']) for f in zero_findings)
+
+# --- دوال السواجر التكرارية (Advanced Recursion from context) ---
+def resolve_json_pointer(ref, swagger_data):
+    """Full JSON-Pointer lookup for local refs (`#/components/schemas/A~1B`), None if unresolvable"""
+    if not isinstance(ref, str) or not ref.startswith('#'): return None
+    node = swagger_data
+    for token in ref[1:].split('/')[1:]:
+        token = unquote(token).replace('~1', '/').replace('~0', '~')
+        if isinstance(node, dict) and token in node: node = node[token]
+        elif isinstance(node, list) and token.isdigit() and int(token) < len(node): node = node[int(token)]
+        else: return None
+    return node
+
+def resolve_ref(schema, swagger_data):
+    if '$ref' in schema:
+        resolved = resolve_json_pointer(schema['$ref'], swagger_data)
+        if isinstance(resolved, dict): return resolved
+        # Fallback for refs outside the document: match by schema name
+        ref_path = str(schema['$ref']).split('/')[-1]
+        return swagger_data.get('components', {}).get('schemas', {}).get(ref_path) or \
+               swagger_data.get('definitions', {}).get(ref_path, {})
+    return schema
+
+_CUT = object()   # placeholder of a value truncated at a cycle / the depth limit, replaced by its container's {} or []
+
+def _empty_like(schema, swagger_data):
+    """{} or [] matching the (resolved) schema of a truncated value"""
+    schema = resolve_ref(schema, swagger_data) if isinstance(schema, dict) else {}
+    return [] if schema.get('type') == 'array' or 'items' in schema else {}
+
+def _dummy_number(schema, value):
+    """`value` moved into [minimum, maximum] (a step inside an exclusive bound)"""
+    low, high = schema.get('minimum'), schema.get('maximum')
+    if isinstance(schema.get('exclusiveMinimum'), (int, float)) and not isinstance(schema['exclusiveMinimum'], bool):
+        low = schema['exclusiveMinimum'] + 1   # OpenAPI 3.1 / JSON Schema form
+    elif schema.get('exclusiveMinimum') is True and isinstance(low, (int, float)):
+        low += 1
+    if isinstance(schema.get('exclusiveMaximum'), (int, float)) and not isinstance(schema['exclusiveMaximum'], bool):
+        high = schema['exclusiveMaximum'] - 1
+    elif schema.get('exclusiveMaximum') is True and isinstance(high, (int, float)):
+        high -= 1
+    if isinstance(low, (int, float)) and value < low: value = low
+    if isinstance(high, (int, float)) and value > high: value = high
+    return value
+
+def _dummy_string(schema):
+    fmt = schema.get('format')
+    if fmt == 'uuid': return "00000000-0000-0000-0000-000000000000"
+    if fmt == 'date': return "2024-01-01"
+    if fmt == 'date-time': return "2024-01-01T00:00:00Z"
+    if fmt == 'email': return "user@example.com"
+    value = "string"
+    min_len, max_len = schema.get('minLength'), schema.get('maxLength')
+    if isinstance(min_len, int) and len(value) < min_len: value = value.ljust(min_len, 'x')
+    if isinstance(max_len, int) and len(value) > max_len: value = value[:max_len]
+    return value
+
+def _generate_dummy(schema, swagger_data, depth, cache, stack):
+    """Returns (value, cut_refs): cut_refs are in-progress $refs the value was truncated at (cycles).
+    A $ref expansion is only cached when it was not cut at one of its ancestors. Truncated values come back as
+    _CUT; the enclosing object leaves them out (or uses {} / [] when required) and an array becomes []."""
+    if not isinstance(schema, dict): return "string", frozenset()
+    if depth > 3 and ('$ref' in schema or 'properties' in schema or 'items' in schema or 'allOf' in schema):
+        return _CUT, frozenset()
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if ref in stack: return _CUT, frozenset([ref])
+        key = (ref, depth)
+        if key in cache: return cache[key], frozenset()
+        value, cuts = _generate_dummy(resolve_ref(schema, swagger_data), swagger_data, depth, cache, stack | {ref})
+        cuts = cuts - {ref}
+        if not cuts: cache[key] = value
+        return value, cuts
+    if 'example' in schema: return schema['example'], frozenset()
+    if schema.get('enum'): return schema['enum'][0], frozenset()
+    cuts = frozenset()
+    if 'allOf' in schema:
+        combined_obj = {}
+        for sub_schema in schema['allOf']:
+            result, sub_cuts = _generate_dummy(sub_schema, swagger_data, depth, cache, stack)
+            cuts |= sub_cuts
+            if isinstance(result, dict):
+                combined_obj.update(result)
+        return combined_obj, cuts
+    for combo in ('oneOf', 'anyOf'):
+        if schema.get(combo):
+            # First variant that is not an explicit null
+            options = [s for s in schema[combo] if not (isinstance(s, dict) and s.get('type') == 'null')]
+            return _generate_dummy((options or schema[combo])[0], swagger_data, depth, cache, stack)
+    if 'properties' in schema:
+        obj_data = {}
+        required = set(schema.get('required') or ())
+        for prop_name, prop_schema in schema['properties'].items():
+            value, sub_cuts = _generate_dummy(prop_schema, swagger_data, depth + 1, cache, stack)
+            cuts |= sub_cuts
+            if value is _CUT:
+                if prop_name not in required: continue
+                value = _empty_like(prop_schema, swagger_data)
+            obj_data[prop_name] = value
+        return obj_data, cuts
+    s_type = schema.get('type')
+    if isinstance(s_type, list): s_type = next((t for t in s_type if t != 'null'), None)
+    if s_type == 'integer': return _dummy_number(schema, 0), cuts
+    if s_type == 'number': return _dummy_number(schema, 0.0), cuts
+    if s_type == 'boolean': return True, cuts
+    if s_type == 'string': return _dummy_string(schema), cuts
+    if s_type == 'array':
+        item_schema = schema.get('items', {})
+        sample_item, cuts = _generate_dummy(item_schema, swagger_data, depth + 1, cache, stack)
+        if sample_item is _CUT or schema.get('maxItems') == 0: return [], cuts
+        return [sample_item] * max(1, schema.get('minItems') or 0), cuts
+    if s_type == 'object': return {}, cuts
+    return "string", cuts
+
+def generate_dummy_data(schema, swagger_data, depth=0, schema_cache=None):
+    """Dummy value for a schema. Pass the same `schema_cache` dict for one Swagger document
+    so shared DTOs are expanded once (keyed by $ref and depth)."""
+    if schema_cache is None: schema_cache = {}
+    value = _generate_dummy(schema, swagger_data, depth, schema_cache, frozenset())[0]
+    return _empty_like(schema, swagger_data) if value is _CUT else value
+
+def generate_body_hint_from_swagger(op_details, swagger_data, schema_cache=None):
+    request_body = op_details.get('requestBody', {})
+    content = request_body.get('content', {})
+    target_schema = {}
+    for mime in content:
+        if 'json' in mime:
+            target_schema = content[mime].get('schema', {})
+            break
+    if not target_schema:
+        for p in op_details.get('parameters', []):
+            if p.get('in') == 'body':
+                target_schema = p.get('schema', {})
+                break
+    if not target_schema: return None
+    final_body = generate_dummy_data(target_schema, swagger_data, schema_cache=schema_cache)
+    return json.dumps(final_body, ensure_ascii=False, indent=2)
+
+def _compile_segment(seg):
+    """Segment template such as `{id}.json` -> compiled regex (pure `{id}` -> None, matches any)"""
+    if re.fullmatch(r'\{[^{}]*\}', seg): return None
+    parts = re.split(r'\{.*?\}', seg)
+    return re.compile("^" + "[^/]+".join(re.escape(p) for p in parts) + "$", re.IGNORECASE)
+
+def build_swagger_path_index(swagger_paths):
+    """Builds a one-time segment trie for the Swagger paths (exact matches are a plain dict lookup in find_swagger_path).
+    Precedence: exact match first, then literal segments beat templated ones,
+    and between templated candidates the first declared path in the spec wins."""
+    trie = {"lit": {}, "tpl": {}, "data": None}
+    for s_path, s_data in swagger_paths.items():
+        node = trie
+        for seg in s_path.split('/'):
+            if '{' in seg:
+                tpl_key = "{}" if _compile_segment(seg) is None else seg.lower()
+                if tpl_key not in node['tpl']:
+                    node['tpl'][tpl_key] = (_compile_segment(seg), {"lit": {}, "tpl": {}, "data": None})
+                node = node['tpl'][tpl_key][1]
+            else:
+                node = node['lit'].setdefault(seg.lower(), {"lit": {}, "tpl": {}, "data": None})
+        if node['data'] is None: node['data'] = s_data
+    return {"trie": trie}
+
+def _match_trie(node, segments, pos):
+    if pos == len(segments): return node['data']
+    seg = segments[pos]
+    child = node['lit'].get(seg.lower())
+    if child is not None:
+        found = _match_trie(child, segments, pos + 1)
+        if found is not None: return found
+    if not seg: return None
+    for pattern, child in node['tpl'].values():
+        if pattern is None or pattern.match(seg):
+            found = _match_trie(child, segments, pos + 1)
+            if found is not None: return found
+    return None
+
+def find_swagger_path(normalized_url, swagger_paths, path_index=None):
+    if normalized_url in swagger_paths: return swagger_paths[normalized_url]
+    if path_index is None: path_index = build_swagger_path_index(swagger_paths)
+    return _match_trie(path_index['trie'], normalized_url.split('/'), 0)
+
+# --- Request templates (every operation resolved once per Swagger document, shared by both modes) ---
+_FORM_MIMES = (("application/x-www-form-urlencoded", "urlencoded"), ("multipart/form-data", "formdata"))
+_SKIPPED_HEADERS = frozenset(["content-type", "accept", "authorization"])
+
+def _param_text(value):
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+def _operation_parameters(path_item, op, swagger):
+    """Path-level parameters overridden by the operation's own (same name + location), $refs resolved"""
+    params = {}
+    for p in list(path_item.get('parameters') or []) + list(op.get('parameters') or []):
+        if isinstance(p, dict) and '$ref' in p: p = resolve_ref(p, swagger)
+        if isinstance(p, dict) and p.get('name'): params[(p['name'], p.get('in'))] = p
+    return list(params.values())
+
+def _param_sample(p, swagger, cache):
+    if 'example' in p: return p['example']
+    return generate_dummy_data(p.get('schema') or p, swagger, schema_cache=cache)
+
+def _form_fields(schema, swagger, cache):
+    sample = generate_dummy_data(schema, swagger, schema_cache=cache)
+    if not isinstance(sample, dict): return []
+    props = resolve_ref(schema, swagger).get('properties') or {}
+    return [{"key": k, "value": _param_text(v), "type": "file" if (props.get(k) or {}).get('format') == 'binary' else "text"}
+            for k, v in sample.items()]
+
+def _json_body_schema(op, params):
+    """Schema of the JSON request body (OpenAPI 3 json content, or a Swagger 2 `in: body` parameter)"""
+    content = (op.get('requestBody') or {}).get('content') or {}
+    for mime, media in content.items():
+        if 'json' in mime and isinstance(media, dict) and media.get('schema'): return media['schema']
+    for p in params:
+        if p.get('in') == 'body' and p.get('schema'): return p['schema']
+    return None
+
+def _request_body(op, params, swagger, cache):
+    """(body_mode, raw JSON text | None, form fields | None) from the description example or the body schema"""
+    example = extract_body_from_description(op.get('description') or '')
+    if example != "{}": return "raw", example, None
+    schema = _json_body_schema(op, params)
+    if schema: return "raw", json.dumps(generate_dummy_data(schema, swagger, schema_cache=cache), ensure_ascii=False, indent=2), None
+    content = (op.get('requestBody') or {}).get('content') or {}
+    for form_mime, mode in _FORM_MIMES:
+        media = content.get(form_mime)
+        if isinstance(media, dict) and media.get('schema'): return mode, None, _form_fields(media['schema'], swagger, cache)
+    # Swagger 2: `in: formData` fields
+    form = [{"key": p['name'], "value": _param_text(_param_sample(p, swagger, cache)), "type": "file" if p.get('type') == 'file' else "text"}
+            for p in params if p.get('in') == 'formData']
+    if form: return ("formdata" if any(f['type'] == "file" for f in form) else "urlencoded"), None, form
+    return "raw", None, None
+
+def build_request_template(s_path, method, op, path_item, swagger, schema_cache=None):
+    """Ready-to-use request for one operation: method, description, body and sample path / query / header params.
+    `body` is None when the operation takes no raw body (the Inspector only flags missing bodies for those that do)."""
+    if schema_cache is None: schema_cache = {}
+    params = _operation_parameters(path_item, op, swagger)
+    body_mode, body, form = _request_body(op, params, swagger, schema_cache)
+    template = {"method": method.upper(), "path": s_path, "description": op.get('description') or '',
+                "body_mode": body_mode, "body": body, "form": form, "body_schema": _json_body_schema(op, params),
+                "path_params": [], "query": [], "headers": []}
+    for p in params:
+        where = p.get('in')
+        if where == 'path':
+            template['path_params'].append({"key": p['name'], "value": _param_text(_param_sample(p, swagger, schema_cache))})
+        elif where == 'query':
+            template['query'].append({"key": p['name'], "value": _param_text(_param_sample(p, swagger, schema_cache)),
+                                      "required": bool(p.get('required'))})
+        elif where == 'header' and p['name'].lower() not in _SKIPPED_HEADERS:
+            template['headers'].append({"key": p['name'], "value": _param_text(_param_sample(p, swagger, schema_cache))})
+    return template
+
+def build_request_templates(swagger, schema_cache=None):
+    """Templates for every operation of the spec: {"by_path": {path: {method: template}}, "index": path index,
+    "root": the document ($ref target of the body schemas), "validators": compiled body validators (filled lazily)}.
+    Built once per Swagger document; shared DTOs are expanded once through `schema_cache`."""
+    if schema_cache is None: schema_cache = {}
+    by_path = {}
+    for s_path, path_item in (swagger.get('paths') or {}).items():
+        if not isinstance(path_item, dict): continue
+        ops = {}
+        for method, op in path_item.items():
+            method = method.lower()
+            if method not in HTTP_METHODS or not isinstance(op, dict) or method in ops: continue
+            ops[method] = build_request_template(s_path, method, op, path_item, swagger, schema_cache)
+        if ops: by_path[s_path] = ops
+    return {"by_path": by_path, "index": build_swagger_path_index(by_path), "root": swagger, "validators": ValidatorCache()}
+
+def find_request_template(url, templates, method=None):
+    """Template for a request URL (host, variables and query ignored; templated segments match concrete values).
+    Without a `method`, POST is preferred and the first declared operation is the fallback."""
+    ops = find_swagger_path(normalize_url(url), templates['by_path'], templates['index'])
+    if not ops: return None
+    if method: return ops.get(method.lower())
+    return ops.get('post') or next(iter(ops.values()))
+
+# --- Swagger schema validation (compiled validators) ---
+MAX_SCHEMA_ERRORS = 20
+_INT_RANGES = {"int32": (-2**31, 2**31 - 1), "int64": (-2**63, 2**63 - 1)}
+_FORMAT_RES = {
+    "uuid": re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'),
+    "date": re.compile(r'^\d{4}-\d{2}-\d{2}$'),
+    "date-time": re.compile(r'^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([Zz]|[+-]\d{2}:?\d{2})?$'),
+    "email": re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$'),
+}
+_JSON_TYPES = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+    "null": lambda v: v is None,
+}
+
+class ValidatorCache(dict):
+    """Compiled validators by $ref / operation. Pickles as an empty cache (closures are rebuilt on demand), so
+    templates can go to the disk cache and to worker processes."""
+    def __reduce__(self):
+        return (ValidatorCache, ())
+
+def _json_type_name(value):
+    if value is None: return "null"
+    if isinstance(value, bool): return "boolean"
+    if isinstance(value, (int, float)): return "number"
+    return {str: "string", list: "array", dict: "object"}.get(type(value), type(value).__name__)
+
+def _at(path): return path or "(root)"
+
+def _compile_schema(schema, root, cache):
+    """Schema -> check(value, path, errors) closure. $refs are compiled once per document (cached by ref, cycles
+    go through a late-bound holder); only the keywords present in the schema become checks. oneOf is checked
+    like anyOf: bodies are only flagged when no variant fits."""
+    if not isinstance(schema, dict): return lambda value, path, errors: None
+    if '$ref' in schema:
+        ref = schema['$ref']
+        if ref not in cache:
+            holder = []
+            cache[ref] = lambda value, path, errors: holder[0](value, path, errors)
+            holder.append(_compile_schema(resolve_ref(schema, root), root, cache))
+        return cache[ref]
+
+    checks = []
+    s_type = schema.get('type')
+    types = [t for t in (s_type if isinstance(s_type, list) else [s_type]) if t in _JSON_TYPES]
+    nullable = schema.get('nullable') is True or 'null' in types
+    if types:
+        tests = [_JSON_TYPES[t] for t in types]
+        expected = " or ".join(types)
+        def check_type(value, path, errors):
+            if not any(t(value) for t in tests):
+                errors.append(f"{_at(path)}: expected {expected}, got {_json_type_name(value)}")
+                return False
+            return True
+        checks.append(check_type)
+    if 'enum' in schema and isinstance(schema['enum'], list):
+        allowed = schema['enum']
+        def check_enum(value, path, errors):
+            if value not in allowed: errors.append(f"{_at(path)}: {value!r} is not one of {allowed[:10]}")
+        checks.append(check_enum)
+    fmt = schema.get('format')
+    if fmt in _FORMAT_RES:
+        fmt_re = _FORMAT_RES[fmt]
+        def check_format(value, path, errors):
+            if isinstance(value, str) and not fmt_re.match(value): errors.append(f"{_at(path)}: {value!r} is not a valid {fmt}")
+        checks.append(check_format)
+    elif fmt in _INT_RANGES:
+        low, high = _INT_RANGES[fmt]
+        def check_range(value, path, errors):
+            if isinstance(value, int) and not isinstance(value, bool) and not low <= value <= high:
+                errors.append(f"{_at(path)}: {value} is out of the {fmt} range")
+        checks.append(check_range)
+    for keyword, op, text in (('minimum', lambda v, b: v < b, "below the minimum"), ('maximum', lambda v, b: v > b, "above the maximum")):
+        if isinstance(schema.get(keyword), (int, float)):
+            def check_bound(value, path, errors, bound=schema[keyword], op=op, text=text):
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and op(value, bound):
+                    errors.append(f"{_at(path)}: {value} is {text} {bound}")
+            checks.append(check_bound)
+    if isinstance(schema.get('minLength'), int) or isinstance(schema.get('maxLength'), int) or isinstance(schema.get('pattern'), str):
+        min_len, max_len = schema.get('minLength', 0), schema.get('maxLength')
+        try: pattern = re.compile(schema['pattern']) if isinstance(schema.get('pattern'), str) else None
+        except re.error: pattern = None
+        def check_string(value, path, errors):
+            if not isinstance(value, str): return
+            if len(value) < min_len: errors.append(f"{_at(path)}: shorter than {min_len} characters")
+            if max_len is not None and len(value) > max_len: errors.append(f"{_at(path)}: longer than {max_len} characters")
+            if pattern is not None and not pattern.search(value): errors.append(f"{_at(path)}: does not match {pattern.pattern!r}")
+        checks.append(check_string)
+
+    props = schema.get('properties') if isinstance(schema.get('properties'), dict) else {}
+    if props or schema.get('required') or schema.get('additionalProperties') is False:
+        prop_checks = [(name, _compile_schema(sub, root, cache)) for name, sub in props.items()]
+        # readOnly properties are set by the server, a request body may leave them out
+        required = [r for r in schema.get('required') or [] if not (isinstance(props.get(r), dict) and props[r].get('readOnly'))]
+        closed = schema.get('additionalProperties') is False
+        def check_object(value, path, errors):
+            if not isinstance(value, dict): return
+            for name in required:
+                if name not in value: errors.append(f"{_at(path)}: missing required field '{name}'")
+            for name, check in prop_checks:
+                if name in value: check(value[name], f"{path}.{name}" if path else name, errors)
+            if closed:
+                for name in value:
+                    if name not in props: errors.append(f"{_at(path)}: unexpected field '{name}'")
+        checks.append(check_object)
+    if 'items' in schema or 'minItems' in schema or 'maxItems' in schema:
+        item_check = _compile_schema(schema.get('items'), root, cache) if 'items' in schema else None
+        min_items, max_items = schema.get('minItems', 0), schema.get('maxItems')
+        def check_array(value, path, errors):
+            if not isinstance(value, list): return
+            if len(value) < min_items: errors.append(f"{_at(path)}: fewer than {min_items} items")
+            if max_items is not None and len(value) > max_items: errors.append(f"{_at(path)}: more than {max_items} items")
+            if item_check is None: return
+            for i, item in enumerate(value):
+                if len(errors) >= MAX_SCHEMA_ERRORS: return
+                item_check(item, f"{path}[{i}]", errors)
+        checks.append(check_array)
+    for sub in schema.get('allOf') or []:
+        checks.append(_compile_schema(sub, root, cache))
+    for combo in ('oneOf', 'anyOf'):
+        if schema.get(combo):
+            variants = [_compile_schema(sub, root, cache) for sub in schema[combo]]
+            def check_variants(value, path, errors, variants=variants, combo=combo):
+                results = []
+                for variant in variants:
+                    variant_errors = []
+                    variant(value, path, variant_errors)
+                    if not variant_errors: return
+                    results.append(variant_errors)
+                errors.append(f"{_at(path)}: matches none of the {combo} variants ({min(results, key=len)[0]})")
+            checks.append(check_variants)
+
+    checks = tuple(checks)
+    def check(value, path, errors):
+        if value is None and nullable: return
+        for c in checks:
+            # A wrong type makes the remaining keyword checks noise
+            if c(value, path, errors) is False: return
+    return check
+
+def validate_request_body(value, template, templates):
+    """Schema violations of a parsed body against its operation's request schema (at most MAX_SCHEMA_ERRORS)"""
+    schema = template.get('body_schema')
+    if not schema: return ()
+    cache = templates['validators']
+    key = (template['path'], template['method'])
+    check = cache.get(key)
+    if check is None: check = cache[key] = _compile_schema(schema, templates['root'], cache)
+    errors = []
+    check(value, "", errors)
+    return tuple(errors[:MAX_SCHEMA_ERRORS])
+
+# --- دالة التحليل الرئيسية (Inspector Logic) ---
+def iter_collection_requests(items, parent_path=""):
+    """Yields (full_path, item) for every request item, in collection order"""
+    stack = [(iter(items), parent_path)]
+    while stack:
+        it, path = stack[-1]
+        for item in it:
+            current_name = item.get('name', 'Unnamed')
+            full_path = f"{path} > {current_name}" if path else current_name
+            if 'item' in item:
+                stack.append((iter(item['item']), full_path))
+                break
+            elif 'request' in item:
+                yield full_path, item
+        else:
+            stack.pop()
+
+def _request_cache_key(method, url_raw, raw_body, max_zero_findings):
+    h = hashlib.blake2b(digest_size=16)
+    for part in (method, url_raw, raw_body, max_zero_findings):
+        h.update(str(part).encode('utf-8', 'surrogatepass'))
+        h.update(b'\0')
+    return h.digest()
+
+def _analyze_request_content(raw_body, url_raw, method, templates, max_zero_findings, trace=None):
+    """Content-only analysis of one request -> (syntax_hint | None, zero hits, (url, body_hint) | None, schema errors).
+    With a hub_perf `trace`, the time of each step is added to its sub-stage total."""
+    syntax_hint, zeros, missing, schema_errors = None, (), None, ()
+    # 1. Syntax & Zero Check (If body exists)
+    if raw_body and raw_body != "{}":
+        try:
+            parsed = timed(trace, "json.loads", json.loads, raw_body)
+            zeros = timed(trace, "zero scan", find_zero_hits, parsed, raw_body, max_zero_findings)
+        except json.JSONDecodeError as e:
+            fixes = timed(trace, "syntax hint", repair_json, raw_body)[1]
+            syntax_hint = "⚠️ " + ", ".join(fixes) if fixes else f"Error at line {e.lineno}"
+        # 1b. Schema Check: a parsed body against its operation's request schema (validator compiled once per operation)
+        if syntax_hint is None and templates:
+            template = timed(trace, "swagger lookup", find_request_template, url_raw, templates, method)
+            if template and template.get('body_schema'):
+                schema_errors = timed(trace, "schema validation", validate_request_body, parsed, template, templates)
+
+    # 2. Missing Body Check (If Swagger is present)
+    # Only checking if body is empty AND Swagger requires it
+    if (not raw_body or raw_body == "{}") and templates:
+        # ignore 'Old' APIs in missing check if needed, but logic is generic here
+        template = timed(trace, "swagger lookup", find_request_template, url_raw, templates, method)
+        if template and template['body'] is not None: # Precomputed body means a body is expected
+            missing = (normalize_url(url_raw), template['body'])
+    return syntax_hint, zeros, missing, schema_errors
+
+def analyze_request(item, full_path, seq=0, templates=None, max_zero_findings=None, result_cache=None, trace=None):
+    """Findings for one request item. `templates` (build_request_templates) enables the missing-body and schema checks. `result_cache` (dict) memoizes results by a hash of the request content,
+    so re-analyzing unchanged requests is a lookup. `seq` is the request position, used to keep findings ordered."""
+    req_info = item['request']
+    body_data = req_info.get('body', {})
+    raw_body = body_data.get('raw', '').strip()
+    url_raw = req_info.get('url', '')
+    if isinstance(url_raw, dict): url_raw = url_raw.get('raw', '')
+    method = req_info.get('method', 'POST').lower()
+
+    if result_cache is None:
+        result = _analyze_request_content(raw_body, url_raw, method, templates, max_zero_findings, trace)
+    else:
+        key = _request_cache_key(method, url_raw, raw_body, max_zero_findings)
+        result = result_cache.get(key)
+        if result is None:
+            result = _analyze_request_content(raw_body, url_raw, method, templates, max_zero_findings, trace)
+            result_cache[key] = result
+        elif trace is not None:
+            add_time(trace, "cache hits", 0.0)
+    syntax_hint, zeros, missing, schema_errors = result
+
+    syntax_errs, zero_warns, missing_bodies, schema_errs = [], [], [], []
+    if syntax_hint is not None:
+        syntax_errs.append({"path": full_path, "item_ref": item, "body": raw_body, "hint": syntax_hint, "seq": seq})
+    if zeros:
+        # One finding per request, the individual hits are compact ZeroHit records sharing the one body
+        zero_warns.append({"path": full_path, "item_ref": item, "body": raw_body, "hits": zeros, "seq": seq})
+    if missing is not None:
+        missing_bodies.append({"path": full_path, "item_ref": item, "url": missing[0], "hint": missing[1], "seq": seq})
+    if schema_errors:
+        schema_errs.append({"path": full_path, "item_ref": item, "body": raw_body, "errors": schema_errors, "seq": seq})
+    return syntax_errs, zero_warns, missing_bodies, schema_errs
+
+def analyze_collection_recursively(items, swagger_data=None, parent_path="", templates=None, max_zero_findings=None,
+                                   result_cache=None, trace=None):
+    if swagger_data and templates is None: templates = build_request_templates(swagger_data)
+    syntax_errs, zero_warns, missing_bodies, schema_errs = [], [], [], []
+    for seq, (full_path, item) in enumerate(iter_collection_requests(items, parent_path)):
+        s, z, m, v = analyze_request(item, full_path, seq, templates, max_zero_findings, result_cache, trace)
+        syntax_errs.extend(s)
+        zero_warns.extend(z)
+        missing_bodies.extend(m)
+        schema_errs.extend(v)
+    return syntax_errs, zero_warns, missing_bodies, schema_errs
+
+def reanalyze_touched(findings, touched, swagger_data=None, templates=None, max_zero_findings=None, result_cache=None):
+    """Incremental re-analysis after edits: only the `touched` findings' requests are re-analyzed.
+    `findings` is the (syntax, zero, missing, schema) tuple; returns the updated tuple, still in collection order."""
+    if swagger_data and templates is None: templates = build_request_templates(swagger_data)
+    requests = {}
+    for f in touched:
+        requests.setdefault(id(f['item_ref']), f)
+    updated = [[f for f in group if id(f['item_ref']) not in requests] for group in findings]
+    for f in requests.values():
+        fresh = analyze_request(f['item_ref'], f['path'], f.get('seq', 0), templates, max_zero_findings, result_cache)
+        for group, new in zip(updated, fresh):
+            group.extend(new)
+    for group in updated:
+        group.sort(key=lambda f: f.get('seq', 0))
+    return tuple(updated)
+
+# --- Streaming ingestion for huge collections (Low-memory Inspector) ---
+_JSON_SCAN_RE = re.compile(rb'["{}\[\]]')
+_JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_ITEM_ARRAY_RE = re.compile(rb'\s*:\s*\[')
+
+def iter_collection_item_spans(data):
+    """Yields (start, end) byte offsets of every top-level entry in the collection `item` array,
+    without parsing the rest of the document. Only the brackets of the document are checked: a root that is not
+    an object, a missing `item` array or a document cut off before its brackets close raises ValueError."""
+    pos = len(data) - len(data.lstrip(b'\xef\xbb\xbf \t\r\n'))
+    if data[pos:pos + 1] != b'{': raise ValueError(f"Expecting a collection object at char {pos}")
+    depth, array_depth, elem_start, found = 0, None, None, False
+    while True:
+        m = _JSON_SCAN_RE.search(data, pos)
+        if not m: break
+        ch = data[m.start()]
+        if ch == 0x22:  # '"'
+            s = _JSON_STRING_RE.match(data, m.start())
+            if not s: raise ValueError(f"Unterminated string starting at char {m.start()}")
+            pos = s.end()
+            if depth == 1 and not found and s.group() == b'"item"':
+                k = _ITEM_ARRAY_RE.match(data, pos)
+                if k: array_depth, depth, pos, found = 2, 2, k.end(), True
+            continue
+        if ch in b'{[':
+            if depth == array_depth and elem_start is None: elem_start = m.start()
+            depth += 1
+        else:
+            depth -= 1
+            if depth == array_depth and elem_start is not None:
+                yield elem_start, m.end()
+                elem_start = None
+            if array_depth and depth < array_depth: array_depth = None   # `item` closed, keep checking the root
+            if depth == 0:
+                rest = data[m.end():]
+                if rest.strip(): raise ValueError(f"Extra data at char {m.end() + len(rest) - len(rest.lstrip())}")
+                break
+        pos = m.end()
+    if depth: raise ValueError("Unexpected end of data: the collection is cut off" + (" inside 'item'" if array_depth else ""))
+    if not found: raise ValueError("Collection has no 'item' array")
+
+def collection_items(collection):
+    """The top-level `item` list of a parsed collection; ValueError for anything that is not a collection
+    (same errors as the low-memory scanner)"""
+    if not isinstance(collection, dict): raise ValueError("Expecting a collection object at the root")
+    items = collection.get('item')
+    if not isinstance(items, list): raise ValueError("Collection has no 'item' array")
+    return items
+
+def lean_item(item):
+    """Copy of an item tree keeping only names, folders and requests (drops recorded example responses)"""
+    lean = {"name": item.get('name', 'Unnamed')}
+    stack = [(item, lean)]
+    while stack:
+        src, dst = stack.pop()
+        if 'item' in src:
+            dst['item'] = []
+            for child in src['item']:
+                child_lean = {"name": child.get('name', 'Unnamed')}
+                dst['item'].append(child_lean)
+                stack.append((child, child_lean))
+        elif 'request' in src:
+            dst['request'] = src['request']
+    return lean
+
+def analyze_collection_stream(data, swagger_data=None, templates=None, result_cache=None, trace=None):
+    """Walks the top-level items one at a time (peak memory ~ one top-level item) and emits findings as it goes.
+    Only the top level is streamed: a collection wrapped in a single root folder is still parsed as one item.
+    Returns lean items, their byte spans in `data` and the four finding lists; findings point into the lean items.
+    Raises ValueError for documents that are not a complete collection (see iter_collection_item_spans)."""
+    if swagger_data and templates is None: templates = build_request_templates(swagger_data)
+    lean_items, spans = [], []
+    syntax_errs, zero_warns, missing_bodies, schema_errs = [], [], [], []
+    seq = 0
+    for start, end in iter_collection_item_spans(data):
+        item = lean_item(timed(trace, "json.loads (items)", json.loads, data[start:end]))
+        lean_items.append(item)
+        spans.append((start, end))
+        for full_path, req_item in iter_collection_requests([item]):
+            s, z, m, v = analyze_request(req_item, full_path, seq, templates, None, result_cache, trace)
+            syntax_errs.extend(s)
+            zero_warns.extend(z)
+            missing_bodies.extend(m)
+            schema_errs.extend(v)
+            seq += 1
+    return lean_items, spans, syntax_errs, zero_warns, missing_bodies, schema_errs
+
+def _merge_request_bodies(original, lean):
+    """Copies edited request bodies from the lean tree onto the original one. Returns True if anything changed."""
+    changed = False
+    stack = [(original, lean)]
+    while stack:
+        orig, edit = stack.pop()
+        if 'item' in orig and 'item' in edit:
+            stack.extend(zip(orig['item'], edit['item']))
+        elif 'request' in orig and 'request' in edit:
+            if orig['request'].get('body') != edit['request'].get('body'):
+                orig['request']['body'] = edit['request'].get('body')
+                changed = True
+    return changed
+
+def export_streamed_collection(data, spans, lean_items):
+    """Rebuilds the collection bytes: untouched items are copied from `data` by offset, edited ones re-encoded"""
+    chunks, last = [], 0
+    for (start, end), lean in zip(spans, lean_items):
+        chunks.append(data[last:start])
+        original = json.loads(data[start:end])
+        if _merge_request_bodies(original, lean):
+            chunks.append(json.dumps(original, indent=4, ensure_ascii=False).encode('utf-8'))
+        else:
+            chunks.append(data[start:end])
+        last = end
+    chunks.append(data[last:])
+    return b"".join(chunks)
+
+
+# --- Export (chunked JSON encoding) ---
+EXPORT_FORMATS = ("pretty", "compact", "gzip")
+
+def _iter_json_text(collection, compact):
+    if compact and isinstance(collection, dict):
+        # Top-level items are encoded one by one with the C encoder, the full text is never built
+        dumps = lambda v: json.dumps(v, ensure_ascii=False, separators=(',', ':'))
+        yield "{"
+        for n, (key, value) in enumerate(collection.items()):
+            yield ("," if n else "") + dumps(key) + ":"
+            if key == 'item' and isinstance(value, list):
+                yield "["
+                for i, item in enumerate(value):
+                    yield ("," if i else "") + dumps(item)
+                yield "]"
+            else:
+                yield dumps(value)
+        yield "}"
+    elif compact:
+        yield json.dumps(collection, ensure_ascii=False, separators=(',', ':'))
+    else:
+        yield from json.JSONEncoder(ensure_ascii=False, indent=4).iterencode(collection)
+
+def iter_collection_chunks(collection, compact=False, chunk_size=1 << 16):
+    """Streams the collection as UTF-8 JSON chunks of ~chunk_size characters (pretty = json.dumps(indent=4) output)"""
+    buf, size = [], 0
+    for piece in _iter_json_text(collection, compact):
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buf).encode('utf-8')
+            buf, size = [], 0
+    if buf: yield "".join(buf).encode('utf-8')
+
+def gzip_chunks(chunks):
+    out = io.BytesIO()
+    with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6, mtime=0) as gz:
+        for chunk in chunks:
+            gz.write(chunk)
+    return out.getvalue()
+
+def encode_collection(collection, fmt="pretty"):
+    """Collection bytes for download: 'pretty' (indent=4), 'compact' or 'gzip' (compact JSON, gzipped)"""
+    if fmt == "gzip": return gzip_chunks(iter_collection_chunks(collection, compact=True))
+    return b"".join(iter_collection_chunks(collection, compact=fmt == "compact"))
+
+# ==========================================
+# 2. Generator (Excel -> Postman)
+# ==========================================
+# --- URL sheets (only the first two columns are read) ---
+URL_CHUNK_ROWS = 50_000
+
+def _csv_chunks(source, chunk_rows):
+    """C-parser chunks of the Old/New columns, cells kept as text"""
+    import pandas as pd
+    with pd.read_csv(source, usecols=[0, 1], dtype=str, chunksize=chunk_rows) as reader:
+        yield from reader
+
+def _sheet_header(row):
+    """Column names like pd.read_excel gives them (blank -> 'Unnamed: i', a repeated name gets '.1')"""
+    names = [f"Unnamed: {i}" if cell is None else str(cell) for i, cell in enumerate(row)]
+    names += [f"Unnamed: {i}" for i in range(len(names), 2)]
+    if names[1] == names[0]: names[1] += ".1"
+    return names
+
+# Minimal .xlsx row streamer: the sheet XML is parsed row by row (C expat) and only cells of the first two columns
+# are converted, instead of building an openpyxl cell for every cell of every row
+def _xml_name(tag): return tag.rsplit('}', 1)[-1]
+
+def _column_index(ref):
+    col = 0
+    for ch in ref:
+        if not ch.isalpha(): break
+        col = col * 26 + ord(ch.upper()) - 64
+    return col - 1
+
+def _xlsx_parts(zf):
+    """({sheet name: part path} in workbook order, shared strings part or None)"""
+    import xml.etree.ElementTree as ET
+    targets, shared = {}, None
+    for rel in ET.fromstring(zf.read('xl/_rels/workbook.xml.rels')):
+        target = rel.get('Target', '')
+        target = target[1:] if target.startswith('/') else 'xl/' + target
+        targets[rel.get('Id')] = target
+        if rel.get('Type', '').endswith('/sharedStrings'): shared = target
+    sheets = {}
+    for el in ET.fromstring(zf.read('xl/workbook.xml')).iter():
+        if _xml_name(el.tag) == 'sheet':
+            rel_id = next((v for k, v in el.attrib.items() if _xml_name(k) == 'id'), None)
+            sheets[el.get('name')] = targets.get(rel_id)
+    return sheets, shared
+
+def _shared_strings(zf, part):
+    import xml.etree.ElementTree as ET
+    if part is None or part not in zf.namelist(): return []
+    strings = []
+    for _, el in ET.iterparse(zf.open(part)):
+        if _xml_name(el.tag) != 'si': continue
+        # Plain <t>, or the <t> of each rich-text run <r>; phonetic hints (<rPh>) are not part of the value
+        strings.append("".join((t.text or "") for child in el for t in ([child] if _xml_name(child.tag) == 't' else
+                               [x for x in child if _xml_name(x.tag) == 't'] if _xml_name(child.tag) == 'r' else [])))
+        el.clear()
+    return strings
+
+def _cell_value(cell, shared):
+    """Typed value like openpyxl (data_only) gives it; None for an empty cell"""
+    kind = cell.get('t', 'n')
+    if kind == 'inlineStr': return "".join(t.text or "" for t in cell.iter() if _xml_name(t.tag) == 't')
+    value = next((c.text for c in cell if _xml_name(c.tag) == 'v'), None)
+    if value is None: return None
+    if kind == 's': return shared[int(value)]
+    if kind == 'b': return value == '1'
+    if kind in ('str', 'e', 'd'): return value
+    return float(value) if '.' in value or 'E' in value or 'e' in value else int(value)
+
+def _iter_xlsx_rows(source, sheet):
+    """(row number from 0 = header, (col A, col B)) for the rows present in the sheet XML"""
+    import xml.etree.ElementTree as ET
+    import zipfile
+    with zipfile.ZipFile(source) as zf:
+        sheets, shared_part = _xlsx_parts(zf)
+        if sheet is None: sheet = next(iter(sheets))
+        if sheet not in sheets: raise ValueError(f"Worksheet named '{sheet}' not found")
+        shared = _shared_strings(zf, shared_part)
+        row_no = -1
+        for _, el in ET.iterparse(zf.open(sheets[sheet])):
+            if _xml_name(el.tag) != 'row': continue
+            row_no = int(el.get('r')) - 1 if el.get('r') else row_no + 1
+            values = [None, None]
+            for pos, cell in enumerate(el):
+                col = _column_index(cell.get('r')) if cell.get('r') else pos
+                if col < 2: values[col] = _cell_value(cell, shared)
+            el.clear()
+            yield row_no, values
+
+def _excel_chunks(source, sheet, chunk_rows):
+    """Streams the Old/New columns of one sheet: memory stays at one chunk (plus the shared strings) whatever the
+    workbook size. Rows are indexed like pd.read_excel (0 = first row under the header)."""
+    import pandas as pd
+    rows = _iter_xlsx_rows(source, sheet)
+    first = next(rows, None)
+    if first is not None and first[0] > 0: rows, first = chain([first], rows), None   # no header row in the XML
+    names = _sheet_header(first[1] if first else ())
+    batch, labels, emitted = [], [], False
+    for row_no, (old, new) in rows:
+        # Blank cells become "" (dropped / no New URL downstream, like NaN from pd.read_excel)
+        batch.append(("" if old is None else old, "" if new is None else new))
+        labels.append(row_no - 1)
+        if len(batch) == chunk_rows:
+            yield pd.DataFrame(batch, columns=names, index=labels, dtype=object)
+            batch, labels, emitted = [], [], True
+    if batch or not emitted: yield pd.DataFrame(batch, columns=names, index=labels, dtype=object)
+
+def iter_url_table_chunks(source, filename, sheet=None, chunk_rows=URL_CHUNK_ROWS):
+    """The Old/New URL sheet (CSV or Excel) as DataFrame chunks of up to `chunk_rows` rows, indexed by row number.
+    CSV goes through the pandas C parser, .xlsx through the row streamer above (no openpyxl); pandas is only
+    imported here."""
+    if filename.endswith('.csv'): return _csv_chunks(source, chunk_rows)
+    return _excel_chunks(source, sheet, chunk_rows)
+
+def read_url_table(source, filename, sheet=None):
+    """Reads the Old/New URL sheet (CSV or Excel) in one DataFrame"""
+    import pandas as pd
+    return pd.concat(list(iter_url_table_chunks(source, filename, sheet)))
+
+def sheet_names(source):
+    import zipfile
+    with zipfile.ZipFile(source) as zf:
+        return list(_xlsx_parts(zf)[0])
+
+def _read_sheet(path, sheet):
+    return read_url_table(path, ".xlsx", sheet)
+
+def read_url_sheets(source, filename, sheets=None, workers=None):
+    """{sheet name: DataFrame} for every sheet of the workbook (or `sheets`), in workbook order. A CSV file is a
+    single sheet named after the file.
+    The row loop of the .xlsx streamer is Python, so a workbook given by path is read by `workers` spawned
+    processes (default one per sheet up to the CPU count); each opens the file itself and parses only its sheet.
+    A file object (e.g. a Streamlit upload) is read sheet after sheet in the calling process."""
+    if filename.endswith('.csv'):
+        return {os.path.splitext(os.path.basename(filename))[0]: read_url_table(source, filename)}
+    if not isinstance(source, str):
+        return {name: read_url_table(source, ".xlsx", name) for name in sheets or sheet_names(source)}
+    sheets = sheets or sheet_names(source)
+    workers = min(len(sheets), os.cpu_count() or 1) if workers is None else min(workers, len(sheets))
+    if workers <= 1: return {name: _read_sheet(source, name) for name in sheets}
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn, not fork: safe from threaded callers and nothing of the parent is copied into the workers
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return dict(zip(sheets, pool.map(_read_sheet, [source] * len(sheets), sheets)))
+
+def _template_url(url, parts, template):
+    """Postman url of the New request: `{param}` segments become `:param` variables with sample values, and the
+    template's query params are listed (optional ones disabled, required ones appended to the raw URL)"""
+    out = {"raw": url, "host": parts[2:3], "path": parts[3:]}
+    if template is None: return out
+    variables = [{"key": p['key'], "value": p['value']} for p in template['path_params'] if "{" + p['key'] + "}" in url]
+    if variables:
+        for v in variables: url = url.replace("{" + v['key'] + "}", ":" + v['key'])
+        parts = url.split('/')
+        out.update(raw=url, path=parts[3:], variable=variables)
+    if template['query'] and '?' not in url:
+        out['query'] = [{"key": q['key'], "value": q['value']} if q['required'] else {"key": q['key'], "value": q['value'], "disabled": True}
+                        for q in template['query']]
+        required = "&".join(f"{q['key']}={q['value']}" for q in template['query'] if q['required'])
+        if required: out['raw'] = f"{url}?{required}"
+    return out
+
+def _template_body(template, body_content):
+    if template is not None and template['form'] is not None:
+        return {"mode": template['body_mode'], template['body_mode']: [dict(f) for f in template['form']]}
+    return {"mode": "raw", "raw": body_content, "options": {"raw": {"language": "json"}}}
+
+def _generate_folder(index, old_url, old_parts, has_new, clean_new_url, new_parts, templates):
+    """One sheet row -> its folder (Old request, plus the New request unless the API is cancelled)"""
+    old_name = old_parts[-1]
+    folder_name = f"{index + 1:02d}_{old_name}"
+
+    body_content, desc = "{}", ""
+
+    # Swagger Extraction
+    template = find_request_template(clean_new_url, templates) if has_new else None
+    if template:
+        desc = template['description']
+        if template['body'] is not None: body_content = template['body']
+
+    folder = {"name": folder_name, "item": []}
+
+    old_req = {
+        "name": f"Old_{old_name}", 
+        "event": [{"listen": "test", "script": {"exec": list(TEST_SCRIPT_OLD_BASE), "type": "text/javascript"}}], 
+        "request": {
+            "method": "POST", 
+            "header": [{"key": "Content-Type", "value": "application/json"}], 
+            "url": {"raw": old_url, "host": old_parts[2:3], "path": old_parts[3:]}, 
+            "body": {"mode": "raw", "raw": body_content, "options": {"raw": {"language": "json"}}}
+        }
+    }
+
+    if has_new:
+        folder['item'].append(old_req)
+        new_name = new_parts[-1]
+        method = template['method'] if template else "POST"
+        bodyless = template is not None and template['body'] is None and template['form'] is None and method in ("GET", "HEAD")
+        new_body = None if bodyless else _template_body(template, body_content)
+        new_req = {
+            "name": f"New Core_{new_name}", 
+            "event": [{"listen": "test", "script": {"exec": TEST_SCRIPT_NEW_SMART, "type": "text/javascript"}}], 
+            "request": {
+                "method": method, 
+                "header": ([{"key": "Content-Type", "value": "application/json"}] if new_body and new_body['mode'] == "raw" else []) +
+                          ([dict(h) for h in template['headers']] if template else []), 
+                "url": _template_url(clean_new_url, new_parts, template), 
+                "body": new_body, 
+                "description": desc
+            }
+        }
+        if bodyless: del new_req['request']['body']
+        folder['item'].append(new_req)
+    else:
+        old_req['event'][0]['script']['exec'] += TEST_SCRIPT_CANCELLED
+        folder['item'].append(old_req)
+
+    return folder
+
+def _new_collection(coll_name):
+    return {
+        "info": {"name": coll_name, "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"}, 
+        "item": [], 
+        "variable": [{"key": "previous_response", "value": "", "type": "string"}, 
+                     {"key": "previous_status", "value": "", "type": "string"},
+                     {"key": "previous_time", "value": "0", "type": "string"}]
+    }
+
+def _generate_folders(frames, templates):
+    """Row folders of the URL sheet (a DataFrame or an iterable of its chunks), first two columns"""
+    if hasattr(frames, 'columns'): frames = (frames,)
+    folders = []
+    for df in frames:
+        col_old, col_new = df.columns[0], df.columns[1]
+
+        # Column-wise URL cleaning (pandas string ops), the row loop below only assembles dicts
+        # map(str) rather than astype(str): missing cells must become the literal 'nan' / 'None' like str(cell)
+        old_urls = df[col_old].map(str).astype(str).str.strip()
+        new_urls_raw = df[col_new].map(str).astype(str).str.strip()
+        keep = ((old_urls != 'nan') & (old_urls != '')).to_numpy()
+        old_urls, new_urls_raw, labels = old_urls[keep], new_urls_raw[keep], df.index[keep]
+
+        clean_new_urls = new_urls_raw.str.extract(r'(https?://[^\s]+)', expand=False)
+        has_new_col = clean_new_urls.notna() & ~new_urls_raw.str.contains("---", regex=False)
+        clean_new_urls = clean_new_urls.where(has_new_col, "")
+
+        rows = zip(labels, old_urls.tolist(), old_urls.str.split('/').tolist(), has_new_col.tolist(),
+                   clean_new_urls.tolist(), clean_new_urls.str.split('/').tolist())
+        # The loop only allocates acyclic dicts: pausing the cyclic GC avoids repeated full scans of the growing collection
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for row in rows: folders.append(_generate_folder(*row, templates))
+        finally:
+            if gc_was_enabled: gc.enable()
+    return folders
+
+def generate_collection(df, swagger, coll_name, templates=None):
+    """Builds the Old vs New comparison collection from the URL sheet (first two columns), given as a DataFrame or
+    as chunks (iter_url_table_chunks). New requests take method, body and params from the precomputed request
+    templates (build_request_templates)."""
+    if templates is None: templates = build_request_templates(swagger)
+    collection = _new_collection(coll_name)
+    collection['item'] = _generate_folders(df, templates)
+    return collection
+
+def generate_workbook_collection(sheets, swagger, coll_name, templates=None):
+    """Like generate_collection for a whole workbook: {sheet name: DataFrame or chunks} -> one folder group per sheet"""
+    if templates is None: templates = build_request_templates(swagger)
+    collection = _new_collection(coll_name)
+    collection['item'] = [{"name": str(name), "item": _generate_folders(frames, templates)} for name, frames in sheets.items()]
+    return collection
+
+
+# ==========================================
+# 3. Caching (parsed uploads, derived indexes)
+# ==========================================
+def content_digest(data):
+    """Stable hash of uploaded bytes, used as cache key"""
+    return hashlib.sha256(data).hexdigest()
+
+def new_lru_cache(max_bytes):
+    """Thread-safe LRU bounded by the total byte size of the cached inputs"""
+    return {"entries": OrderedDict(), "bytes": 0, "max_bytes": max_bytes, "lock": threading.Lock()}
+
+def lru_get_or_build(cache, key, size, build):
+    """Returns the cached value for `key`, or builds it and stores it (evicting least recently used entries).
+    Cached values are shared, callers must treat them as read-only."""
+    with cache['lock']:
+        if key in cache['entries']:
+            cache['entries'].move_to_end(key)
+            return cache['entries'][key][0]
+    value = build()
+    if size > cache['max_bytes']: return value
+    with cache['lock']:
+        if key not in cache['entries']:
+            cache['entries'][key] = (value, size)
+            cache['bytes'] += size
+        while cache['bytes'] > cache['max_bytes']:
+            _, (_, old_size) = cache['entries'].popitem(last=False)
+            cache['bytes'] -= old_size
+    return value
+
+def prepare_swagger(swagger):
+    """Parsed Swagger document plus everything derived from it once (request templates and their path index)"""
+    return {
+        "swagger": swagger,
+        "templates": build_request_templates(swagger),
+    }
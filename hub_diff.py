@@ -0,0 +1,171 @@
+"""Structural JSON diff for Old vs New responses.
+
+The walk only descends into subtrees that differ: identical subtrees are skipped with C-level checks (`==` on
+the parsed JSON, which stops at the first difference, then a marshal dump of both sides, because `==` takes
+true / false for 1 / 0), so a diff of multi-MB responses costs a few C-speed passes over the data. Arrays of objects can be matched by a key field instead of by position, and
+ignore patterns drop volatile fields (timestamps, GUIDs) from the report.
+
+A diff record is a dict: {"path", "field", "kind", "old", "new"} where `kind` is one of DIFF_KINDS and
+`field` is the path with array positions / keys collapsed to `[]`, used to aggregate across a collection.
+"""
+import fnmatch
+import marshal
+import re
+from functools import lru_cache
+
+DIFF_KINDS = ("added", "removed", "changed", "type")
+DEFAULT_ARRAY_KEYS = ("id", "guid", "code", "key")
+_CONTAINERS = (dict, list)
+
+
+# --- Diff ---
+@lru_cache(maxsize=64)
+def _ignore_matcher(patterns):
+    """One compiled regex for all ignore globs (`*` spans dots: '*.createdAt' matches at any depth)"""
+    if not patterns: return None
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns)).match
+
+
+def _type_name(value):
+    if value is None: return "null"
+    if isinstance(value, bool): return "boolean"
+    if isinstance(value, (int, float)): return "number"
+    if isinstance(value, str): return "string"
+    return "array" if isinstance(value, list) else "object"
+
+
+def _key_token(value):
+    """Hashable, type-aware identity of an array key value (True and 1 stay distinct)"""
+    return (type(value).__name__, value)
+
+
+def _array_key(old, new, array_keys):
+    """First key present (and unique) in every element of both arrays, or None to match by position"""
+    if not array_keys or not old or not new: return None
+    if not all(isinstance(x, dict) for x in old) or not all(isinstance(x, dict) for x in new): return None
+    for key in array_keys:
+        if all(key in x and not isinstance(x[key], _CONTAINERS) for x in old) and \
+                all(key in x and not isinstance(x[key], _CONTAINERS) for x in new):
+            old_values = [_key_token(x[key]) for x in old]
+            new_values = [_key_token(x[key]) for x in new]
+            if len(set(old_values)) == len(old) and len(set(new_values)) == len(new): return key
+    return None
+
+
+class _Missing:
+    __slots__ = ()
+
+
+_MISSING = _Missing()
+
+
+def _same_encoding(a, b):
+    """C-level check that tells true from 1 at every level. Format 2 has no back-references, so equal values
+    always dump to the same bytes (dict key order and 1 vs 1.0 still differ: callers then compare item by item)."""
+    return marshal.dumps(a, 2) == marshal.dumps(b, 2)
+
+
+def json_equal(a, b):
+    """JSON equality: `==`, except that true / false never equal 1 / 0 (numbers still compare by value, 1 == 1.0)"""
+    if a is b: return True
+    if _type_name(a) != _type_name(b): return False
+    if not isinstance(a, _CONTAINERS): return a == b
+    if a != b: return False
+    if _same_encoding(a, b): return True
+    # Equal for Python but written differently (key order, 1 vs 1.0, or a bool / int swap): compare item by item
+    if isinstance(a, dict): return all(json_equal(value, b[key]) for key, value in a.items())
+    return all(json_equal(x, y) for x, y in zip(a, b))
+
+
+def _join(path, key):
+    return f"{path}.{key}" if path else str(key)
+
+
+def diff_json(old, new, ignore=(), array_keys=DEFAULT_ARRAY_KEYS, max_records=None):
+    """Structured differences between two parsed JSON documents, in document order"""
+    ignored = _ignore_matcher(tuple(ignore))
+    records = []
+
+    def emit(path, field, kind, a, b):
+        records.append({"path": path, "field": field, "kind": kind, "old": a, "new": b})
+
+    stack = [("", "", old, new)]
+    while stack:
+        if max_records is not None and len(records) >= max_records: return records[:max_records]
+        path, field, a, b = stack.pop()
+        if ignored and path and ignored(path): continue
+        if a is _MISSING:
+            emit(path, field, "added", None, b)
+            continue
+        if b is _MISSING:
+            emit(path, field, "removed", a, None)
+            continue
+        if _type_name(a) != _type_name(b):
+            emit(path, field, "type", a, b)
+            continue
+        if not isinstance(a, _CONTAINERS):
+            if a != b: emit(path, field, "changed", a, b)
+            continue
+        # `==` alone would take a nested true for 1
+        if a is b or (a == b and _same_encoding(a, b)): continue
+
+        pending = []
+        if isinstance(a, dict):
+            for key, value in a.items():
+                pending.append((_join(path, key), _join(field, key), value, b.get(key, _MISSING)))
+            pending.extend((_join(path, key), _join(field, key), _MISSING, value) for key, value in b.items() if key not in a)
+        else:
+            key = _array_key(a, b, array_keys)
+            child_field = f"{field}[]"
+            if key is None:
+                for i in range(max(len(a), len(b))):
+                    pending.append((_join(path, i), child_field, a[i] if i < len(a) else _MISSING, b[i] if i < len(b) else _MISSING))
+            else:
+                by_key = {_key_token(x[key]): x for x in b}
+                seen = set()
+                for x in a:
+                    token = _key_token(x[key])
+                    seen.add(token)
+                    pending.append((f"{path}[{key}={x[key]}]", child_field, x, by_key.get(token, _MISSING)))
+                pending.extend((f"{path}[{key}={x[key]}]", child_field, _MISSING, x) for x in b if _key_token(x[key]) not in seen)
+
+        stack.extend(reversed(pending))
+    return records if max_records is None else records[:max_records]
+
+
+# --- Reporting ---
+def preview(value, limit=80):
+    """Short printable form of a diff value (containers are only sized, long strings cut)"""
+    if isinstance(value, dict): return f"<object {len(value)} keys>"
+    if isinstance(value, list): return f"<array {len(value)} items>"
+    if isinstance(value, str) and len(value) > limit: return value[:limit] + "..."
+    return value
+
+
+def compact_records(records):
+    """Records safe to put in a report: container values replaced by their preview"""
+    return [{**r, "old": preview(r['old']), "new": preview(r['new'])} for r in records]
+
+
+def format_diff(record):
+    """findDiff-style message for one record"""
+    path = record['path'] or "(root)"
+    if record['kind'] == "added": return f"[NEW FIELD] '{path}'"
+    if record['kind'] == "removed": return f"[MISSING FIELD] '{path}'"
+    return f"[VALUE DIFF] '{path}': Old({preview(record['old'])}) vs New({preview(record['new'])})"
+
+
+def summarize_fields(diff_lists):
+    """Per-field counts across a collection: one row per `field` with a count per kind and the number of
+    pairs (responses) where the field differed, most widespread first"""
+    fields = {}
+    for records in diff_lists:
+        touched = set()
+        for r in records:
+            row = fields.get(r['field'])
+            if row is None:
+                row = fields[r['field']] = {"field": r['field'] or "(root)", **{k: 0 for k in DIFF_KINDS}, "pairs": 0}
+            row[r['kind']] += 1
+            touched.add(r['field'])
+        for f in touched: fields[f]['pairs'] += 1
+    return sorted(fields.values(), key=lambda row: (-row['pairs'], row['field']))
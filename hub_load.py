@@ -0,0 +1,164 @@
+"""Load-test mode for the generated Old vs New comparison collection.
+
+Drives the Old/New pairs of a Generator collection (with the bodies it built from Swagger) through a ramp of
+concurrency levels with pooled async httpx clients. Every stage runs closed-loop workers for a fixed time,
+round-robin over the APIs: first against the Old endpoints, then against the New ones at the same concurrency, so
+both sides get the same offered load without competing for client resources. Per API and stage it records
+throughput, error rate and a latency histogram (hub_stats); `load_rows` puts Old and New side by side.
+
+Errors are transport failures (timeouts, refused / reset connections), 5xx and 429 responses -- what breaks under
+load, as opposed to a 4xx the same body also gets at concurrency 1. Latency is taken from successful requests only.
+"""
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from itertools import count
+
+from hub_replay import PERF_FACTOR, PERF_SLACK_MS, extract_request_pairs, make_rate_limiter, pooled_client, send_request
+from hub_stats import hist_merge, hist_record, hist_summary, new_histogram
+
+DEFAULT_RAMP = (1, 10, 50)
+MAX_ERROR_RATE_INCREASE = 0.01   # New may fail up to 1 point more often than Old before it is flagged
+TOTAL_FOLDER = "(all APIs)"
+MAX_ERROR_KINDS = 5
+# Workers sharing one httpx client. The httpcore pool does work proportional to its queued requests on every
+# request, so one client for hundreds of workers caps out far below the servers (50 workers: ~200 req/s vs ~1400)
+WORKERS_PER_CLIENT = 4
+
+
+def parse_ramp(text):
+    """'1, 10, 50' -> (1, 10, 50)"""
+    try:
+        levels = tuple(int(x) for x in str(text).replace(' ', '').split(',') if x)
+    except ValueError:
+        levels = ()
+    if not levels or min(levels) < 1: raise ValueError(f"Invalid concurrency ramp: {text!r} (expected e.g. 1,10,50)")
+    return levels
+
+
+def is_load_error(status, error):
+    return error is not None or status is None or status >= 500 or status == 429
+
+
+def _targets(pairs, side):
+    """Request specs of one side with the body encoded once (it is sent thousands of times)"""
+    return [dict(p[side], body=p[side]['body'].encode('utf-8') if p[side]['body'] else None) for p in pairs]
+
+
+def _new_stats():
+    return {"requests": 0, "errors": 0, "error_kinds": {}, "hist": new_histogram()}
+
+
+async def _worker(client, targets, cursor, deadline, throttle, stats):
+    while time.monotonic() < deadline:
+        i = next(cursor) % len(targets)
+        # The response body is read but never parsed
+        result = await send_request(client, targets[i], throttle, parse_json=False)
+        s = stats[i]
+        s['requests'] += 1
+        if is_load_error(result['status'], result['error']):
+            s['errors'] += 1
+            kind = result['error'] or f"HTTP {result['status']}"
+            s['error_kinds'][kind] = s['error_kinds'].get(kind, 0) + 1
+        else:
+            hist_record(s['hist'], result['time_ms'])
+
+
+async def run_stage(clients, targets, concurrency, seconds, throttle):
+    """`concurrency` workers send back to back for `seconds` -> (stats per target, elapsed seconds). Worker i uses
+    clients[i // WORKERS_PER_CLIENT]. Requests in flight at the deadline are awaited and counted, so elapsed is
+    slightly above `seconds`."""
+    stats = [_new_stats() for _ in targets]
+    cursor = count()
+    started = time.monotonic()
+    await asyncio.gather(*(_worker(clients[i // WORKERS_PER_CLIENT], targets, cursor, started + seconds, throttle, stats)
+                           for i in range(concurrency)))
+    return stats, time.monotonic() - started
+
+
+async def load_test_pairs(pairs, ramp=DEFAULT_RAMP, stage_seconds=10.0, rate=None, timeout=30.0, verify=True, progress=None):
+    """{"folders": [...], "stages": [{concurrency, side, elapsed_s, stats (one per folder)}], "skipped": [{folder, reason}]}
+    for every ramp level, Old then New. Cancelled pairs are left out, pairs that cannot be sent as is are listed in
+    `skipped`. `progress(done, total)` is called after each stage."""
+    skipped = [{"folder": p['folder'], "reason": p['skipped']} for p in pairs if p['new'] and p['skipped']]
+    pairs = [p for p in pairs if p['new'] and not p['skipped']]
+    result = {"folders": [p['folder'] for p in pairs], "stages": [], "skipped": skipped}
+    if not pairs: return result
+    targets = {side: _targets(pairs, side) for side in ("old", "new")}
+    throttle = make_rate_limiter(rate)
+    total = len(ramp) * 2
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(pooled_client(WORKERS_PER_CLIENT, timeout, verify))
+                   for _ in range(-(-max(ramp) // WORKERS_PER_CLIENT))]
+        for level in ramp:
+            for side in ("old", "new"):
+                stats, elapsed = await run_stage(clients, targets[side], level, stage_seconds, throttle)
+                result['stages'].append({"concurrency": level, "side": side, "elapsed_s": elapsed, "stats": stats})
+                if progress: progress(len(result['stages']), total)
+    return result
+
+
+def run_load_test(collection, ramp=DEFAULT_RAMP, stage_seconds=10.0, rate=None, timeout=30.0, variables=None,
+                  verify=True, progress=None):
+    """Synchronous entry point: extracts the pairs of a Generator collection and load tests them"""
+    pairs = extract_request_pairs(collection, variables)
+    return asyncio.run(load_test_pairs(pairs, ramp, stage_seconds, rate, timeout, verify, progress))
+
+
+# --- Report ---
+def _side_metrics(stats, elapsed):
+    summary = hist_summary(stats['hist'])
+    return {"requests": stats['requests'], "rps": stats['requests'] / elapsed if elapsed else 0.0,
+            "error_rate": stats['errors'] / stats['requests'] if stats['requests'] else None,
+            "p50": summary['p50'], "p95": summary['p95'], "p99": summary['p99'], "error_kinds": stats['error_kinds']}
+
+
+def load_status(old, new):
+    """'ok', 'errors' (New fails noticeably more often), 'slower' (New p95 above max(1.5x, +200ms) of Old) or 'no data'"""
+    if not new['requests']: return "no data"
+    if (new['error_rate'] or 0) > (old['error_rate'] or 0) + MAX_ERROR_RATE_INCREASE: return "errors"
+    if old['p95'] is not None and new['p95'] is not None and new['p95'] > max(old['p95'] * PERF_FACTOR, old['p95'] + PERF_SLACK_MS):
+        return "slower"
+    return "ok"
+
+
+def _row(level, folder, old, new):
+    row = {"concurrency": level, "folder": folder, "status": load_status(old, new)}
+    for key, digits in (("requests", None), ("rps", 1), ("error_rate", 4), ("p50", 1), ("p95", 1), ("p99", 1)):
+        for side, metrics in (("old", old), ("new", new)):
+            value = metrics[key]
+            row[f"{side}_{key}"] = value if digits is None or value is None else round(value, digits)
+    kinds = {**{f"old {k}": n for k, n in old['error_kinds'].items()}, **{f"new {k}": n for k, n in new['error_kinds'].items()}}
+    row["top_errors"] = "; ".join(f"{k} x{n}" for k, n in sorted(kinds.items(), key=lambda kv: -kv[1])[:MAX_ERROR_KINDS])
+    return row
+
+
+def load_rows(result):
+    """Flat rows, Old and New side by side: per concurrency level a total row for all APIs, then one per API"""
+    rows = []
+    # Stages come as (Old, New) at each ramp level; a level may repeat (e.g. 1,50,1 to check recovery)
+    for old_stage, new_stage in zip(result['stages'][0::2], result['stages'][1::2]):
+        totals = {}
+        for side, stage in (("old", old_stage), ("new", new_stage)):
+            merged = _new_stats()
+            for s in stage['stats']:
+                merged['requests'] += s['requests']
+                merged['errors'] += s['errors']
+                for kind, n in s['error_kinds'].items(): merged['error_kinds'][kind] = merged['error_kinds'].get(kind, 0) + n
+                hist_merge(merged['hist'], s['hist'])
+            totals[side] = _side_metrics(merged, stage['elapsed_s'])
+        level = old_stage['concurrency']
+        rows.append(_row(level, TOTAL_FOLDER, totals['old'], totals['new']))
+        for i, folder in enumerate(result['folders']):
+            rows.append(_row(level, folder, _side_metrics(old_stage['stats'][i], old_stage['elapsed_s']),
+                             _side_metrics(new_stage['stats'][i], new_stage['elapsed_s'])))
+    return rows
+
+
+def summarize_load(rows):
+    """Headline per level (all APIs) plus the number of flagged APIs"""
+    totals = [r for r in rows if r['folder'] == TOTAL_FOLDER]
+    flagged = [r for r in rows if r['folder'] != TOTAL_FOLDER and r['status'] in ("errors", "slower")]
+    return {"levels": [{k: r[k] for k in ("concurrency", "status", "old_rps", "new_rps", "old_error_rate", "new_error_rate",
+                                          "old_p95", "new_p95")} for r in totals],
+            "flagged": len(flagged), "flagged_apis": sorted({r['folder'] for r in flagged})}
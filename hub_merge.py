@@ -0,0 +1,133 @@
+"""Collection diff / merge: a regenerated collection (Generator) against the hand-fixed one (Inspector).
+
+Requests of both collections are indexed by (method, normalized URL, name) -- repeated keys get an occurrence
+number -- so matching is one dict lookup per request and the whole run is linear in the number of requests plus
+the size of the bodies that actually differ. Bodies are compared as parsed JSON when both sides parse, so
+re-formatting alone is not a change; changed bodies get a structural diff (hub_diff).
+
+Merging carries the manual body fixes over onto the regenerated collection. With the originally generated
+collection as `base` it is a three-way merge: only bodies edited by hand are carried, a body that was both fixed
+and regenerated differently is reported as a conflict and the regenerated one is kept.
+"""
+import json
+
+from hub_core import iter_collection_requests, normalize_url
+from hub_diff import compact_records, diff_json, json_equal
+
+MAX_BODY_DIFFS = 20
+_UNPARSED = object()
+
+
+# --- Indexing ---
+def request_key(item):
+    req = item['request']
+    return (str(req.get('method') or 'POST').upper(), normalize_url(req.get('url', '')), item.get('name', ''))
+
+def format_key(key):
+    method, url, name, occurrence = key
+    return f"{method} {url} [{name}]" + (f" #{occurrence + 1}" if occurrence else "")
+
+def index_requests(items):
+    """{(method, url, name, occurrence): (full_path, item)} in collection order"""
+    index, seen = {}, {}
+    for full_path, item in iter_collection_requests(items):
+        key = request_key(item)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        index[key + (occurrence,)] = (full_path, item)
+    return index
+
+
+# --- Request fields ---
+def body_text(item):
+    body = item['request'].get('body') or {}
+    return (body.get('raw') or '').strip() if body.get('mode', 'raw') == 'raw' else json.dumps(body, sort_keys=True)
+
+def _is_raw(item):
+    return (item['request'].get('body') or {}).get('mode', 'raw') == 'raw'
+
+def _url_text(item):
+    url = item['request'].get('url', '')
+    return url.get('raw', '') if isinstance(url, dict) else str(url)
+
+def _headers(item):
+    return [(h.get('key'), h.get('value')) for h in item['request'].get('header') or [] if not h.get('disabled')]
+
+def _parse(text):
+    try: return json.loads(text)
+    except ValueError: return _UNPARSED
+
+def _is_empty_body(text): return not text or text == "{}"
+
+def same_body(a, b):
+    """Equal text, or equal once parsed (formatting / key spacing differences do not count; 0 -> false does)"""
+    if a == b: return True
+    parsed_a, parsed_b = _parse(a), _parse(b)
+    return parsed_a is not _UNPARSED and parsed_b is not _UNPARSED and json_equal(parsed_a, parsed_b)
+
+def body_changes(old_text, new_text, max_records=MAX_BODY_DIFFS):
+    """Compact diff records between two bodies; empty when either side is not valid JSON (text-only change)"""
+    old, new = _parse(old_text), _parse(new_text)
+    if old is _UNPARSED or new is _UNPARSED: return []
+    return compact_records(diff_json(old, new, max_records=max_records))
+
+
+# --- Diff ---
+def diff_collections(old_items, new_items, max_body_diffs=MAX_BODY_DIFFS):
+    """Added / removed / changed requests going from `old_items` to `new_items` (top-level `item` lists)"""
+    old_index, new_index = index_requests(old_items), index_requests(new_items)
+    added = [{"key": format_key(k), "path": path} for k, (path, _) in new_index.items() if k not in old_index]
+    removed = [{"key": format_key(k), "path": path} for k, (path, _) in old_index.items() if k not in new_index]
+    changed, unchanged = [], 0
+    for key, (old_path, old) in old_index.items():
+        match = new_index.get(key)
+        if match is None: continue
+        new_path, new = match
+        fields, diffs = [], []
+        if _url_text(old) != _url_text(new): fields.append("url")
+        if _headers(old) != _headers(new): fields.append("headers")
+        old_body, new_body = body_text(old), body_text(new)
+        if not same_body(old_body, new_body):
+            fields.append("body")
+            diffs = body_changes(old_body, new_body, max_body_diffs)
+        if fields:
+            changed.append({"key": format_key(key), "old_path": old_path, "new_path": new_path, "fields": fields,
+                            "body_diffs": diffs})
+        else:
+            unchanged += 1
+    summary = {"added": len(added), "removed": len(removed), "changed": len(changed), "unchanged": unchanged}
+    return {"summary": summary, "added": added, "removed": removed, "changed": changed}
+
+
+# --- Merge ---
+def _set_body(item, text):
+    body = item['request'].get('body')
+    if not isinstance(body, dict) or body.get('mode', 'raw') != 'raw':
+        body = item['request']['body'] = {"mode": "raw", "options": {"raw": {"language": "json"}}}
+    body['raw'] = text
+
+def merge_fixes(fixed_items, regenerated_items, base_items=None):
+    """Copies hand-fixed bodies from `fixed_items` onto the matching requests of `regenerated_items` (in place).
+    Empty or invalid fixed bodies are never carried. Returns records with action "carried" or "conflict"."""
+    regenerated = index_requests(regenerated_items)
+    base = index_requests(base_items) if base_items is not None else None
+    records = []
+    for key, (path, fixed) in index_requests(fixed_items).items():
+        match = regenerated.get(key)
+        if match is None: continue
+        fixed_body, target = body_text(fixed), match[1]
+        if not _is_raw(fixed) or _is_empty_body(fixed_body) or _parse(fixed_body) is _UNPARSED: continue
+        regenerated_body = body_text(target)
+        if same_body(fixed_body, regenerated_body): continue
+        base_match = base.get(key) if base is not None else None
+        if base_match is not None:
+            base_body = body_text(base_match[1])
+            if same_body(fixed_body, base_body): continue              # not edited by hand, regeneration wins
+            if not same_body(regenerated_body, base_body):             # edited by hand and regenerated differently
+                records.append({"key": format_key(key), "path": match[0], "action": "conflict",
+                                "body_diffs": body_changes(fixed_body, regenerated_body)})
+                continue
+        _set_body(target, (fixed['request'].get('body') or {}).get('raw', fixed_body))
+        records.append({"key": format_key(key), "path": match[0], "action": "carried",
+                        "body_diffs": body_changes(regenerated_body, fixed_body)})
+    return records
@@ -0,0 +1,168 @@
+"""Opt-in instrumentation: per-stage spans for the app pipelines and cProfile / tracemalloc hooks for the CLI
+and the benchmarks.
+
+Nothing here runs unless asked for. With instrumentation off the trace is None, `span()` hands back one shared
+empty context manager and `timed()` is a plain call, so the pipelines pay a single `is None` check per stage.
+"""
+import cProfile
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+PERF_LOGGER = logging.getLogger("malekah_hub.perf")
+_NULL_SPAN = nullcontext()
+_LOCAL = threading.local()
+
+
+# --- Peak memory (nestable) ---
+def _open_peaks():
+    """Peak bytes carried over for each open measurement of this thread, innermost last"""
+    peaks = getattr(_LOCAL, 'peaks', None)
+    if peaks is None: peaks = _LOCAL.peaks = []
+    return peaks
+
+
+def _peak_enter():
+    """Starts a peak measurement -> traced bytes now. tracemalloc keeps a single peak, so the peak reached so far
+    is handed to the enclosing measurement before it is reset."""
+    peaks = _open_peaks()
+    current, peak = tracemalloc.get_traced_memory()
+    if peaks: peaks[-1] = max(peaks[-1], peak)
+    tracemalloc.reset_peak()
+    peaks.append(0)
+    return current
+
+
+def _peak_exit():
+    """Peak traced bytes since the matching _peak_enter, nested measurements included"""
+    peaks = _open_peaks()
+    peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+    if peaks: peaks[-1] = max(peaks[-1], peak)
+    return peak
+
+
+# --- Stage spans ---
+def new_trace(pipeline, memory=False, **context):
+    """Empty trace for one pipeline run. `memory` also records the tracemalloc peak per span (slower)."""
+    return {"pipeline": pipeline, "context": context, "memory": memory, "spans": [], "totals": {}}
+
+
+@contextmanager
+def _span(trace, name):
+    record = {"stage": name, "ms": 0.0, "peak_kib": None}
+    trace['spans'].append(record)
+    own_tracing = trace['memory'] and not tracemalloc.is_tracing()
+    if own_tracing: tracemalloc.start()
+    if trace['memory']: base = _peak_enter()
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['ms'] = (time.perf_counter() - started) * 1000
+        if trace['memory']: record['peak_kib'] = (_peak_exit() - base) / 1024
+        if own_tracing: tracemalloc.stop()
+
+
+def span(trace, name):
+    """Times the `with` block as stage `name` (no-op when trace is None)"""
+    return _NULL_SPAN if trace is None else _span(trace, name)
+
+
+def add_time(trace, name, seconds, calls=1):
+    """Accumulates time spent in a hot-loop sub-stage (e.g. zero scanning across all requests)"""
+    total = trace['totals'].get(name)
+    if total is None: trace['totals'][name] = [seconds, calls]
+    else:
+        total[0] += seconds
+        total[1] += calls
+
+
+def timed(trace, name, func, *args):
+    """func(*args), with its duration added to the `name` total when tracing"""
+    if trace is None: return func(*args)
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        add_time(trace, name, time.perf_counter() - started)
+
+
+def trace_rows(trace):
+    """Flat rows for display: the spans in order, then the accumulated sub-stages"""
+    total_ms = sum(s['ms'] for s in trace['spans']) or 1.0
+    rows = [{"stage": s['stage'], "ms": round(s['ms'], 2), "calls": 1, "share": f"{s['ms'] / total_ms:.0%}",
+             "peak_kib": None if s['peak_kib'] is None else round(s['peak_kib'], 1)} for s in trace['spans']]
+    for name, (seconds, calls) in sorted(trace['totals'].items(), key=lambda kv: -kv[1][0]):
+        rows.append({"stage": f"  ↳ {name}", "ms": round(seconds * 1000, 2), "calls": calls,
+                     "share": f"{seconds * 1000 / total_ms:.0%}", "peak_kib": None})
+    return rows
+
+
+def log_trace(trace, start=0, logger=PERF_LOGGER):
+    """One structured (JSON) log line per stage, plus the sub-stage totals and a summary line for the whole run.
+    With `start` > 0 only the spans added since then are logged (e.g. a later export)."""
+    if not logger.isEnabledFor(logging.INFO): return
+    base = {"pipeline": trace['pipeline'], **trace['context']}
+    for s in trace['spans'][start:]:
+        logger.info(json.dumps({"event": "stage", **base, **s}, ensure_ascii=False))
+    if start: return
+    for name, (seconds, calls) in trace['totals'].items():
+        logger.info(json.dumps({"event": "substage", **base, "stage": name, "ms": seconds * 1000, "calls": calls}, ensure_ascii=False))
+    logger.info(json.dumps({"event": "run", **base, "ms": sum(s['ms'] for s in trace['spans'])}, ensure_ascii=False))
+
+
+def configure_perf_log(path=None):
+    """Sends the perf log lines (message only, one JSON object per line) to `path` or stderr. Idempotent."""
+    if PERF_LOGGER.handlers: return
+    handler = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    PERF_LOGGER.addHandler(handler)
+    PERF_LOGGER.setLevel(logging.INFO)
+    PERF_LOGGER.propagate = False
+
+
+# --- Profilers ---
+@contextmanager
+def profiled(profile_path=None, memory_top=0, stream=None):
+    """Profiles the block with cProfile (stats dumped to `profile_path`, top functions printed) and/or
+    tracemalloc (peak plus the `memory_top` biggest allocation sites printed). Reports go to `stream` (stderr)."""
+    stream = stream or sys.stderr
+    profiler = cProfile.Profile() if profile_path else None
+    tracing = memory_top > 0 and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+        _peak_enter()
+    if profiler: profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            print(f"--- cProfile (full stats: {profile_path}) ---", file=stream)
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(25)
+        if tracing:
+            snapshot = tracemalloc.take_snapshot()
+            peak = _peak_exit()
+            tracemalloc.stop()
+            print(f"--- tracemalloc: peak {peak / 2**20:.1f} MiB, top {memory_top} allocation sites ---", file=stream)
+            for stat in snapshot.statistics("lineno")[:memory_top]:
+                print(stat, file=stream)
+
+
+def measure_peak(func, *args):
+    """(result, peak traced bytes) of one call"""
+    already = tracemalloc.is_tracing()
+    if not already: tracemalloc.start()
+    base = _peak_enter()
+    try:
+        result = func(*args)
+    finally:
+        peak = _peak_exit()
+        if not already: tracemalloc.stop()
+    return result, peak - base
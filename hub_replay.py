@@ -0,0 +1,295 @@
+"""Native replay engine for the generated Old vs New comparison collection.
+
+Runs the Old/New request pairs of a Generator collection concurrently (asyncio + pooled httpx client) and applies
+the same checks as TEST_SCRIPT_OLD_BASE / TEST_SCRIPT_NEW_SMART: status 200, `success` flag, status match,
+the 1.5x / +200ms performance threshold and a deep data match (structural diff, see hub_diff). The Old request
+of a pair always runs first, pairs run in parallel up to `concurrency`, and request starts are throttled to
+`rate` per second.
+
+The benchmark mode sends N warm-up and M measured rounds per pair and compares the latency distributions
+(p50/p95/p99 from hub_stats histograms, bootstrap confidence interval on the median difference) instead of
+judging a single sample.
+"""
+import asyncio
+import re
+import time
+import uuid
+from urllib.parse import urlencode
+
+from hub_diff import DEFAULT_ARRAY_KEYS, compact_records, diff_json, format_diff, summarize_fields
+from hub_stats import compare_latency, hist_record, hist_summary, new_histogram
+
+# Same threshold as the Postman script: Math.max(oldTime * 1.5, oldTime + 200)
+PERF_FACTOR, PERF_SLACK_MS = 1.5, 200
+MAX_DIFF_MESSAGES = 20
+
+_VARIABLE_RE = re.compile(r'\{\{\s*([^{}\s]+)\s*\}\}')
+_PATH_VARIABLE_RE = re.compile(r'(?<=/):([A-Za-z_][\w.-]*)(?=/|$)')
+
+
+def substitute_variables(text, variables):
+    """Replaces Postman `{{name}}` placeholders; unknown names are left untouched"""
+    if not variables or not isinstance(text, str): return text
+    return _VARIABLE_RE.sub(lambda m: str(variables.get(m.group(1), m.group(0))), text)
+
+
+def _resolve_path_variables(url, url_item, variables):
+    """Fills `:name` path segments from the Postman `url.variable` list -> (url, unresolved names)"""
+    values = {v['key']: substitute_variables(str(v.get('value') or ''), variables)
+              for v in url_item.get('variable') or [] if isinstance(v, dict) and v.get('key')}
+    path, sep, rest = url.partition('?')
+    path = _PATH_VARIABLE_RE.sub(lambda m: values.get(m.group(1)) or m.group(0), path)
+    return path + sep + rest, _PATH_VARIABLE_RE.findall(path)
+
+
+def _encode_body(body, variables):
+    """(body text | None, Content-Type it needs | None, reason it cannot be sent | None) of a Postman body"""
+    mode = body.get('mode') or 'raw'
+    if mode == 'raw': return substitute_variables(body.get('raw') or '', variables) or None, None, None
+    if mode not in ('urlencoded', 'formdata'): return None, None, f"unsupported body mode '{mode}'"
+    fields = [f for f in body.get(mode) or [] if isinstance(f, dict) and f.get('key') and not f.get('disabled')]
+    files = [f['key'] for f in fields if f.get('type') == 'file']
+    if files: return None, None, f"unsupported body mode 'formdata' with file field '{files[0]}'"
+    fields = [(substitute_variables(f['key'], variables), substitute_variables(str(f.get('value') or ''), variables))
+              for f in fields]
+    if mode == 'urlencoded': return urlencode(fields) or None, "application/x-www-form-urlencoded", None
+    if not fields: return None, None, None
+    boundary = f"hub-replay-{uuid.uuid4().hex}"
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{key}"\r\n\r\n{value}\r\n' for key, value in fields]
+    return "".join(parts) + f"--{boundary}--\r\n", f"multipart/form-data; boundary={boundary}", None
+
+
+def request_spec(item, variables=None):
+    """Plain (method, url, headers, body) dict for a Postman request item. urlencoded / formdata bodies are encoded
+    (with their Content-Type) and `:name` path variables filled in; `unsupported` says why a request cannot be sent
+    as is (file uploads, other body modes, path variables without a value), else None."""
+    req = item['request']
+    url_item = req.get('url', '')
+    url = url_item.get('raw', '') if isinstance(url_item, dict) else url_item
+    headers = {h['key']: substitute_variables(h.get('value', ''), variables)
+               for h in req.get('header', []) if h.get('key') and not h.get('disabled')}
+    body, content_type, unsupported = _encode_body(req.get('body') or {}, variables)
+    if content_type and (content_type.startswith("multipart/") or not any(k.lower() == 'content-type' for k in headers)):
+        # A multipart Content-Type needs our boundary; Postman writes it itself
+        headers = {k: v for k, v in headers.items() if k.lower() != 'content-type'}
+        headers['Content-Type'] = content_type
+    url = substitute_variables(url, variables)
+    if isinstance(url_item, dict):
+        url, unresolved = _resolve_path_variables(url, url_item, variables)
+        if unresolved and not unsupported: unsupported = f"unresolved path variable ':{unresolved[0]}'"
+    return {
+        "name": item.get('name', 'Unnamed'),
+        "method": req.get('method', 'GET').upper(),
+        "url": url,
+        "headers": headers,
+        "body": body,
+        "unsupported": unsupported,
+    }
+
+
+def extract_request_pairs(collection, variables=None):
+    """Old/New pairs of a Generator collection, in folder order. Cancelled folders (Old only) have `new` = None;
+    `skipped` is the reason a pair cannot be replayed (see request_spec), else None."""
+    pairs = []
+    stack = [(iter(collection.get('item', [])), "")]
+    while stack:
+        it, path = stack[-1]
+        for item in it:
+            name = item.get('name', 'Unnamed')
+            full_path = f"{path} > {name}" if path else name
+            if 'item' not in item: continue
+            requests = [c for c in item['item'] if 'request' in c]
+            old = next((c for c in requests if c.get('name', '').startswith('Old_')), None)
+            new = next((c for c in requests if c.get('name', '').startswith('New Core_')), None)
+            if old is not None:
+                specs = {"old": request_spec(old, variables), "new": request_spec(new, variables) if new is not None else None}
+                reasons = [f"{side.title()}: {s['unsupported']}" for side, s in specs.items() if s and s['unsupported']]
+                pairs.append({"folder": full_path, **specs, "skipped": reasons[0] if reasons else None})
+            if any('item' in c for c in item['item']):
+                stack.append((iter(item['item']), full_path))
+                break
+        else:
+            stack.pop()
+    return pairs
+
+
+def find_json_diffs(old, new, ignore=(), array_keys=DEFAULT_ARRAY_KEYS):
+    """Field-level differences, same wording as the Postman `findDiff` helper"""
+    return [format_diff(r) for r in diff_json(old, new, ignore, array_keys)]
+
+
+def make_rate_limiter(rate):
+    """Async throttle allowing at most `rate` request starts per second (None / 0 = unlimited)"""
+    state = {"next": 0.0}
+    lock = asyncio.Lock()
+
+    async def wait():
+        if not rate: return
+        async with lock:
+            now = time.monotonic()
+            delay = state["next"] - now
+            state["next"] = max(now, state["next"]) + 1.0 / rate
+        if delay > 0: await asyncio.sleep(delay)
+    return wait
+
+
+async def send_request(client, spec, throttle, parse_json=True):
+    """Sends one request -> {status, time_ms, json, error}; `json` is None when the body is not JSON or `parse_json`
+    is off. The spec body may be pre-encoded bytes (requests sent many times)."""
+    await throttle()
+    body = spec['body']
+    started = time.perf_counter()
+    try:
+        response = await client.request(spec['method'], spec['url'], headers=spec['headers'],
+                                        content=body.encode('utf-8') if isinstance(body, str) else body or None)
+    except Exception as e:  # httpx transport errors, invalid URLs, timeouts
+        return {"status": None, "time_ms": (time.perf_counter() - started) * 1000, "json": None, "error": str(e) or type(e).__name__}
+    elapsed = (time.perf_counter() - started) * 1000
+    payload = None
+    if parse_json:
+        try: payload = response.json()
+        except ValueError: pass
+    return {"status": response.status_code, "time_ms": elapsed, "json": payload, "error": None}
+
+
+def _check(name, passed, message=""):
+    return {"name": name, "passed": bool(passed), "message": "" if passed else message}
+
+
+def compare_responses(old, new, ignore=(), array_keys=DEFAULT_ARRAY_KEYS):
+    """Checks of TEST_SCRIPT_OLD_BASE + TEST_SCRIPT_NEW_SMART for one executed pair (new = None: cancelled API)
+    -> (checks, diff records of the Deep Data Match)"""
+    checks = [_check("Old API: Status code is 200", old['status'] == 200, old['error'] or f"Status {old['status']}")]
+    old_json = old['json']
+    if isinstance(old_json, dict) and 'success' in old_json:
+        checks.append(_check("Old API: Business Logic Success", old_json['success'] is True, f"success={old_json['success']}"))
+    if new is None:
+        checks.append(_check("API Cancelled", True))
+        return checks, []
+
+    checks.append(_check("New API: Status code is 200", new['status'] == 200, new['error'] or f"Status {new['status']}"))
+    new_json = new['json']
+    if isinstance(new_json, dict) and 'success' in new_json:
+        checks.append(_check("New API: Business Success (success=true)", new_json['success'] is True,
+                             f"Business Fail: {new_json.get('message') or 'No Error Message'}"))
+    if old['status'] != new['status']:
+        checks.append(_check("Status Comparison", False,
+                             f"CRITICAL: Status Mismatch! Old: {old['status']}, New: {new['status']}"))
+        return checks, []
+    checks.append(_check("Status Codes Match", True))
+    old_time = old['time_ms'] if old['error'] is None else 0
+    if old_time > 0:
+        threshold = max(old_time * PERF_FACTOR, old_time + PERF_SLACK_MS)
+        checks.append(_check("Performance Check (New vs Old)", new['time_ms'] < threshold,
+                             f"New API is too slow! Old: {old_time:.0f}ms, New: {new['time_ms']:.0f}ms"))
+    old_data = old_json if old_json is not None else {}
+    diffs = diff_json(old_data, new_json, ignore, array_keys)
+    messages = [format_diff(r) for r in diffs[:MAX_DIFF_MESSAGES]]
+    if len(diffs) > MAX_DIFF_MESSAGES: messages.append(f"... and {len(diffs) - MAX_DIFF_MESSAGES} more")
+    checks.append(_check("Deep Data Match", not diffs, "MISMATCHES:\n" + "\n".join(messages)))
+    return checks, diffs
+
+
+async def _replay_pair(client, pair, throttle, semaphore, ignore, array_keys):
+    if pair['skipped']:
+        return {"folder": pair['folder'], "old": None, "new": None, "checks": [], "passed": False, "diffs": [],
+                "skipped": pair['skipped']}
+    async with semaphore:
+        old = await send_request(client, pair['old'], throttle)
+        new = await send_request(client, pair['new'], throttle) if pair['new'] else None
+    checks, diffs = compare_responses(old, new, ignore, array_keys)
+    strip = lambda r: r and {k: r[k] for k in ("status", "time_ms", "error")}
+    return {"folder": pair['folder'], "old": strip(old), "new": strip(new), "checks": checks,
+            "passed": all(c['passed'] for c in checks), "diffs": compact_records(diffs), "skipped": None}
+
+
+def pooled_client(concurrency, timeout, verify):
+    """Async httpx client for `concurrency` callers, each talking to the Old and the New host"""
+    import httpx  # only needed when replaying
+
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    return httpx.AsyncClient(limits=limits, timeout=timeout, verify=verify)
+
+
+async def replay_pairs(pairs, concurrency=10, rate=None, timeout=30.0, verify=True, ignore=(), array_keys=DEFAULT_ARRAY_KEYS):
+    """Replays the pairs concurrently; results come back in the same order as `pairs`"""
+    semaphore = asyncio.Semaphore(concurrency)
+    throttle = make_rate_limiter(rate)
+    async with pooled_client(concurrency, timeout, verify) as client:
+        return await asyncio.gather(*(_replay_pair(client, pair, throttle, semaphore, ignore, array_keys) for pair in pairs))
+
+
+def run_replay(collection, concurrency=10, rate=None, timeout=30.0, variables=None, verify=True, ignore=(),
+               array_keys=DEFAULT_ARRAY_KEYS):
+    """Synchronous entry point: extracts the pairs of a Generator collection and replays them"""
+    pairs = extract_request_pairs(collection, variables)
+    return asyncio.run(replay_pairs(pairs, concurrency, rate, timeout, verify, ignore, array_keys))
+
+
+def summarize_replay(results):
+    failed_checks = {}
+    for r in results:
+        for c in r['checks']:
+            if not c['passed']: failed_checks[c['name']] = failed_checks.get(c['name'], 0) + 1
+    passed = sum(1 for r in results if r['passed'])
+    skipped = sum(1 for r in results if r['skipped'])
+    return {"pairs": len(results), "passed": passed, "failed": len(results) - passed - skipped, "skipped": skipped,
+            "failed_checks": failed_checks, "fields": summarize_fields(r['diffs'] for r in results)}
+
+
+# --- Latency benchmark (N warm-up + M measured rounds per pair) ---
+async def _benchmark_pair(client, pair, throttle, semaphore, warmup, measured):
+    if pair['skipped']: return {"folder": pair['folder'], "skipped": pair['skipped']}
+    old_hist, new_hist, errors = new_histogram(), new_histogram(), 0
+    async with semaphore:
+        for _ in range(warmup):
+            await send_request(client, pair['old'], throttle)
+            await send_request(client, pair['new'], throttle)
+        # Old and New are interleaved so drift on the servers hits both sides alike
+        for _ in range(measured):
+            for spec, hist in ((pair['old'], old_hist), (pair['new'], new_hist)):
+                result = await send_request(client, spec, throttle)
+                if result['error'] is None and result['status'] is not None and result['status'] < 500:
+                    hist_record(hist, result['time_ms'])
+                else:
+                    errors += 1
+    return {"folder": pair['folder'], "old": old_hist, "new": new_hist, "errors": errors,
+            "comparison": compare_latency(old_hist, new_hist, PERF_FACTOR, PERF_SLACK_MS), "skipped": None}
+
+
+async def benchmark_pairs(pairs, warmup=3, measured=20, concurrency=4, rate=None, timeout=30.0, verify=True):
+    """Latency distributions per Old/New pair (cancelled pairs are skipped), in the same order as `pairs`"""
+    semaphore = asyncio.Semaphore(concurrency)
+    throttle = make_rate_limiter(rate)
+    async with pooled_client(concurrency, timeout, verify) as client:
+        return await asyncio.gather(*(_benchmark_pair(client, pair, throttle, semaphore, warmup, measured)
+                                      for pair in pairs if pair['new']))
+
+
+def run_benchmark(collection, warmup=3, measured=20, concurrency=4, rate=None, timeout=30.0, variables=None, verify=True):
+    pairs = extract_request_pairs(collection, variables)
+    return asyncio.run(benchmark_pairs(pairs, warmup, measured, concurrency, rate, timeout, verify))
+
+
+_BENCHMARK_COLUMNS = ("folder", "status", "samples", "errors", "old_p50", "old_p95", "old_p99", "new_p50", "new_p95", "new_p99",
+                      "delta_p50", "ci_low", "ci_high", "allowed_ms")
+
+
+def benchmark_rows(results):
+    """One flat row per folder (percentiles in ms), ready for a table or CSV export. Skipped pairs get the status
+    'skipped: <reason>' and empty numbers."""
+    rows = []
+    for r in results:
+        if r['skipped']:
+            rows.append(dict.fromkeys(_BENCHMARK_COLUMNS, None) | {"folder": r['folder'], "status": f"skipped: {r['skipped']}",
+                                                                  "samples": 0, "errors": 0})
+            continue
+        old, new, cmp = hist_summary(r['old']), hist_summary(r['new']), r['comparison']
+        row = {"folder": r['folder'], "status": cmp['status'], "samples": min(old['count'], new['count']), "errors": r['errors']}
+        for side, summary in (("old", old), ("new", new)):
+            for q in ("p50", "p95", "p99"):
+                row[f"{side}_{q}"] = round(summary[q], 1) if summary[q] is not None else None
+        for key in ("delta_p50", "ci_low", "ci_high", "allowed_ms"):
+            row[key] = round(cmp[key], 1) if cmp[key] is not None else None
+        rows.append(row)
+    return rows
@@ -0,0 +1,119 @@
+"""Latency statistics: compact log-bucket histograms, percentiles and bootstrap confidence intervals.
+
+A histogram keeps counts per bucket of ~1% relative width (plus exact count/sum/min/max), so a full latency
+distribution costs a few hundred integers no matter how many samples are recorded.
+"""
+import csv
+import io
+import math
+import random
+
+HISTOGRAM_PRECISION = 0.01   # relative bucket width
+HISTOGRAM_MIN_MS = 0.01      # values below are recorded in bucket 0
+_LOG_BASE = math.log1p(HISTOGRAM_PRECISION)
+
+
+def new_histogram():
+    return {"buckets": {}, "count": 0, "sum": 0.0, "min": None, "max": None}
+
+
+def _bucket(value_ms):
+    if value_ms <= HISTOGRAM_MIN_MS: return 0
+    return int(math.log(value_ms / HISTOGRAM_MIN_MS) / _LOG_BASE)
+
+
+def _bucket_value(index):
+    """Representative (geometric middle) value of a bucket"""
+    return HISTOGRAM_MIN_MS * (1 + HISTOGRAM_PRECISION) ** (index + 0.5)
+
+
+def hist_record(hist, value_ms):
+    b = _bucket(value_ms)
+    hist['buckets'][b] = hist['buckets'].get(b, 0) + 1
+    hist['count'] += 1
+    hist['sum'] += value_ms
+    hist['min'] = value_ms if hist['min'] is None else min(hist['min'], value_ms)
+    hist['max'] = value_ms if hist['max'] is None else max(hist['max'], value_ms)
+
+
+def hist_merge(into, other):
+    for b, n in other['buckets'].items():
+        into['buckets'][b] = into['buckets'].get(b, 0) + n
+    into['count'] += other['count']
+    into['sum'] += other['sum']
+    for key, pick in (('min', min), ('max', max)):
+        if other[key] is not None:
+            into[key] = other[key] if into[key] is None else pick(into[key], other[key])
+    return into
+
+
+def hist_percentile(hist, q):
+    """q-th percentile (0-100), accurate to the bucket width and clamped to the observed min/max"""
+    if not hist['count']: return None
+    rank = max(1, math.ceil(q / 100 * hist['count']))
+    seen = 0
+    for b in sorted(hist['buckets']):
+        seen += hist['buckets'][b]
+        if seen >= rank:
+            return min(max(_bucket_value(b), hist['min']), hist['max'])
+    return hist['max']
+
+
+def hist_summary(hist):
+    if not hist['count']:
+        return {"count": 0, "mean": None, "min": None, "max": None, "p50": None, "p95": None, "p99": None}
+    return {
+        "count": hist['count'], "mean": hist['sum'] / hist['count'], "min": hist['min'], "max": hist['max'],
+        "p50": hist_percentile(hist, 50), "p95": hist_percentile(hist, 95), "p99": hist_percentile(hist, 99),
+    }
+
+
+def _expand(hist):
+    values = []
+    for b, n in hist['buckets'].items():
+        values.extend([min(max(_bucket_value(b), hist['min']), hist['max'])] * n)
+    return values
+
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
+def bootstrap_median_delta(old_hist, new_hist, confidence=0.95, resamples=1000, seed=0):
+    """(delta, low, high): new median - old median with a bootstrap percentile confidence interval"""
+    old_values, new_values = _expand(old_hist), _expand(new_hist)
+    if not old_values or not new_values: return None, None, None
+    rng = random.Random(seed)
+    deltas = sorted(_median(rng.choices(new_values, k=len(new_values))) - _median(rng.choices(old_values, k=len(old_values)))
+                    for _ in range(resamples))
+    tail = (1 - confidence) / 2
+    low = deltas[int(tail * (resamples - 1))]
+    high = deltas[int(math.ceil((1 - tail) * (resamples - 1)))]
+    return _median(new_values) - _median(old_values), low, high
+
+
+def compare_latency(old_hist, new_hist, factor=1.5, slack_ms=200, confidence=0.95, resamples=1000, seed=0):
+    """Median-based regression check. Allowed slowdown follows the Postman rule max(old * factor, old + slack);
+    'regression' only when the whole confidence interval is above it, 'possible regression' when just the estimate is."""
+    delta, low, high = bootstrap_median_delta(old_hist, new_hist, confidence, resamples, seed)
+    if delta is None:
+        return {"status": "no data", "delta_p50": None, "ci_low": None, "ci_high": None, "allowed_ms": None}
+    old_p50 = _median(_expand(old_hist))
+    allowed = max(old_p50 * factor, old_p50 + slack_ms) - old_p50
+    if low > allowed: status = "regression"
+    elif delta > allowed: status = "possible regression"
+    else: status = "ok"
+    return {"status": status, "delta_p50": delta, "ci_low": low, "ci_high": high, "allowed_ms": allowed,
+            "confidence": confidence}
+
+
+def rows_to_csv(rows):
+    """CSV text for a list of flat dicts (columns from the first row)"""
+    out = io.StringIO()
+    if rows:
+        writer = csv.DictWriter(out, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    return out.getvalue()
@@ -0,0 +1,138 @@
+"""Structural JSON diff (hub_diff) and its use by the replay's Deep Data Match check."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_diff import compact_records, diff_json, format_diff, json_equal, summarize_fields
+from hub_replay import compare_responses
+
+
+def kinds(old, new, **kwargs):
+    return [(r['path'], r['kind']) for r in diff_json(old, new, **kwargs)]
+
+
+# --- Basic records ---
+def test_identical_documents():
+    doc = {"a": [1, {"b": None}], "c": "x"}
+    assert diff_json(doc, {"c": "x", "a": [1, {"b": None}]}) == []
+
+
+def test_added_removed_changed():
+    assert diff_json({"a": 1, "b": 2}, {"a": 3, "c": 4}) == [
+        {"path": "a", "field": "a", "kind": "changed", "old": 1, "new": 3},
+        {"path": "b", "field": "b", "kind": "removed", "old": 2, "new": None},
+        {"path": "c", "field": "c", "kind": "added", "old": None, "new": 4},
+    ]
+
+
+def test_type_change():
+    assert kinds({"a": "1"}, {"a": 1}) == [("a", "type")]
+    assert kinds({"a": None}, {"a": {}}) == [("a", "type")]
+    assert kinds({"a": []}, {"a": {}}) == [("a", "type")]
+
+
+def test_numbers_compare_by_value():
+    assert diff_json({"a": 1, "b": [2]}, {"a": 1.0, "b": [2.0]}) == []
+
+
+# --- Booleans are not numbers ---
+@pytest.mark.parametrize("old, new, expected", [
+    (1, True, [("", "type")]),
+    ({"flag": 1, "n": 0}, {"flag": True, "n": False}, [("flag", "type"), ("n", "type")]),
+    ({"a": [1, 2]}, {"a": [True, 2]}, [("a.0", "type")]),
+    ({"a": {"b": [{"c": 0}]}}, {"a": {"b": [{"c": False}]}}, [("a.b.0.c", "type")]),
+    ({"a": [True]}, {"a": [1.0]}, [("a.0", "type")]),
+])
+def test_bool_vs_number(old, new, expected):
+    assert kinds(old, new) == expected
+
+
+def test_bool_vs_number_with_reordered_keys():
+    assert kinds({"x": 1, "flag": 1}, {"flag": True, "x": 1}) == [("flag", "type")]
+
+
+def test_json_equal():
+    assert json_equal({"a": [1, None]}, {"a": [1.0, None]})
+    assert json_equal({"a": 1, "b": 2}, {"b": 2, "a": 1})
+    assert not json_equal({"a": [1]}, {"a": [True]})
+    assert not json_equal({"a": 0}, {"a": False})
+    assert not json_equal([0], [False])
+    assert not json_equal({"a": 1}, {"a": 1, "b": 2})
+
+
+# --- Arrays ---
+def test_arrays_by_position():
+    assert kinds([1, 2], [1, 3, 4], array_keys=()) == [("1", "changed"), ("2", "added")]
+
+
+def test_arrays_matched_by_key():
+    old = [{"id": 1, "v": "a"}, {"id": 2, "v": "b"}]
+    new = [{"id": 2, "v": "b"}, {"id": 1, "v": "x"}, {"id": 3, "v": "c"}]
+    assert kinds(old, new) == [("[id=1].v", "changed"), ("[id=3]", "added")]
+    assert diff_json(old, new)[0]['field'] == "[].v"
+
+
+def test_array_key_keeps_true_and_1_apart():
+    old = [{"id": 1, "v": "a"}, {"id": True, "v": "b"}]
+    new = [{"id": True, "v": "b"}, {"id": 1, "v": "a"}]
+    assert diff_json(old, new) == []
+
+
+def test_array_key_must_be_unique():
+    old = [{"id": 1, "v": "a"}, {"id": 1, "v": "b"}]
+    assert kinds(old, list(reversed(old))) == [("0.v", "changed"), ("1.v", "changed")]
+
+
+# --- Options ---
+def test_ignore_patterns():
+    old = {"createdAt": "t1", "data": {"createdAt": "t1", "name": "a"}}
+    new = {"createdAt": "t2", "data": {"createdAt": "t2", "name": "b"}}
+    assert kinds(old, new, ignore=("*createdAt",)) == [("data.name", "changed")]
+
+
+def test_max_records():
+    assert len(diff_json(list(range(10)), list(range(10, 20)), max_records=3)) == 3
+
+
+# --- Reporting ---
+def test_format_and_compact():
+    records = diff_json({"a": 1, "b": [1, 2]}, {"a": 2, "c": 1, "b": {}})
+    assert [format_diff(r) for r in records] == [
+        "[VALUE DIFF] 'a': Old(1) vs New(2)",
+        "[VALUE DIFF] 'b': Old(<array 2 items>) vs New(<object 0 keys>)",
+        "[NEW FIELD] 'c'",
+    ]
+    assert compact_records(records)[1]['old'] == "<array 2 items>"
+
+
+def test_summarize_fields():
+    first = diff_json({"rows": [{"id": 1, "v": 1}]}, {"rows": [{"id": 1, "v": 2}]})
+    second = diff_json({"rows": [{"id": 1, "v": 1}, {"id": 2, "v": 1}]}, {"rows": [{"id": 1, "v": 3}, {"id": 2, "v": 3}]})
+    (row,) = summarize_fields([first, second])
+    assert row == {"field": "rows[].v", "added": 0, "removed": 0, "changed": 3, "type": 0, "pairs": 2}
+
+
+# --- Replay check ---
+def response(payload):
+    return {"status": 200, "time_ms": 10.0, "json": payload, "error": None}
+
+
+def deep_match(old, new):
+    checks, _ = compare_responses(response(old), response(new))
+    return next(c for c in checks if c['name'] == "Deep Data Match")
+
+
+def test_deep_data_match_fails_on_bool_vs_number():
+    old = {"success": True, "data": {"active": 1, "items": [0, 2]}}
+    new = {"success": True, "data": {"active": True, "items": [False, 2]}}
+    check = deep_match(old, new)
+    assert not check['passed']
+    assert "[VALUE DIFF] 'data.active': Old(1) vs New(True)" in check['message']
+    assert "[VALUE DIFF] 'data.items.0': Old(0) vs New(False)" in check['message']
+
+
+def test_deep_data_match_passes_on_equal_bodies():
+    body = {"success": True, "data": {"active": True, "n": 1}}
+    assert deep_match(body, {"data": {"n": 1.0, "active": True}, "success": True})['passed']
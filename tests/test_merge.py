@@ -0,0 +1,101 @@
+"""Collection diff / three-way merge of hand-fixed bodies (hub_merge)."""
+import copy
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_merge import diff_collections, merge_fixes, same_body
+
+
+def request(name, body, url="{{base}}/api/orders", method="POST"):
+    return {"name": name, "request": {"method": method, "url": {"raw": url},
+                                      "body": {"mode": "raw", "raw": json.dumps(body, indent=2)}}}
+
+
+def folder(name, *items):
+    return {"name": name, "item": list(items)}
+
+
+def raw_body(item):
+    return json.loads(item['request']['body']['raw'])
+
+
+# --- same_body ---
+def test_formatting_is_not_a_change():
+    assert same_body('{"a": 1, "b": [1, 2]}', '{\n  "b": [1, 2],\n  "a": 1\n}')
+    assert same_body('{"a": 1}', '{"a": 1.0}')
+
+
+def test_bool_vs_number_is_a_change():
+    assert not same_body('{"active": 0}', '{"active": false}')
+    assert not same_body('{"ids": [1, 2]}', '{"ids": [true, 2]}')
+
+
+def test_invalid_bodies_compare_as_text():
+    assert same_body('{"a": 1,}', '{"a": 1,}')
+    assert not same_body('{"a": 1,}', '{"a": 1}')
+
+
+# --- Diff ---
+def test_diff_collections():
+    old = [folder("01_a", request("New Core_a", {"id": 1}), request("New Core_b", {"flag": 1}))]
+    new = [folder("01_a", request("New Core_a", {"id": 1}), request("New Core_b", {"flag": True}),
+                  request("New Core_c", {}))]
+    result = diff_collections(old, new)
+    assert result['summary'] == {"added": 1, "removed": 0, "changed": 1, "unchanged": 1}
+    (changed,) = result['changed']
+    assert changed['fields'] == ["body"]
+    assert [(d['path'], d['kind']) for d in changed['body_diffs']] == [("flag", "type")]
+
+
+# --- Merge ---
+def test_two_way_merge_carries_fixes():
+    fixed = [folder("01_a", request("New Core_a", {"id": 5}))]
+    regenerated = [folder("01_a", request("New Core_a", {"id": 0}))]
+    records = merge_fixes(fixed, regenerated)
+    assert [r['action'] for r in records] == ["carried"]
+    assert raw_body(regenerated[0]['item'][0]) == {"id": 5}
+
+
+def test_three_way_merge_keeps_a_bool_for_int_fix():
+    base = [folder("01_a", request("New Core_a", {"active": 0, "count": 1}))]
+    fixed = copy.deepcopy(base)
+    fixed[0]['item'][0]['request']['body']['raw'] = '{"active": false, "count": 1}'
+    regenerated = copy.deepcopy(base)
+    records = merge_fixes(fixed, regenerated, base)
+    assert [r['action'] for r in records] == ["carried"]
+    assert raw_body(regenerated[0]['item'][0]) == {"active": False, "count": 1}
+    assert type(raw_body(regenerated[0]['item'][0])['active']) is bool
+
+
+def test_three_way_merge_lets_regeneration_win_on_untouched_bodies():
+    base = [folder("01_a", request("New Core_a", {"id": 0}))]
+    fixed = copy.deepcopy(base)
+    regenerated = [folder("01_a", request("New Core_a", {"id": 0, "name": "new field"}))]
+    assert merge_fixes(fixed, regenerated, base) == []
+    assert raw_body(regenerated[0]['item'][0]) == {"id": 0, "name": "new field"}
+
+
+def test_three_way_merge_reports_conflicts():
+    base = [folder("01_a", request("New Core_a", {"id": 0}))]
+    fixed = [folder("01_a", request("New Core_a", {"id": 7}))]
+    regenerated = [folder("01_a", request("New Core_a", {"id": True}))]
+    (record,) = merge_fixes(fixed, regenerated, base)
+    assert record['action'] == "conflict"
+    assert raw_body(regenerated[0]['item'][0]) == {"id": True}
+
+
+def test_invalid_or_empty_fixes_are_not_carried():
+    regenerated = [folder("01_a", request("New Core_a", {"id": 0}), request("New Core_b", {"id": 0}))]
+    fixed = copy.deepcopy(regenerated)
+    fixed[0]['item'][0]['request']['body']['raw'] = '{"id": 1,'
+    fixed[0]['item'][1]['request']['body']['raw'] = '{}'
+    assert merge_fixes(fixed, regenerated) == []
+
+
+def test_repeated_requests_are_matched_by_occurrence():
+    fixed = [folder("01_a", request("New Core_a", {"n": 1}), request("New Core_a", {"n": 2}))]
+    regenerated = [folder("01_a", request("New Core_a", {"n": 0}), request("New Core_a", {"n": 0}))]
+    merge_fixes(fixed, regenerated)
+    assert [raw_body(i) for i in regenerated[0]['item']] == [{"n": 1}, {"n": 2}]
@@ -0,0 +1,60 @@
+"""Swagger path lookup through the segment trie (hub_core.build_swagger_path_index / find_swagger_path)."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_core import build_swagger_path_index, find_swagger_path
+
+PATHS = {
+    "/api/users/{id}": "user by id",
+    "/api/users/me": "current user",
+    "/api/users/{id}/orders/{orderId}": "user order",
+    "/api/users/{userId}/orders/latest": "latest order",
+    "/api/files/{name}.json": "json file",
+    "/api/files/{name}": "any file",
+    "/api/items/{a}": "first declared",
+    "/api/items/{b}": "second declared",
+}
+
+
+def lookup(url, paths=PATHS):
+    return find_swagger_path(url, paths, build_swagger_path_index(paths))
+
+
+# --- Precedence ---
+@pytest.mark.parametrize("url, expected", [
+    ("/api/users/me", "current user"),
+    ("/api/users/42", "user by id"),
+    ("/api/users/42/orders/latest", "latest order"),
+    ("/api/files/report.json", "json file"),
+    ("/api/files/report.csv", "any file"),
+    ("/api/items/1", "first declared"),
+])
+def test_literal_beats_template(url, expected):
+    assert lookup(url) == expected
+
+
+def test_literal_dead_end_falls_back_to_template():
+    # `me` matches the literal segment, but only the templated branch goes on to `/orders/7`
+    paths = {"/api/users/me": "current user", "/api/users/{id}/orders/{orderId}": "user order"}
+    assert lookup("/api/users/me/orders/7", paths) == "user order"
+
+
+# --- Matching ---
+def test_segments_are_case_insensitive():
+    assert lookup("/API/Users/ME") == "current user"
+    assert lookup("/api/FILES/x.JSON") == "json file"
+
+
+def test_no_match():
+    assert lookup("/api/users") is None
+    assert lookup("/api/users/42/orders") is None
+    assert lookup("/api/users//orders/7") is None
+    assert lookup("/api/other/1") is None
+
+
+def test_index_is_built_when_not_given():
+    assert find_swagger_path("/api/users/me", PATHS) == "current user"
+    assert find_swagger_path("/api/users/7", PATHS) == "user by id"
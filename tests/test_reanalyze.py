@@ -0,0 +1,59 @@
+"""Incremental re-analysis of edited requests (hub_core.reanalyze_touched)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hub_core
+from hub_core import analyze_collection_recursively, reanalyze_touched
+
+
+def request(name, raw, url="{{base}}/api/orders"):
+    return {"name": name, "request": {"method": "POST", "url": {"raw": url}, "body": {"mode": "raw", "raw": raw}}}
+
+
+def collection():
+    return [{"name": "01_orders", "item": [request("New Core_a", '{"a": 1,}'), request("New Core_b", '{"n": 0}'),
+                                           request("New Core_c", '{"x": 1,')]}]
+
+
+def paths(findings):
+    return [[f['path'] for f in group] for group in findings]
+
+
+def test_fixed_request_drops_out():
+    items = collection()
+    findings = analyze_collection_recursively(items)
+    (first, _), zero_warns = findings[0], findings[1]
+    first['item_ref']['request']['body']['raw'] = '{"a": 1}'
+    updated = reanalyze_touched(findings, [first])
+    assert paths(updated) == [["01_orders > New Core_c"], ["01_orders > New Core_b"], [], []]
+    assert updated[1] == zero_warns
+
+
+def test_new_finding_keeps_collection_order():
+    items = collection()
+    findings = analyze_collection_recursively(items)
+    (first, third) = findings[0]
+    first['item_ref']['request']['body']['raw'] = '{"a": 0}'
+    third['item_ref']['request']['body']['raw'] = '{"x": 0}'
+    updated = reanalyze_touched(findings, [third, first])
+    assert paths(updated) == [[], ["01_orders > New Core_a", "01_orders > New Core_b", "01_orders > New Core_c"], [], []]
+    assert [f['seq'] for f in updated[1]] == [0, 1, 2]
+
+
+def test_only_touched_requests_are_analyzed(monkeypatch):
+    items = collection()
+    findings = analyze_collection_recursively(items)
+    calls = []
+    original = hub_core.analyze_request
+    monkeypatch.setattr(hub_core, "analyze_request", lambda item, *args: calls.append(item['name']) or original(item, *args))
+    first = findings[0][0]
+    reanalyze_touched(findings, [first, first])
+    assert calls == ["New Core_a"]
+
+
+def test_untouched_edit_is_not_seen():
+    items = collection()
+    findings = analyze_collection_recursively(items)
+    items[0]['item'][2]['request']['body']['raw'] = '{"x": 1}'
+    assert paths(reanalyze_touched(findings, [])) == paths(findings)
@@ -0,0 +1,116 @@
+"""Tolerant JSON repair (hub_core.repair_json) and the body examples of Swagger descriptions."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import hub_core
+from hub_core import (FIX_CAPITALIZED_BOOLEAN, FIX_COMMENT, FIX_SINGLE_QUOTES, FIX_TRAILING_COMMA, FIX_UNBALANCED,
+                      FIX_UNQUOTED_KEY, FIX_UNTERMINATED_STRING, extract_body_with_fixes, repair_json)
+
+
+def repaired(text, **kwargs):
+    body, fixes, _ = repair_json(text, **kwargs)
+    return json.loads(body), fixes
+
+
+# --- Fix list ---
+def test_valid_json_needs_no_fix():
+    text = '{"a": [1, 2.5e3, true, null], "b": {"c": "x"}}'
+    assert repair_json(text) == (text, [], len(text))
+
+
+def test_fixes_come_in_report_order():
+    _, fixes = repaired("{b: True, 'a': 1, // note\n}")
+    assert fixes == [FIX_SINGLE_QUOTES, FIX_TRAILING_COMMA, FIX_CAPITALIZED_BOOLEAN, FIX_COMMENT, FIX_UNQUOTED_KEY]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": True, "b": False, "c": None}', {"a": True, "b": False, "c": None}),
+    ('{"a": TRUE, "b": NULL, "c": Null}', {"a": True, "b": None, "c": None}),
+])
+def test_capitalized_literals(text, expected):
+    assert repaired(text) == (expected, [FIX_CAPITALIZED_BOOLEAN])
+
+
+def test_unquoted_keys():
+    assert repaired('{id: 1, $ref: "x", _n2: [1e5]}') == (
+        {"id": 1, "$ref": "x", "_n2": [100000.0]}, [FIX_UNQUOTED_KEY])
+
+
+# --- Quotes ---
+def test_single_quotes():
+    assert repaired("{'name': 'it\\'s \"x\"'}") == ({"name": "it's \"x\""}, [FIX_SINGLE_QUOTES])
+
+
+def test_fixes_are_not_applied_inside_strings():
+    text = '{"url": "https://x.io/a,]", "note": "True, // not a comment", "k": "a: b"}'
+    assert repair_json(text) == (text, [], len(text))
+
+
+def test_unterminated_string():
+    assert repaired('{"s": "abc') == ({"s": "abc"}, [FIX_UNBALANCED, FIX_UNTERMINATED_STRING])
+
+
+# --- Trailing commas and comments ---
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1,}', {"a": 1}),
+    ('[1, 2,\n]', [1, 2]),
+    ('{"a": [1,], "b": {"c": 2,},}', {"a": [1], "b": {"c": 2}}),
+])
+def test_trailing_commas(text, expected):
+    assert repaired(text) == (expected, [FIX_TRAILING_COMMA])
+
+
+def test_trailing_comma_before_a_comment():
+    assert repaired('{"a": 1, // last\n /* end */ }') == ({"a": 1}, [FIX_TRAILING_COMMA, FIX_COMMENT])
+
+
+def test_comma_before_a_comment_that_hides_a_closer():
+    # The whole line is a comment, so the '}' in it does not make the comma trailing
+    assert repaired('{"a": 1, // old: }\n "b": 2}') == ({"a": 1, "b": 2}, [FIX_COMMENT])
+
+
+# --- Brace balancing ---
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}),
+    ('{"a": [1, 2}', {"a": [1, 2]}),
+    ('{"a": 1]}', {"a": 1}),
+    ('{"a": 1}}', {"a": 1}),
+])
+def test_unbalanced_braces(text, expected):
+    assert repaired(text) == (expected, [FIX_UNBALANCED])
+
+
+def test_single_value_stops_after_the_first_value():
+    text = '{"a": 1,} then notes {"b": 2}'
+    assert repair_json(text, single_value=True) == ('{"a": 1}', [FIX_TRAILING_COMMA], 9)
+
+
+def test_quick_pass_matches_the_tokenizer(monkeypatch):
+    texts = ['{"rows": [{"id": 1, "ok": True,}, // r\n {"id": 2, "ok": False},],}',
+             '{a: [1, 2, /* x */ 3,], b: None}', '  {"a": 1,}  ']
+    assert all(hub_core._quick_repair(t, 0, sv) is not None for t in texts for sv in (False, True))
+    results = [repair_json(t, single_value=sv) for t in texts for sv in (False, True)]
+    monkeypatch.setattr(hub_core, "_quick_repair", lambda *args: None)
+    assert results == [repair_json(t, single_value=sv) for t in texts for sv in (False, True)]
+
+
+# --- Swagger description bodies ---
+def test_valid_body_is_returned_verbatim():
+    body = '{\n  "a": 1,\n  "b": [true]\n}'
+    assert extract_body_with_fixes(f"Creates it.\nRequest Body Example-- {body}\n--Response-- {{}}") == (body, [])
+
+
+def test_sloppy_body_is_repaired():
+    text = "Request Body Example-- {'a': True, // x\n 'b': [1,],}\n--Response-- {\"success\": true}"
+    body, fixes = extract_body_with_fixes(text)
+    assert json.loads(body) == {"a": True, "b": [1]}
+    assert fixes == [FIX_SINGLE_QUOTES, FIX_TRAILING_COMMA, FIX_CAPITALIZED_BOOLEAN, FIX_COMMENT]
+
+
+def test_description_without_body():
+    assert extract_body_with_fixes("No example here") == ("{}", [])
+    assert extract_body_with_fixes("") == ("{}", [])
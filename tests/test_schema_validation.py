@@ -0,0 +1,223 @@
+"""Request body validation against the Swagger schema (hub_core._compile_schema) and the generator round trip."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_core import (MAX_SCHEMA_ERRORS, ValidatorCache, build_request_templates, find_request_template,
+                      generate_dummy_data, validate_request_body)
+
+
+def errors_of(value, schema, components=None):
+    root = {"components": {"schemas": components or {}}}
+    template = {"path": "/t", "method": "POST", "body_schema": schema}
+    return validate_request_body(value, template, {"root": root, "validators": ValidatorCache()})
+
+
+# --- Types ---
+@pytest.mark.parametrize("s_type, good, bad", [
+    ("string", "x", 1),
+    ("integer", 3, "3"),
+    ("integer", 3.0, 3.5),
+    ("number", 1.5, "1.5"),
+    ("boolean", False, 0),
+    ("array", [], {}),
+    ("object", {}, []),
+])
+def test_types(s_type, good, bad):
+    assert errors_of(good, {"type": s_type}) == ()
+    assert errors_of(bad, {"type": s_type}) == (f"(root): expected {s_type}, got {_name(bad)}",)
+
+
+def _name(value):
+    return {str: "string", int: "number", float: "number", bool: "boolean", list: "array", dict: "object"}[type(value)]
+
+
+def test_bool_is_not_a_number():
+    assert errors_of(True, {"type": "integer"}) == ("(root): expected integer, got boolean",)
+    assert errors_of(True, {"type": "number"}) == ("(root): expected number, got boolean",)
+
+
+def test_type_list():
+    schema = {"type": ["string", "integer"]}
+    assert errors_of("a", schema) == errors_of(1, schema) == ()
+    assert errors_of(1.5, schema) == ("(root): expected string or integer, got number",)
+
+
+def test_wrong_type_skips_the_other_keywords():
+    assert errors_of(5, {"type": "string", "minLength": 3, "enum": ["abc"]}) == ("(root): expected string, got number",)
+
+
+# --- Nullable ---
+def test_nullable():
+    assert errors_of(None, {"type": "string"}) == ("(root): expected string, got null",)
+    assert errors_of(None, {"type": "string", "nullable": True}) == ()
+    assert errors_of(None, {"type": ["string", "null"]}) == ()
+    assert errors_of(None, {"type": "string", "nullable": True, "enum": ["a"]}) == ()
+
+
+def test_nullable_property():
+    schema = {"type": "object", "properties": {"note": {"type": "string", "nullable": True}, "name": {"type": "string"}}}
+    assert errors_of({"note": None, "name": "x"}, schema) == ()
+    assert errors_of({"note": None, "name": None}, schema) == ("name: expected string, got null",)
+
+
+# --- Enum ---
+def test_enum():
+    schema = {"type": "string", "enum": ["new", "paid"]}
+    assert errors_of("paid", schema) == ()
+    assert errors_of("lost", schema) == ("(root): 'lost' is not one of ['new', 'paid']",)
+
+
+def test_integer_enum():
+    assert errors_of(2, {"type": "integer", "enum": [1, 2]}) == ()
+    assert errors_of(3, {"type": "integer", "enum": [1, 2]}) == ("(root): 3 is not one of [1, 2]",)
+
+
+# --- Ranges, lengths and formats ---
+def test_minimum_maximum():
+    schema = {"type": "integer", "minimum": 1, "maximum": 10}
+    assert errors_of(1, schema) == errors_of(10, schema) == ()
+    assert errors_of(0, schema) == ("(root): 0 is below the minimum 1",)
+    assert errors_of(11, schema) == ("(root): 11 is above the maximum 10",)
+
+
+def test_int_format_ranges():
+    assert errors_of(2**31 - 1, {"type": "integer", "format": "int32"}) == ()
+    assert errors_of(2**31, {"type": "integer", "format": "int32"}) == (f"(root): {2**31} is out of the int32 range",)
+    assert errors_of(2**31, {"type": "integer", "format": "int64"}) == ()
+
+
+def test_string_lengths_and_pattern():
+    schema = {"type": "string", "minLength": 2, "maxLength": 4, "pattern": "^[a-z]+$"}
+    assert errors_of("abc", schema) == ()
+    assert errors_of("a", schema) == ("(root): shorter than 2 characters",)
+    assert errors_of("abcde", schema) == ("(root): longer than 4 characters",)
+    assert errors_of("AB", schema) == ("(root): does not match '^[a-z]+$'",)
+
+
+@pytest.mark.parametrize("fmt, good, bad", [
+    ("date", "2024-01-31", "2024-01-31T10:00:00Z"),
+    ("date-time", "2024-01-31T10:00:00Z", "2024-01-31"),
+    ("uuid", "0f8fad5b-d9cb-469f-a165-70867728950e", "0f8fad5b"),
+    ("email", "a@b.io", "a@b"),
+])
+def test_formats(fmt, good, bad):
+    assert errors_of(good, {"type": "string", "format": fmt}) == ()
+    assert errors_of(bad, {"type": "string", "format": fmt}) == (f"(root): {bad!r} is not a valid {fmt}",)
+
+
+def test_array_items():
+    schema = {"type": "array", "minItems": 1, "maxItems": 2, "items": {"type": "integer"}}
+    assert errors_of([1, 2], schema) == ()
+    assert errors_of([], schema) == ("(root): fewer than 1 items",)
+    assert errors_of([1, 2, 3], schema) == ("(root): more than 2 items",)
+    assert errors_of([1, "x"], schema) == ("[1]: expected integer, got string",)
+
+
+# --- Objects ---
+def test_required_and_additional_properties():
+    schema = {"type": "object", "required": ["id", "name"], "additionalProperties": False,
+              "properties": {"id": {"type": "integer", "readOnly": True}, "name": {"type": "string"}}}
+    assert errors_of({"name": "x"}, schema) == ()   # readOnly fields may be left out
+    assert errors_of({}, schema) == ("(root): missing required field 'name'",)
+    assert errors_of({"name": "x", "extra": 1}, schema) == ("(root): unexpected field 'extra'",)
+
+
+def test_nested_paths():
+    schema = {"type": "object", "properties": {"lines": {"type": "array", "items": {"$ref": "#/components/schemas/Line"}}}}
+    components = {"Line": {"type": "object", "properties": {"qty": {"type": "integer"}}}}
+    assert errors_of({"lines": [{"qty": 1}, {"qty": "2"}]}, schema, components) == ("lines[1].qty: expected integer, got string",)
+
+
+def test_error_cap():
+    schema = {"type": "array", "items": {"type": "integer"}}
+    assert len(errors_of(["x"] * (MAX_SCHEMA_ERRORS * 2), schema)) == MAX_SCHEMA_ERRORS
+
+
+# --- allOf / anyOf / oneOf ---
+def test_all_of():
+    components = {"Base": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}}}
+    schema = {"allOf": [{"$ref": "#/components/schemas/Base"},
+                        {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}}]}
+    assert errors_of({"id": 1, "name": "x"}, schema, components) == ()
+    assert errors_of({"id": "1"}, schema, components) == ("id: expected integer, got string",
+                                                          "(root): missing required field 'name'")
+
+
+@pytest.mark.parametrize("combo", ["anyOf", "oneOf"])
+def test_any_of(combo):
+    schema = {combo: [{"type": "integer", "minimum": 0}, {"type": "string", "format": "uuid"}]}
+    assert errors_of(5, schema) == ()
+    assert errors_of("0f8fad5b-d9cb-469f-a165-70867728950e", schema) == ()
+    (error,) = errors_of(-1, schema)
+    assert error.startswith(f"(root): matches none of the {combo} variants (")
+
+
+def test_cyclic_ref():
+    components = {"Node": {"type": "object", "required": ["name"],
+                           "properties": {"name": {"type": "string"},
+                                          "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}}}}}
+    schema = {"$ref": "#/components/schemas/Node"}
+    assert errors_of({"name": "a", "children": [{"name": "b", "children": []}]}, schema, components) == ()
+    assert errors_of({"name": "a", "children": [{"children": [{}]}]}, schema, components) == (
+        "children[0]: missing required field 'name'", "children[0].children[0]: missing required field 'name'")
+
+
+# --- Generator round trip ---
+ORDER_SPEC = {
+    "openapi": "3.0.1",
+    "paths": {"/api/orders": {"post": {"requestBody": {"content": {"application/json": {
+        "schema": {"$ref": "#/components/schemas/Order"}}}}}}},
+    "components": {"schemas": {
+        "Order": {"type": "object", "required": ["id", "date", "createdAt", "quantity", "status", "customer"],
+                  "properties": {
+                      "id": {"type": "string", "format": "uuid"},
+                      "date": {"type": "string", "format": "date"},
+                      "createdAt": {"type": "string", "format": "date-time"},
+                      "quantity": {"type": "integer", "format": "int32", "minimum": 1, "maximum": 100},
+                      "discount": {"type": "number", "minimum": 0.5},
+                      "price": {"type": "number", "exclusiveMinimum": True, "minimum": 0},
+                      "status": {"type": "string", "enum": ["new", "paid"]},
+                      "code": {"type": "string", "minLength": 10, "maxLength": 12},
+                      "email": {"type": "string", "format": "email"},
+                      "note": {"type": "string", "nullable": True},
+                      "customer": {"$ref": "#/components/schemas/Customer"},
+                      "lines": {"type": "array", "minItems": 2, "items": {"$ref": "#/components/schemas/Line"}},
+                      "parent": {"$ref": "#/components/schemas/Order"},
+                  }},
+        "Customer": {"allOf": [{"$ref": "#/components/schemas/Entity"},
+                               {"type": "object", "properties": {"referrer": {"$ref": "#/components/schemas/Customer"},
+                                                                 "tags": {"type": "array", "items": {"type": "string"}}}}]},
+        "Entity": {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}}},
+        "Line": {"type": "object", "properties": {"sku": {"type": "string"},
+                                                  "children": {"type": "array", "items": {"$ref": "#/components/schemas/Line"}},
+                                                  "payment": {"oneOf": [{"type": "null"}, {"$ref": "#/components/schemas/Payment"}]}}},
+        "Payment": {"type": "object", "required": ["amount"], "properties": {"amount": {"type": "number", "maximum": -1}}},
+    }},
+}
+
+
+def test_generated_body_passes_validation():
+    templates = build_request_templates(ORDER_SPEC)
+    template = find_request_template("{{base}}/api/orders", templates, "POST")
+    body = json.loads(template['body'])
+    assert validate_request_body(body, template, templates) == ()
+    assert body['date'] == "2024-01-01"
+    assert body['createdAt'] == "2024-01-01T00:00:00Z"
+    assert body['quantity'] == 1 and body['discount'] == 0.5 and body['price'] == 1
+    assert len(body['lines']) == 2 and body['lines'][0]['children'] == []
+    assert body['lines'][0]['payment'] == {"amount": -1}
+    assert "parent" not in body and "referrer" not in body['customer']
+
+
+def test_required_cycle_becomes_empty_container():
+    components = {"A": {"type": "object", "required": ["b"], "properties": {"b": {"$ref": "#/components/schemas/B"}}},
+                  "B": {"type": "object", "required": ["a", "list"],
+                        "properties": {"a": {"$ref": "#/components/schemas/A"},
+                                       "list": {"$ref": "#/components/schemas/AList"}}},
+                  "AList": {"type": "array", "items": {"$ref": "#/components/schemas/A"}}}
+    root = {"components": {"schemas": components}}
+    assert generate_dummy_data({"$ref": "#/components/schemas/A"}, root) == {"b": {"a": {}, "list": []}}
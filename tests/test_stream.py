@@ -0,0 +1,82 @@
+"""Low-memory collection scanning (hub_core.iter_collection_item_spans / analyze_collection_stream)."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hub_core import (analyze_collection_recursively, analyze_collection_stream, export_streamed_collection,
+                      iter_collection_item_spans)
+
+
+def request(name, raw, url="{{base}}/api/orders"):
+    return {"name": name, "request": {"method": "POST", "url": {"raw": url}, "body": {"mode": "raw", "raw": raw}}}
+
+
+COLLECTION = {
+    "info": {"name": "Orders", "note": "an \"item\": [] inside a string ] }"},
+    "item": [
+        {"name": "01_orders", "item": [request("New Core_a", '{"a": 1,}'), request("New Core_b", '{"n": 0}')],
+         "response": [{"body": "[{]"}]},
+        request("New Core_c", '{"ok": true}'),
+    ],
+    "variable": [{"key": "base", "value": "http://x"}],
+}
+
+
+def encoded(collection=COLLECTION, indent=2):
+    return json.dumps(collection, indent=indent).encode('utf-8')
+
+
+# --- Spans ---
+@pytest.mark.parametrize("indent", [None, 2])
+def test_spans_are_the_top_level_items(indent):
+    data = encoded(indent=indent)
+    spans = list(iter_collection_item_spans(data))
+    assert [json.loads(data[s:e]) for s, e in spans] == COLLECTION['item']
+
+
+def test_bom_and_empty_item_array():
+    assert list(iter_collection_item_spans(b'\xef\xbb\xbf {"item": []}')) == []
+
+
+def test_item_key_below_the_root_is_ignored():
+    data = b'{"info": {"item": [{"x": 1}]}, "item": [{"y": 2}]}'
+    (span,) = iter_collection_item_spans(data)
+    assert json.loads(data[span[0]:span[1]]) == {"y": 2}
+
+
+@pytest.mark.parametrize("data, message", [
+    (b'[{"item": []}]', "Expecting a collection object"),
+    (b'{"info": {}}', "no 'item' array"),
+    (b'{"item": [{"a": 1}', "cut off inside 'item'"),
+    (b'{"item": [], "info": {', "cut off"),
+    (b'{"item": ["abc', "Unterminated string"),
+    (b'{"item": []} {}', "Extra data"),
+])
+def test_broken_documents(data, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_collection_item_spans(data))
+
+
+# --- Streamed analysis ---
+def test_stream_matches_the_full_analysis():
+    lean_items, spans, *findings = analyze_collection_stream(encoded())
+    full = analyze_collection_recursively(COLLECTION['item'])
+    strip = lambda group: [{k: repr(v) for k, v in f.items() if k != 'item_ref'} for f in group]
+    assert [strip(g) for g in findings] == [strip(g) for g in full]
+    assert [f['path'] for f in findings[0]] == ["01_orders > New Core_a"]
+    assert "response" not in lean_items[0]
+    assert len(spans) == 2
+
+
+def test_export_copies_untouched_items_verbatim():
+    data = encoded()
+    lean_items, spans, syntax_errs, *_ = analyze_collection_stream(data)
+    assert export_streamed_collection(data, spans, lean_items) == data
+    syntax_errs[0]['item_ref']['request']['body']['raw'] = '{"a": 1}'
+    exported = json.loads(export_streamed_collection(data, spans, lean_items))
+    assert exported['item'][0]['item'][0]['request']['body']['raw'] == '{"a": 1}'
+    assert exported['item'][0]['response'] == COLLECTION['item'][0]['response']
+    assert exported['item'][1:] == COLLECTION['item'][1:]